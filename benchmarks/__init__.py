@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the scraping and sentiment pipeline.
+
+``synthetic_reviews`` generates Play Store-like review corpora (and a local
+fake of ``google_play_scraper.reviews``); ``pipeline_benchmark`` times every
+stage on them and keeps a JSON history of the results.
+"""
@@ -0,0 +1,387 @@
+"""
+End-to-end pipeline benchmark on synthetic review corpora.
+
+For every corpus size the stages below run in order on the same data.
+Each stage records wall time, throughput (rows per second) and peak
+process RSS; RSS is sampled in a background thread while the stage runs.
+
+==================  =========================================================
+generate            ``generate_review_frame`` (synthetic corpus)
+scrape              ``SpotifyReviewScraper.scrape_concurrent`` against ``FakePlayStore``
+save_load_csv       DataFrame -> CSV -> DataFrame (as ``save_to_csv`` writes it)
+save_load_parquet   ``ParquetReviewWriter`` + ``read_reviews``
+clean               ``clean_texts`` (batch ``enhanced_clean_text``)
+preprocess          ``preprocess_corpus`` (batch ``advanced_text_preprocessing``)
+features            TF-IDF (1-2 grams) + lexicon features
+train               ``LinearSVC`` on the TF-IDF matrix
+predict_batch       ``save_pipeline`` -> ``load_predictor`` -> ``predict_batch`` on raw texts
+==================  =========================================================
+
+A stage that fails (e.g. missing NLTK data) is recorded with its error and
+the stages depending on it are skipped. Every run is appended to a JSON
+history file; throughput is compared with the previous run of the same
+stage and size, and drops beyond ``--regression-threshold`` are reported
+(``--fail-on-regression`` turns them into a non-zero exit code)::
+
+    python -m benchmarks.pipeline_benchmark --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .synthetic_reviews import FakePlayStore, generate_review_frame
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join(REPO_ROOT, 'artifacts', 'benchmarks', 'history.json')
+
+STAGES = [
+    'generate', 'scrape', 'save_load_csv', 'save_load_parquet',
+    'clean', 'preprocess', 'features', 'train', 'predict_batch',
+]
+
+# Stage -> stage whose output it needs
+DEPENDS_ON = {
+    'preprocess': 'clean',
+    'features': 'preprocess',
+    'train': 'features',
+    'predict_batch': 'train',
+}
+
+
+class PeakMemory:
+    """Peak RSS (MB) of this process while the block runs, sampled every ``interval`` seconds"""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start_mb = self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            self._process = None
+
+    def _rss_mb(self):
+        if self._process is not None:
+            return self._process.memory_info().rss / 1e6
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_mb = max(self.peak_mb, self._rss_mb())
+
+    def __enter__(self):
+        self.start_mb = self.peak_mb = self._rss_mb()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, self._rss_mb())
+        return False
+
+
+def _import_scraper():
+    """``spotify_scraper`` uses sibling imports, so the scraping folder goes on sys.path"""
+    scraping_dir = os.path.join(REPO_ROOT, 'scraping')
+    if scraping_dir not in sys.path:
+        sys.path.insert(0, scraping_dir)
+    import logging
+    from spotify_scraper import SpotifyReviewScraper
+    from concurrent_scraper import ReviewStream
+    logging.getLogger().setLevel(logging.WARNING)
+    return SpotifyReviewScraper, ReviewStream
+
+
+def stage_generate(ctx):
+    ctx['frame'] = generate_review_frame(ctx['size'], seed=ctx['seed'])
+    return len(ctx['frame'])
+
+
+def stage_scrape(ctx):
+    SpotifyReviewScraper, ReviewStream = ctx['scraper_classes']
+    store = ctx['fake_store']
+    scraper = SpotifyReviewScraper(fetch_fn=store.reviews)
+    streams = [
+        ReviewStream(rating, target_count=count) for rating, count in store.rating_counts().items() if count
+    ]
+    reviews_data, _, _ = scraper.scrape_concurrent(streams, rate=1e6, burst=1000, page_size=200)
+    return len(reviews_data)
+
+
+def stage_save_load_csv(ctx):
+    path = os.path.join(ctx['work_dir'], 'reviews.csv')
+    ctx['frame'].to_csv(path, index=False, encoding='utf-8')
+    return len(pd.read_csv(path))
+
+
+def stage_save_load_parquet(ctx):
+    from scraping.review_storage import ParquetReviewWriter, read_reviews
+
+    base_dir = os.path.join(ctx['work_dir'], 'parquet')
+    batch = ctx['review_batch']
+    with ParquetReviewWriter(base_dir) as writer:
+        for start in range(0, len(batch), 5000):
+            writer.write_batch(batch[start:start + 5000])
+    return len(read_reviews(base_dir))
+
+
+def stage_clean(ctx):
+    from sentiment.text_cleaning import clean_texts
+
+    ctx['cleaned'] = clean_texts(ctx['frame']['content'].fillna('').tolist())
+    return len(ctx['cleaned'])
+
+
+def stage_preprocess(ctx):
+    from sentiment.preprocessing import preprocess_corpus
+
+    ctx['processed'] = list(preprocess_corpus(ctx['cleaned'], n_jobs=ctx['jobs']))
+    return len(ctx['processed'])
+
+
+def stage_features(ctx):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sentiment.features import LexiconFeatureExtractor
+
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2), max_features=3000, min_df=3, max_df=0.9,
+                                 sublinear_tf=True, strip_accents='unicode')
+    ctx['X'] = vectorizer.fit_transform(ctx['processed'])
+    ctx['vectorizer'] = vectorizer
+    ctx['lexicon'] = LexiconFeatureExtractor().transform(ctx['processed'])
+    return ctx['X'].shape[0]
+
+
+def stage_train(ctx):
+    from sklearn.svm import LinearSVC
+    from sentiment.streaming import rating_labels
+
+    labels = rating_labels(ctx['frame'])
+    ctx['classes'], y = np.unique(labels, return_inverse=True)
+    ctx['model'] = LinearSVC(class_weight='balanced', random_state=42).fit(ctx['X'], y)
+    return len(y)
+
+
+def stage_predict_batch(ctx):
+    from sentiment.predictor import load_predictor, save_pipeline
+
+    path = os.path.join(ctx['work_dir'], 'pipeline.joblib')
+    save_pipeline(path, ctx['model'], ctx['vectorizer'], ctx['classes'], 'LinearSVC + TF-IDF (benchmark)')
+    predictor = load_predictor(path)
+    texts = ctx['frame']['content'].fillna('').tolist()
+    return len(predictor.predict_batch(texts))
+
+
+STAGE_FUNCTIONS = {name: globals()[f'stage_{name}'] for name in STAGES}
+
+
+def run_stage(name, ctx):
+    """Run one stage; returns its result record"""
+    record = {'stage': name, 'rows': ctx['size']}
+    try:
+        with PeakMemory() as memory:
+            started = time.perf_counter()
+            rows = STAGE_FUNCTIONS[name](ctx)
+            seconds = time.perf_counter() - started
+    except Exception as e:
+        # First meaningful line only (NLTK lookup errors span a whole banner)
+        lines = [line.strip() for line in str(e).splitlines() if line.strip(' *')]
+        record.update(status='error', error=f"{type(e).__name__}: {lines[0] if lines else ''}")
+        return record
+    record.update(
+        status='ok',
+        rows_processed=int(rows),
+        seconds=round(seconds, 4),
+        rows_per_second=round(rows / seconds, 1) if seconds > 0 else None,
+        peak_rss_mb=round(memory.peak_mb, 1),
+        rss_growth_mb=round(memory.peak_mb - memory.start_mb, 1),
+    )
+    return record
+
+
+def _review_batch(frame):
+    """DataFrame -> columnar ``ReviewBatch``, as the scraper produces"""
+    from scraping.review_batch import ReviewBatch
+
+    return ReviewBatch.from_raw(frame.astype(object).where(frame.notna(), None).to_dict(orient='records'))
+
+
+def run_benchmarks(sizes, stages=None, seed=42, jobs=1, scrape_latency=0.0, verbose=True):
+    """
+    Run ``stages`` (default: all) for every corpus size.
+
+    Inputs a stage needs but does not measure (the corpus when 'generate'
+    is not selected, review dicts, the fake Play Store) are prepared
+    outside the timed section.
+
+    Returns:
+        list of stage result records
+    """
+    stages = [name for name in STAGES if name in set(stages or STAGES)]
+    results = []
+    for size in sizes:
+        ctx = {'size': int(size), 'seed': seed, 'jobs': jobs}
+        failed = set()
+        with tempfile.TemporaryDirectory(prefix='spotify-bench-') as work_dir:
+            ctx['work_dir'] = work_dir
+            if 'generate' not in stages:
+                ctx['frame'] = generate_review_frame(size, seed=seed)
+            if 'scrape' in stages:
+                ctx['scraper_classes'] = _import_scraper()
+                ctx['fake_store'] = FakePlayStore(size, latency=scrape_latency, seed=seed)
+
+            for name in stages:
+                requirement = DEPENDS_ON.get(name)
+                if requirement and (requirement in failed or requirement not in stages):
+                    record = {'stage': name, 'rows': size, 'status': 'skipped',
+                              'error': f"needs stage '{requirement}'"}
+                    failed.add(name)
+                else:
+                    if name == 'save_load_parquet':
+                        ctx['review_batch'] = _review_batch(ctx['frame'])
+                    record = run_stage(name, ctx)
+                    if record['status'] != 'ok':
+                        failed.add(name)
+                results.append(record)
+                if verbose:
+                    print(format_record(record))
+    return results
+
+
+def format_record(record):
+    if record['status'] != 'ok':
+        return f"   {record['stage']:<18} {record['rows']:>9,}  {record['status'].upper()}: {record.get('error')}"
+    return (f"   {record['stage']:<18} {record['rows']:>9,}  {record['seconds']:>9.3f}s  "
+            f"{record['rows_per_second']:>12,.0f} rows/s  peak RSS {record['peak_rss_mb']:>8.1f} MB")
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def append_history(path, run):
+    history = load_history(path)
+    history.append(run)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(history, f, indent=2)
+    os.replace(tmp_path, path)
+    return history
+
+
+def find_regressions(history, run, threshold=0.25):
+    """
+    Stages whose throughput fell by more than ``threshold`` compared with
+    the latest earlier run of the same stage and corpus size.
+    """
+    regressions = []
+    for record in run['results']:
+        if record['status'] != 'ok':
+            continue
+        for previous_run in reversed(history):
+            if previous_run is run or previous_run['run_id'] == run['run_id']:
+                continue
+            previous = next(
+                (r for r in previous_run['results']
+                 if r['stage'] == record['stage'] and r['rows'] == record['rows'] and r['status'] == 'ok'),
+                None
+            )
+            if previous is None:
+                continue
+            change = record['rows_per_second'] / previous['rows_per_second'] - 1
+            if change < -threshold:
+                regressions.append({
+                    'stage': record['stage'],
+                    'rows': record['rows'],
+                    'rows_per_second': record['rows_per_second'],
+                    'previous_rows_per_second': previous['rows_per_second'],
+                    'previous_commit': previous_run.get('git_commit'),
+                    'change': round(change, 4),
+                })
+            break
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage on synthetic reviews")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000],
+                        help="Corpus sizes (1k to 1M reviews)")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=None, help="Stages to run (default: all)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes for preprocessing")
+    parser.add_argument('--scrape-latency', type=float, default=0.0,
+                        help="Simulated seconds per Play Store request")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="JSON history file")
+    parser.add_argument('--no-history', action='store_true', help="Do not append this run to the history")
+    parser.add_argument('--regression-threshold', type=float, default=0.25,
+                        help="Report throughput drops larger than this fraction")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit with status 1 on regressions")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    print(f"🏁 Benchmarking {', '.join(f'{size:,}' for size in args.sizes)} reviews")
+    print(f"   {'stage':<18} {'rows':>9}  {'time':>10}  {'throughput':>19}")
+
+    run = {
+        'run_id': datetime.now().strftime('%Y%m%dT%H%M%S'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'sizes': args.sizes,
+        'results': run_benchmarks(args.sizes, args.stages, args.seed, args.jobs, args.scrape_latency),
+    }
+
+    history = load_history(args.history)
+    regressions = find_regressions(history, run, args.regression_threshold)
+    if not args.no_history:
+        append_history(args.history, run)
+        print(f"\n💾 Run {run['run_id']} appended to {args.history}")
+
+    if regressions:
+        print(f"\n⚠️ {len(regressions)} regression(s) beyond {args.regression_threshold:.0%}:")
+        for regression in regressions:
+            print(f"   {regression['stage']} @ {regression['rows']:,}: {regression['rows_per_second']:,.0f} rows/s "
+                  f"vs {regression['previous_rows_per_second']:,.0f} ({regression['change']:+.1%}, "
+                  f"commit {regression['previous_commit']})")
+        if args.fail_on_regression:
+            sys.exit(1)
+    elif history:
+        print("✅ No throughput regressions against the previous run")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+"""
+Synthetic Play Store review corpora for benchmarks.
+
+``generate_review_frame`` builds ``n`` reviews with the columns of the
+scraper's ``review_batch.REVIEW_FIELDS`` (reviewId, userName, userImage,
+content, score, thumbsUpCount, reviewCreatedVersion, at, replyContent,
+replyAt, appVersion). The texts are meant to load the cleaning and NLP
+stages like real reviews do:
+
+* a skewed rating mix (mostly 5 and 1 stars),
+* mostly short reviews with a long tail of multi-sentence ones,
+* sentiment words that match the rating, with some mixed reviews,
+* Spotify topics (ads, shuffle, premium, offline, podcasts, ...),
+* contractions, emoji, ALL-CAPS words, stretched letters ("sooo"), URLs
+  and the occasional empty review.
+
+``FakePlayStore`` serves such a corpus through the call signature of
+``google_play_scraper.reviews`` (pages plus a continuation token), so the
+scraper can be benchmarked without network access::
+
+    scraper = SpotifyReviewScraper(fetch_fn=FakePlayStore(n_reviews=50000).reviews)
+"""
+
+import threading
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+
+REVIEW_COLUMNS = [
+    'reviewId', 'userName', 'userImage', 'content', 'score', 'thumbsUpCount',
+    'reviewCreatedVersion', 'at', 'replyContent', 'replyAt', 'appVersion'
+]
+
+# Share of each rating 1..5 (Play Store reviews are skewed towards 5 and 1 stars)
+RATING_WEIGHTS = (0.24, 0.07, 0.08, 0.12, 0.49)
+
+POSITIVE_PHRASES = [
+    "I love this app", "best music app ever", "amazing sound quality", "great playlists",
+    "the recommendations are perfect", "works great", "absolutely fantastic",
+    "Discover Weekly is awesome", "excellent app", "love it", "so good", "I'm really happy with premium",
+    "it's the best", "wonderful experience", "the new design looks nice",
+]
+NEGATIVE_PHRASES = [
+    "this app is terrible", "worst update ever", "keeps crashing", "too many ads",
+    "I hate the new shuffle", "it's so annoying", "songs won't play offline", "waste of money",
+    "the app is broken", "customer support is useless", "can't log in", "it freezes all the time",
+    "premium is too expensive", "I don't like the new layout", "horrible experience",
+]
+NEUTRAL_PHRASES = [
+    "it's okay", "decent app", "works fine most of the time", "average experience",
+    "not bad", "could be better", "it's alright I guess", "fair price",
+    "nothing special", "does what it should",
+]
+TOPIC_PHRASES = [
+    "the ads between songs", "shuffle on my playlists", "the premium subscription", "offline downloads",
+    "podcasts", "the lyrics feature", "the car mode", "the widget", "my liked songs", "the search",
+    "battery usage", "the family plan", "Spotify Connect", "the sleep timer", "the queue",
+]
+CONNECTORS = ["but", "and", "also", "however", "although", "plus"]
+EMOJI = ["😍", "❤️", "👍", "🔥", "🎵", "😡", "👎", "😤", "🙄", "😐", "😊", "💯"]
+FIRST_NAMES = [
+    "Alex", "Sam", "Maria", "John", "Aisyah", "Budi", "Chen", "Dewi", "Emma", "Fatima",
+    "Gabriel", "Hana", "Ivan", "Jasmine", "Kevin", "Lina", "Mohammed", "Nina", "Omar", "Putri",
+]
+REPLIES = [
+    "Hi there! Sorry to hear that. Please try reinstalling the app and let us know if it helps.",
+    "Thanks for the feedback! We've passed it on to the team.",
+    "Hey! Could you reach out to us at @SpotifyCares so we can take a closer look?",
+]
+
+
+def _sentence(rng, rating):
+    """One clause whose tone follows the rating (with some mixed reviews)"""
+    tone = {1: (0.05, 0.85), 2: (0.1, 0.7), 3: (0.3, 0.35), 4: (0.7, 0.1), 5: (0.85, 0.05)}[rating]
+    draw = rng.random()
+    if draw < tone[0]:
+        phrase = POSITIVE_PHRASES[rng.integers(len(POSITIVE_PHRASES))]
+    elif draw < tone[0] + tone[1]:
+        phrase = NEGATIVE_PHRASES[rng.integers(len(NEGATIVE_PHRASES))]
+    else:
+        phrase = NEUTRAL_PHRASES[rng.integers(len(NEUTRAL_PHRASES))]
+    if rng.random() < 0.4:
+        phrase = f"{phrase} {CONNECTORS[rng.integers(len(CONNECTORS))]} " \
+                 f"{TOPIC_PHRASES[rng.integers(len(TOPIC_PHRASES))]}"
+    return phrase
+
+
+def _noise(rng, text):
+    """Emoji, caps, stretched letters and URLs as found in real reviews"""
+    if rng.random() < 0.08:
+        words = text.split()
+        i = rng.integers(len(words))
+        words[i] = words[i].upper()
+        text = ' '.join(words)
+    if rng.random() < 0.05:
+        text = text.replace('so ', 'sooo ', 1).replace('love', 'loooove', 1)
+    if rng.random() < 0.2:
+        text = f"{text} {''.join(rng.choice(EMOJI, size=rng.integers(1, 4)))}"
+    if rng.random() < 0.01:
+        text = f"{text} see https://community.spotify.com/t5/{rng.integers(10 ** 6)}"
+    if rng.random() < 0.1:
+        text = text + '!' * int(rng.integers(1, 4))
+    return text
+
+
+def review_text(rng, rating):
+    """Review body: mostly one or two sentences, with a long tail"""
+    if rng.random() < 0.005:
+        return ''
+    n_sentences = min(int(rng.geometric(0.55)), 8)
+    sentences = [_sentence(rng, rating) for _ in range(n_sentences)]
+    text = '. '.join(sentence[0].upper() + sentence[1:] for sentence in sentences)
+    return _noise(rng, text)
+
+
+def generate_review_frame(n, seed=42, end=None, rating_weights=RATING_WEIGHTS):
+    """
+    ``n`` synthetic reviews as a DataFrame with the scraper's columns.
+
+    Args:
+        seed: Random seed (same seed -> same corpus)
+        end: Timestamp of the newest review (default: 2024-06-01); reviews
+            are sorted newest first like a ``Sort.NEWEST`` scrape
+        rating_weights: Share of ratings 1..5
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or '2024-06-01 12:00:00')
+
+    scores = rng.choice(np.arange(1, 6), size=n, p=np.asarray(rating_weights) / np.sum(rating_weights))
+    contents = [review_text(rng, int(score)) for score in scores]
+
+    raw_ids = rng.integers(0, 2 ** 63, size=(n, 2), dtype=np.int64)
+    review_ids = [str(uuid.UUID(int=(int(a) << 64) | int(b), version=4)) for a, b in raw_ids]
+    names = np.array(FIRST_NAMES)[rng.integers(len(FIRST_NAMES), size=n)]
+    suffixes = rng.integers(0, 10000, size=n)
+    anonymous = rng.random(n) < 0.1
+    user_names = [
+        'A Google user' if anon else (f"{name}{suffix}" if suffix % 3 else str(name))
+        for name, suffix, anon in zip(names, suffixes, anonymous)
+    ]
+    user_images = [f"https://play-lh.googleusercontent.com/a/{a & 0xFFFFFFFFFFFF:012x}" for a, _ in raw_ids]
+
+    gaps = rng.exponential(30.0, size=n)  # seconds between consecutive reviews
+    at = (end - pd.to_timedelta(np.cumsum(gaps), unit='s')).floor('s')
+
+    minor = rng.integers(0, 10, size=n)
+    build = rng.integers(100, 999, size=n)
+    versions = [f"8.9.{m}.{b}" for m, b in zip(minor, build)]
+    no_version = rng.random(n) < 0.15
+
+    has_reply = rng.random(n) < np.where(scores <= 2, 0.06, 0.01)
+    reply_delay = pd.to_timedelta(rng.exponential(36.0, size=n), unit='h').floor('s')
+
+    frame = pd.DataFrame({
+        'reviewId': review_ids,
+        'userName': user_names,
+        'userImage': user_images,
+        'content': contents,
+        'score': scores.astype(np.int64),
+        'thumbsUpCount': np.where(rng.random(n) < 0.02, rng.integers(50, 5000, size=n),
+                                  rng.geometric(0.7, size=n) - 1).astype(np.int64),
+        'reviewCreatedVersion': [None if missing else version for version, missing in zip(versions, no_version)],
+        'at': at,
+        'replyContent': [REPLIES[i % len(REPLIES)] if reply else None for i, reply in enumerate(has_reply)],
+        'replyAt': pd.Series(at + reply_delay).where(has_reply),
+        'appVersion': [None if missing else version for version, missing in zip(versions, no_version)],
+    })
+    return frame[REVIEW_COLUMNS]
+
+
+def generate_reviews(n, seed=42, **options):
+    """``n`` synthetic reviews as a list of dicts (``review_data`` records)"""
+    frame = generate_review_frame(n, seed=seed, **options)
+    records = frame.astype(object).where(frame.notna(), None).to_dict(orient='records')
+    for record in records:
+        for key in ('at', 'replyAt'):
+            if record[key] is not None:
+                record[key] = record[key].to_pydatetime()
+    return records
+
+
+class FakeContinuationToken:
+    """Continuation token shaped like google-play-scraper's (``token`` is None on the last page)"""
+
+    def __init__(self, token, lang, country, sort, count, filter_score_with):
+        self.token = token
+        self.lang = lang
+        self.country = country
+        self.sort = sort
+        self.count = count
+        self.filter_score_with = filter_score_with
+
+
+class FakePlayStore:
+    """
+    Local stand-in for ``google_play_scraper.reviews``.
+
+    Args:
+        n_reviews: Size of the synthetic corpus served (split by rating)
+        latency: Seconds slept per page, to mimic network round trips
+        seed: Corpus seed
+    """
+
+    def __init__(self, n_reviews=10000, latency=0.0, seed=42):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        records = generate_reviews(n_reviews, seed=seed)
+        for record in records:
+            # google-play-scraper names this field repliedAt
+            record['repliedAt'] = record.pop('replyAt')
+        self._by_rating = {rating: [r for r in records if r['score'] == rating] for rating in range(1, 6)}
+        self._all = records
+
+    def rating_counts(self):
+        """Reviews available per rating (the most a rating stream can collect)"""
+        return {rating: len(pool) for rating, pool in self._by_rating.items()}
+
+    def reviews(self, app_id, lang='en', country='us', sort=None, count=100, filter_score_with=None,
+                continuation_token=None):
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if continuation_token is not None:
+            if continuation_token.token is None:
+                return [], continuation_token
+            offset = int(continuation_token.token)
+            lang, country = continuation_token.lang, continuation_token.country
+            sort, filter_score_with = continuation_token.sort, continuation_token.filter_score_with
+            # Like google_play_scraper.reviews, the page size comes from the token, not the argument
+            count = continuation_token.count
+        else:
+            offset = 0
+
+        pool = self._all if filter_score_with is None else self._by_rating.get(filter_score_with, [])
+        page = [dict(review) for review in pool[offset:offset + count]]
+        next_offset = offset + len(page)
+        token = str(next_offset) if next_offset < len(pool) else None
+        return page, FakeContinuationToken(token, lang, country, sort, count, filter_score_with)
@@ -0,0 +1,167 @@
+"""
+Checkpoint Store untuk Spotify Review Scraper
+
+Menyimpan setiap batch review ke disk saat diterima (append-only JSONL),
+beserta continuation token dan progres setiap stream, sehingga scraping
+yang terhenti (crash / Ctrl-C) bisa dilanjutkan dengan --resume tanpa
+mengambil ulang review yang sudah ada.
+"""
+
+import base64
+import glob
+import json
+import logging
+import os
+import pickle
+import threading
+from datetime import datetime
+
+
+class CheckpointStore:
+    """
+    Penyimpanan checkpoint untuk satu run scraping
+
+    Struktur folder:
+        <checkpoint_dir>/reviews.jsonl  # satu baris per review: {"stream": ..., "review": {...}}
+        <checkpoint_dir>/state.json     # meta run + token & progres per stream
+    """
+
+    REVIEWS_FILE = 'reviews.jsonl'
+    STATE_FILE = 'state.json'
+
+    def __init__(self, checkpoint_dir, meta=None):
+        self.checkpoint_dir = checkpoint_dir
+        self.reviews_path = os.path.join(checkpoint_dir, self.REVIEWS_FILE)
+        self.state_path = os.path.join(checkpoint_dir, self.STATE_FILE)
+        self._lock = threading.Lock()
+
+        os.makedirs(checkpoint_dir, exist_ok=True)
+
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        else:
+            self.state = {
+                'created_at': datetime.now().isoformat(),
+                'completed': False,
+                'meta': meta or {},
+                'streams': {}
+            }
+            self._write_state()
+
+    @classmethod
+    def create(cls, base_dir, meta=None):
+        """Membuat checkpoint baru dengan nama folder berdasarkan timestamp"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(os.path.join(base_dir, f"run_{timestamp}"), meta=meta)
+
+    @classmethod
+    def latest(cls, base_dir):
+        """Membuka checkpoint terbaru yang belum selesai, atau None"""
+        runs = sorted(glob.glob(os.path.join(base_dir, 'run_*')), reverse=True)
+        for run_dir in runs:
+            if not os.path.exists(os.path.join(run_dir, cls.STATE_FILE)):
+                continue
+            store = cls(run_dir)
+            if not store.completed:
+                return store
+        return None
+
+    @property
+    def meta(self):
+        return self.state.get('meta', {})
+
+    @property
+    def completed(self):
+        return self.state.get('completed', False)
+
+    @staticmethod
+    def encode_token(token):
+        """Serialisasi continuation token (objek google-play-scraper) ke string"""
+        if token is None:
+            return None
+        return base64.b64encode(pickle.dumps(token)).decode('ascii')
+
+    @staticmethod
+    def decode_token(encoded):
+        if not encoded:
+            return None
+        return pickle.loads(base64.b64decode(encoded))
+
+    def _write_state(self):
+        # Tulis ke file sementara lalu rename agar state tidak pernah setengah jadi
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, indent=2, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def append_batch(self, stream_key, reviews_data, continuation_token):
+        """
+        Menyimpan satu batch review dan memperbarui progres stream
+
+        Review ditulis lebih dulu, baru state. Jika proses mati di antaranya,
+        resume akan mengulang halaman terakhir dan duplikat tersaring lewat reviewId.
+        """
+        with self._lock:
+            if reviews_data:
+                with open(self.reviews_path, 'a', encoding='utf-8') as f:
+                    for review in reviews_data:
+                        f.write(json.dumps({'stream': stream_key, 'review': dict(review)}, ensure_ascii=False, default=str))
+                        f.write('\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+
+            stream_state = self.state['streams'].setdefault(stream_key, {'collected': 0, 'done': False})
+            stream_state['collected'] += len(reviews_data)
+            stream_state['token'] = self.encode_token(continuation_token)
+            stream_state['updated_at'] = datetime.now().isoformat()
+            self._write_state()
+
+    def mark_stream_done(self, stream_key):
+        with self._lock:
+            stream_state = self.state['streams'].setdefault(stream_key, {'collected': 0})
+            stream_state['done'] = True
+            self._write_state()
+
+    def mark_completed(self):
+        with self._lock:
+            self.state['completed'] = True
+            self._write_state()
+
+    def stream_state(self, stream_key):
+        """Progres sebuah stream: {'collected', 'token', 'done'} (token sudah di-decode)"""
+        stream_state = self.state['streams'].get(stream_key)
+        if not stream_state:
+            return None
+        return {
+            'collected': stream_state.get('collected', 0),
+            'token': self.decode_token(stream_state.get('token')),
+            'done': stream_state.get('done', False)
+        }
+
+    def load_reviews(self, stream_key=None):
+        """Memuat review yang sudah tersimpan (opsional hanya untuk satu stream)"""
+        if not os.path.exists(self.reviews_path):
+            return []
+
+        loaded = []
+        with open(self.reviews_path, 'r', encoding='utf-8') as f:
+            for line_num, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    logging.warning(f"Checkpoint: baris {line_num} rusak, dilewati")
+                    continue
+                if stream_key is None or record.get('stream') == stream_key:
+                    loaded.append(record['review'])
+        return loaded
+
+    def summary(self):
+        """Ringkasan progres semua stream"""
+        return {
+            key: {'collected': value.get('collected', 0), 'done': value.get('done', False)}
+            for key, value in self.state['streams'].items()
+        }
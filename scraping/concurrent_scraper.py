@@ -0,0 +1,309 @@
+"""
+Concurrent Review Scraper
+
+Mengambil beberapa stream review (rating x lang/country) secara paralel
+menggunakan thread pool. Semua stream berbagi satu TokenBucket sehingga
+total request tetap dibatasi, tetapi waktu total ditentukan oleh stream
+paling lambat, bukan jumlah waktu semua stream.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from rate_limiter import TokenBucket
+
+
+class ReviewStream:
+    """Definisi satu stream scraping: rating tertentu di satu lang/country"""
+
+    def __init__(self, rating, lang='en', country='us', target_count=3000):
+        self.rating = rating
+        self.lang = lang
+        self.country = country
+        self.target_count = target_count
+
+    @property
+    def key(self):
+        return f"rating{self.rating}_{self.lang}_{self.country}"
+
+    def __repr__(self):
+        return f"ReviewStream({self.key}, target={self.target_count})"
+
+
+class StreamStats:
+    """Statistik throughput untuk satu stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.collected = 0
+        self.requests = 0
+        self.errors = 0
+        self.wait_time = 0.0
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        end = self.finished_at if self.finished_at is not None else time.monotonic()
+        return end - self.started_at
+
+    @property
+    def throughput(self):
+        """Review per detik"""
+        return self.collected / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self):
+        return {
+            'stream': self.stream.key,
+            'collected': self.collected,
+            'requests': self.requests,
+            'errors': self.errors,
+            'elapsed_seconds': round(self.elapsed, 2),
+            'wait_seconds': round(self.wait_time, 2),
+            'reviews_per_second': round(self.throughput, 2),
+        }
+
+
+def _new_reviews(reviews, seen_ids):
+    """
+    Review yang reviewId-nya belum ada di seen_ids (seen_ids diperbarui di tempat)
+
+    ReviewBatch disaring per kolom lewat filter_new; list dict disaring per review.
+    """
+    if hasattr(reviews, 'filter_new'):
+        return reviews.filter_new(seen_ids)
+    new_reviews = []
+    for review in reviews:
+        if review['reviewId'] not in seen_ids:
+            seen_ids.add(review['reviewId'])
+            new_reviews.append(review)
+    return new_reviews
+
+
+class ConcurrentReviewScraper:
+    """
+    Menjalankan banyak ReviewStream secara paralel dengan rate limiter bersama
+
+    Args:
+        page_fn: Callable (stream, count, continuation_token) -> (reviews_data, token).
+            Biasanya SpotifyReviewScraper.fetch_review_page, atau stand-in lokal
+            untuk testing.
+        rate: Request per detik untuk semua stream bersama-sama
+        burst: Kapasitas burst token bucket
+        page_size: Jumlah review per request
+        max_workers: Jumlah thread (default: satu thread per stream)
+        max_retries: Jumlah percobaan ulang per halaman sebelum stream dihentikan
+        checkpoint: CheckpointStore opsional; setiap halaman disimpan dan stream
+            yang sudah berjalan dilanjutkan dari token terakhir
+        controller: AdaptiveController opsional; jika ada, page_size dan rate
+            hanya nilai awal, selanjutnya diatur dari latency/error/throttling
+            setiap request (dengan backoff sebelum request diulang)
+        collection_factory: Pembuat wadah review per stream dan hasil gabungan
+            (default list; SpotifyReviewScraper memakai ReviewBatch kolumnar)
+        review_stats: ReviewStats opsional yang di-update setiap halaman, untuk
+            statistik live selama scraping (review yang sama di beberapa region
+            terhitung per region)
+        parquet_writer: ParquetReviewWriter opsional; setiap halaman langsung
+            ditulis ke dataset Parquet begitu diterima
+    """
+
+    def __init__(self, page_fn, rate=2.0, burst=5, page_size=200, max_workers=None, max_retries=3,
+                 checkpoint=None, controller=None, collection_factory=list, review_stats=None,
+                 parquet_writer=None):
+        self.page_fn = page_fn
+        self.parquet_writer = parquet_writer
+        self.collection_factory = collection_factory
+        self.review_stats = review_stats
+        self.checkpoint = checkpoint
+        self.controller = controller
+        if controller is not None:
+            rate = controller.rate
+        self.limiter = TokenBucket(rate=rate, capacity=burst)
+        self.page_size = page_size
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def scrape_stream(self, stream, stats=None):
+        """Mengambil satu stream sampai target tercapai atau halaman habis"""
+        stats = stats or StreamStats(stream)
+        stats.started_at = time.monotonic()
+
+        stream_reviews = self.collection_factory()
+        seen_ids = set()
+        token = None
+        failures = 0
+        last_page = False
+
+        if self.checkpoint is not None:
+            previous = self.checkpoint.stream_state(stream.key)
+            if previous:
+                saved_reviews = self.checkpoint.load_reviews(stream.key)
+                seen_ids = {review['reviewId'] for review in saved_reviews}
+                stream_reviews.extend(saved_reviews)
+                token = previous['token']
+                stats.collected = len(stream_reviews)
+                logging.info(f"[{stream.key}] Melanjutkan dari checkpoint ({stats.collected} review)")
+                if previous['done']:
+                    stats.finished_at = time.monotonic()
+                    return stream_reviews, stats
+
+        while stats.collected < stream.target_count and not self._stop.is_set():
+            page_size = self.controller.page_size if self.controller is not None else self.page_size
+            count = min(page_size, stream.target_count - stats.collected)
+            stats.wait_time += self.limiter.acquire()
+            stats.requests += 1
+
+            started = time.monotonic()
+            try:
+                page, token = self.page_fn(stream, count, token)
+            except Exception as e:
+                stats.errors += 1
+                failures += 1
+                logging.warning(f"[{stream.key}] Error request ke-{stats.requests}: {str(e)}")
+                backoff = 0.0
+                if self.controller is not None:
+                    backoff = self.controller.record_failure(
+                        time.monotonic() - started, throttled=getattr(e, 'throttled', False)
+                    )
+                    self.limiter.set_rate(self.controller.rate)
+                if failures > self.max_retries:
+                    logging.error(f"[{stream.key}] Gagal {failures}x berturut-turut, stream dihentikan")
+                    break
+                # Backoff dengan jitter sebelum halaman yang sama diulang
+                self._stop.wait(backoff)
+                continue
+
+            if self.controller is not None:
+                self.controller.record_success(time.monotonic() - started, len(page))
+                self.limiter.set_rate(self.controller.rate)
+            failures = 0
+            new_reviews = _new_reviews(page, seen_ids)
+
+            remaining = stream.target_count - stats.collected
+            new_reviews = new_reviews[:remaining]
+            stream_reviews.extend(new_reviews)
+            stats.collected += len(new_reviews)
+            if self.review_stats is not None and len(new_reviews):
+                with self._lock:
+                    self.review_stats.update(new_reviews)
+            if self.checkpoint is not None:
+                self.checkpoint.append_batch(stream.key, new_reviews, token)
+            if self.parquet_writer is not None and len(new_reviews):
+                # ParquetWriter tidak thread-safe
+                with self._lock:
+                    self.parquet_writer.write_batch(new_reviews)
+
+            if not page or token is None:
+                # Tidak ada halaman lanjutan lagi
+                last_page = True
+                break
+
+        # Stream yang berhenti karena gagal/dihentikan tetap bisa dilanjutkan dari token terakhir
+        if self.checkpoint is not None and (last_page or stats.collected >= stream.target_count):
+            self.checkpoint.mark_stream_done(stream.key)
+        stats.finished_at = time.monotonic()
+        logging.info(
+            f"[{stream.key}] Selesai: {stats.collected} review, "
+            f"{stats.requests} request, {stats.throughput:.1f} review/detik"
+        )
+        return stream_reviews, stats
+
+    def scrape_streams(self, streams, progress_callback=None):
+        """
+        Menjalankan semua stream secara paralel
+
+        Args:
+            streams: List ReviewStream
+            progress_callback: Fungsi opsional (stream, stats) dipanggil saat stream selesai
+
+        Returns:
+            (all_reviews, stats_per_stream, total_elapsed)
+        """
+        all_reviews = self.collection_factory()
+        merged_ids = set()
+        stats_per_stream = {stream.key: StreamStats(stream) for stream in streams}
+        max_workers = self.max_workers or max(1, len(streams))
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='review-stream') as executor:
+            futures = {
+                executor.submit(self.scrape_stream, stream, stats_per_stream[stream.key]): stream
+                for stream in streams
+            }
+            try:
+                for future in as_completed(futures):
+                    stream = futures[future]
+                    try:
+                        stream_reviews, stats = future.result()
+                    except Exception as e:
+                        logging.error(f"[{stream.key}] Stream gagal: {str(e)}")
+                        continue
+
+                    # Region berbeda bisa mengembalikan review yang sama
+                    with self._lock:
+                        all_reviews.extend(_new_reviews(stream_reviews, merged_ids))
+                        if self.review_stats is not None:
+                            live = self.review_stats.to_analysis()
+                            if live:
+                                logging.info(
+                                    f"Statistik live: {live['total_reviews']} review, "
+                                    f"rata-rata rating {live['average_rating'] or 0:.2f}"
+                                )
+
+                    if progress_callback:
+                        progress_callback(stream, stats)
+            except KeyboardInterrupt:
+                # Hentikan semua stream setelah request yang sedang berjalan selesai
+                self._stop.set()
+                raise
+
+        total_elapsed = time.monotonic() - started
+        return all_reviews, stats_per_stream, total_elapsed
+
+
+def build_streams(ratings=(1, 2, 3, 4, 5), regions=(('en', 'us'),), target_count=3000):
+    """Membuat daftar stream untuk setiap kombinasi rating x (lang, country)"""
+    return [
+        ReviewStream(rating, lang=lang, country=country, target_count=target_count)
+        for lang, country in regions
+        for rating in ratings
+    ]
+
+
+def print_throughput_report(stats_per_stream, total_elapsed):
+    """Menampilkan throughput per stream dan waktu total"""
+    print(f"\n⚡ THROUGHPUT PER STREAM:")
+    print("-" * 50)
+    for stats in stats_per_stream.values():
+        info = stats.to_dict()
+        print(
+            f"   {info['stream']:<22} {info['collected']:>6,} review | "
+            f"{info['requests']:>4} req | {info['elapsed_seconds']:>7.1f}s | "
+            f"{info['reviews_per_second']:>6.1f} review/detik"
+        )
+
+    slowest = max((s.elapsed for s in stats_per_stream.values()), default=0.0)
+    total_collected = sum(s.collected for s in stats_per_stream.values())
+    print(f"\n⏱️ Waktu total: {total_elapsed:.1f}s (stream terlambat: {slowest:.1f}s)")
+    if total_elapsed > 0:
+        print(f"📈 Throughput total: {total_collected / total_elapsed:.1f} review/detik")
+
+
+def print_controller_report(controller):
+    """Menampilkan keputusan AdaptiveController (page size/rate akhir, error, throttle, backoff)"""
+    metrics = controller.metrics()
+    print(f"\n🎛️ ADAPTIVE CONTROLLER:")
+    print("-" * 50)
+    print(f"   Page size akhir: {metrics['page_size']} | rate akhir: {metrics['rate']:.2f} req/detik "
+          f"(jeda {metrics['delay']:.2f}s)")
+    print(f"   Request: {metrics['requests']} | error: {metrics['errors']} | throttled: {metrics['throttled']} "
+          f"| error rate: {metrics['error_rate']:.1%}")
+    print(f"   Keputusan: {metrics['increases']} naik, {metrics['slowdowns']} lambat, "
+          f"{metrics['decreases']} turun | total backoff: {metrics['backoff_total']:.1f}s")
+    print(f"   Latency rata-rata: {metrics['avg_latency']:.2f}s | {metrics['items_per_second']:.1f} review/detik")
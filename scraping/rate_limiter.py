@@ -0,0 +1,270 @@
+"""
+Rate Limiter untuk Spotify Review Scraper
+
+Token bucket thread-safe yang dipakai bersama oleh semua stream scraping,
+menggantikan delay tetap (time.sleep) antar batch.
+
+AdaptiveController mengatur page size dan laju request saat runtime dari
+latency, error dan throttling yang teramati (AIMD: naik sedikit demi sedikit
+selama request lancar, turun setengah saat error/throttle, ditambah backoff
+eksponensial dengan jitter), sebagai ganti konstanta batch_size/delay tetap.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    Token bucket sederhana yang aman dipakai dari banyak thread
+
+    Args:
+        rate: Jumlah token yang diisi ulang per detik (request per detik)
+        capacity: Jumlah token maksimum (burst yang diizinkan)
+    """
+
+    def __init__(self, rate=2.0, capacity=5):
+        if rate <= 0:
+            raise ValueError("rate harus lebih besar dari 0")
+        if capacity < 1:
+            raise ValueError("capacity minimal 1")
+
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Statistik untuk laporan throughput
+        self.total_acquired = 0
+        self.total_wait_time = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._last_refill
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+
+    def try_acquire(self, tokens=1):
+        """Ambil token tanpa menunggu, return True jika berhasil"""
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                self.total_acquired += tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1):
+        """
+        Ambil token, tunggu sampai token tersedia
+
+        Returns:
+            Lama waktu menunggu dalam detik
+        """
+        if tokens > self.capacity:
+            raise ValueError("tokens melebihi kapasitas bucket")
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.total_acquired += tokens
+                    self.total_wait_time += waited
+                    return waited
+                sleep_for = (tokens - self._tokens) / self.rate
+
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+    def set_rate(self, rate):
+        """Ubah laju pengisian token saat runtime"""
+        if rate <= 0:
+            raise ValueError("rate harus lebih besar dari 0")
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+
+
+class AdaptiveController:
+    """
+    Pengendali AIMD untuk page size dan laju request (thread-safe)
+
+    Setiap request dilaporkan lewat record_success()/record_failure():
+    - sukses dan latency <= target_latency: page size +page_step dan
+      rate +rate_step (additive increase)
+    - sukses tapi latency > target_latency: page size dikali slow_factor
+      (halaman lebih kecil, rate tetap)
+    - error/throttle: page size dan rate dikali decrease_factor
+      (multiplicative decrease) lalu backoff eksponensial dengan full jitter;
+      throttle (PlayGatewayError / HTTP 429) menurunkan rate dua kali
+
+    Args:
+        page_size: Page size awal (review per request)
+        min_page_size, max_page_size: Batas page size
+        page_step: Kenaikan page size per request sukses
+        rate: Laju awal (request per detik); jeda antar request = 1 / rate
+        min_rate, max_rate: Batas laju request
+        rate_step: Kenaikan rate per request sukses
+        decrease_factor: Faktor pengali saat error/throttle
+        slow_factor: Faktor pengali page size saat latency melewati target
+        target_latency: Latency (detik) per request yang masih dianggap sehat
+        backoff_base, backoff_cap: Backoff awal dan maksimum (detik)
+        max_failures: Jumlah gagal berturut-turut sebelum dianggap habis (exhausted)
+        history_size: Jumlah keputusan terakhir yang disimpan untuk metrics
+        seed: Seed jitter (opsional, untuk run yang bisa diulang)
+    """
+
+    def __init__(self, page_size=200, min_page_size=50, max_page_size=4500, page_step=100,
+                 rate=0.5, min_rate=0.05, max_rate=10.0, rate_step=0.1,
+                 decrease_factor=0.5, slow_factor=0.75, target_latency=5.0,
+                 backoff_base=2.0, backoff_cap=120.0, max_failures=5, history_size=500, seed=None):
+        if not 0 < decrease_factor < 1 or not 0 < slow_factor <= 1:
+            raise ValueError("decrease_factor dan slow_factor harus di antara 0 dan 1")
+        if min_rate <= 0 or min_page_size < 1:
+            raise ValueError("min_rate dan min_page_size harus lebih besar dari 0")
+
+        self.min_page_size = int(min_page_size)
+        self.max_page_size = int(max_page_size)
+        self.page_step = int(page_step)
+        self.min_rate = float(min_rate)
+        self.max_rate = float(max_rate)
+        self.rate_step = float(rate_step)
+        self.decrease_factor = float(decrease_factor)
+        self.slow_factor = float(slow_factor)
+        self.target_latency = float(target_latency)
+        self.backoff_base = float(backoff_base)
+        self.backoff_cap = float(backoff_cap)
+        self.max_failures = max_failures
+
+        self.page_size = self._clamp(int(page_size), self.min_page_size, self.max_page_size)
+        self.rate = self._clamp(float(rate), self.min_rate, self.max_rate)
+        self.consecutive_failures = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.history = deque(maxlen=history_size)
+        self.counters = {
+            'requests': 0,
+            'successes': 0,
+            'errors': 0,
+            'throttled': 0,
+            'increases': 0,
+            'slowdowns': 0,
+            'decreases': 0,
+            'items': 0,
+            'latency_total': 0.0,
+            'backoff_total': 0.0,
+        }
+
+    @staticmethod
+    def _clamp(value, low, high):
+        return max(low, min(high, value))
+
+    @property
+    def delay(self):
+        """Jeda dasar antar request (detik)"""
+        return 1.0 / self.rate
+
+    @property
+    def exhausted(self):
+        """True jika request gagal lebih dari max_failures kali berturut-turut"""
+        return self.consecutive_failures > self.max_failures
+
+    def next_delay(self):
+        """Jeda sebelum request berikutnya, dengan jitter +-20% agar request tidak serempak"""
+        with self._lock:
+            return self.delay * self._random.uniform(0.8, 1.2)
+
+    def _log(self, decision, latency, **extra):
+        entry = {
+            't': round(time.monotonic() - self._started, 3),
+            'decision': decision,
+            'page_size': self.page_size,
+            'rate': round(self.rate, 4),
+            'latency': None if latency is None else round(latency, 3),
+        }
+        entry.update(extra)
+        self.history.append(entry)
+
+    def record_success(self, latency, items=0):
+        """
+        Laporkan request yang berhasil
+
+        Args:
+            latency: Durasi request (detik)
+            items: Jumlah review yang diterima
+        """
+        with self._lock:
+            self.consecutive_failures = 0
+            self.counters['requests'] += 1
+            self.counters['successes'] += 1
+            self.counters['items'] += items
+            self.counters['latency_total'] += latency
+
+            if latency > self.target_latency:
+                self.page_size = max(self.min_page_size, int(self.page_size * self.slow_factor))
+                self.counters['slowdowns'] += 1
+                self._log('slow', latency, items=items)
+            else:
+                self.page_size = min(self.max_page_size, self.page_size + self.page_step)
+                self.rate = min(self.max_rate, self.rate + self.rate_step)
+                self.counters['increases'] += 1
+                self._log('increase', latency, items=items)
+
+    def record_failure(self, latency=None, throttled=False):
+        """
+        Laporkan request yang gagal
+
+        Args:
+            latency: Durasi request sampai gagal (detik, opsional)
+            throttled: True jika Play Store menolak karena rate limit
+
+        Returns:
+            Lama backoff (detik) sebelum mencoba lagi
+        """
+        with self._lock:
+            self.consecutive_failures += 1
+            self.counters['requests'] += 1
+            self.counters['throttled' if throttled else 'errors'] += 1
+            self.counters['decreases'] += 1
+
+            self.page_size = max(self.min_page_size, int(self.page_size * self.decrease_factor))
+            factor = self.decrease_factor ** 2 if throttled else self.decrease_factor
+            self.rate = max(self.min_rate, self.rate * factor)
+
+            # Full jitter: acak di [0, min(cap, base * 2^(n-1))], minimal satu jeda dasar
+            ceiling = min(self.backoff_cap, self.backoff_base * 2 ** (self.consecutive_failures - 1))
+            backoff = max(self.delay, self._random.uniform(0, ceiling))
+            self.counters['backoff_total'] += backoff
+            self._log('throttled' if throttled else 'error', latency,
+                      failures=self.consecutive_failures, backoff=round(backoff, 3))
+            return backoff
+
+    def metrics(self):
+        """Snapshot state dan counter controller untuk laporan / monitoring"""
+        with self._lock:
+            counters = dict(self.counters)
+            requests = counters['requests']
+            successes = counters['successes']
+            return {
+                'page_size': self.page_size,
+                'rate': round(self.rate, 4),
+                'delay': round(self.delay, 3),
+                'consecutive_failures': self.consecutive_failures,
+                **{name: value for name, value in counters.items() if name != 'latency_total'},
+                'error_rate': (counters['errors'] + counters['throttled']) / requests if requests else 0.0,
+                'avg_latency': counters['latency_total'] / successes if successes else 0.0,
+                'items_per_second': counters['items'] / (time.monotonic() - self._started),
+            }
+
+    def decisions(self, last=None):
+        """Daftar keputusan terakhir (dict: t, decision, page_size, rate, latency, ...)"""
+        with self._lock:
+            history = list(self.history)
+        return history[-last:] if last else history
@@ -0,0 +1,395 @@
+"""
+Review Batch untuk Spotify Review Scraper
+
+Menyimpan review secara kolumnar (satu array/list per field) sebagai ganti
+list dict 11 key per review. Dict per review adalah biaya memori terbesar
+scraper untuk run besar: setiap review membawa hash table sendiri, objek
+int/datetime terpisah dan salinan string versi aplikasi yang sama.
+
+    - score, thumbsUpCount     -> array integer
+    - at, replyAt              -> array int64 (mikrodetik sejak epoch)
+    - appVersion,
+      reviewCreatedVersion     -> kode int32 + daftar versi unik (interned)
+    - field teks lainnya       -> list str
+
+Field yang tidak dianalisis (mis. userImage) bisa dibuang saat fetch
+dengan `fields=...`; kolomnya tetap muncul saat diekspor sebagai null
+sehingga skema file dataset tidak berubah.
+
+Iterasi menghasilkan ReviewRecord (objek `__slots__` yang berperilaku seperti
+dict read-only), sehingga kode yang memakai review['reviewId'] atau
+review.get('score') tetap berjalan. Konversi ke numpy/pandas/Arrow memakai
+buffer array secara langsung untuk kolom angka dan waktu.
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+
+REVIEW_FIELDS = (
+    'reviewId', 'userName', 'userImage', 'content', 'score', 'thumbsUpCount',
+    'reviewCreatedVersion', 'at', 'replyContent', 'replyAt', 'appVersion'
+)
+
+# Field yang selalu disimpan: dedup (reviewId), partisi/analisis (score) dan watermark (at)
+REQUIRED_FIELDS = ('reviewId', 'score', 'at')
+
+# Field yang dipakai analisis sentiment dan analyze_reviews (tanpa userName/userImage)
+ANALYSIS_FIELDS = (
+    'reviewId', 'content', 'score', 'thumbsUpCount', 'reviewCreatedVersion',
+    'at', 'replyContent', 'replyAt', 'appVersion'
+)
+
+INT_FIELDS = {'score': 'b', 'thumbsUpCount': 'q'}
+TIME_FIELDS = ('at', 'replyAt')
+CATEGORY_FIELDS = ('reviewCreatedVersion', 'appVersion')
+
+# Nama field di hasil google-play-scraper jika berbeda dengan nama di dataset
+RAW_FIELD_ALIASES = {'replyAt': 'repliedAt'}
+
+# Nilai int64 minimum dibaca numpy sebagai NaT
+_NAT = np.iinfo(np.int64).min
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _to_micros(value):
+    """datetime / pd.Timestamp / string ISO -> mikrodetik sejak epoch (naive)"""
+    if type(value) is datetime and value.tzinfo is None:
+        return (value - _EPOCH) // _MICROSECOND
+    if value is None or value is pd.NaT or value == '':
+        return _NAT
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return _NAT
+    if isinstance(value, pd.Timestamp):
+        if value.tzinfo is not None:
+            value = value.tz_convert(None)
+        return value.value // 1000
+    if not isinstance(value, datetime):
+        return _NAT
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value):
+    return None if value == _NAT else _EPOCH + timedelta(microseconds=value)
+
+
+def _raw_value(review, field):
+    value = review.get(field)
+    if value is None and field in RAW_FIELD_ALIASES:
+        value = review.get(RAW_FIELD_ALIASES[field])
+    return value
+
+
+def normalize_fields(fields=None):
+    """Urutkan field sesuai REVIEW_FIELDS dan pastikan REQUIRED_FIELDS ikut"""
+    if fields is None:
+        return REVIEW_FIELDS
+    unknown = set(fields) - set(REVIEW_FIELDS)
+    if unknown:
+        raise ValueError(f"Field review tidak dikenal: {sorted(unknown)}")
+    wanted = set(fields) | set(REQUIRED_FIELDS)
+    return tuple(field for field in REVIEW_FIELDS if field in wanted)
+
+
+class ReviewRecord(Mapping):
+    """
+    Satu review sebagai objek `__slots__` dengan antarmuka dict read-only
+
+    Dipakai sebagai baris dari ReviewBatch; dict(record) menghasilkan dict
+    biasa (mis. untuk JSON).
+    """
+
+    __slots__ = REVIEW_FIELDS
+
+    def __init__(self, **values):
+        for field in REVIEW_FIELDS:
+            setattr(self, field, values.get(field))
+
+    def __getitem__(self, key):
+        if key not in REVIEW_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(REVIEW_FIELDS)
+
+    def __len__(self):
+        return len(REVIEW_FIELDS)
+
+    def __repr__(self):
+        return f"ReviewRecord(reviewId={self.reviewId!r}, score={self.score!r})"
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in REVIEW_FIELDS}
+
+
+class ReviewBatch:
+    """
+    Kumpulan review yang disimpan per kolom
+
+    Args:
+        fields: Field yang disimpan (default: semua REVIEW_FIELDS);
+            REQUIRED_FIELDS selalu ikut disimpan
+    """
+
+    def __init__(self, fields=None):
+        self.fields = normalize_fields(fields)
+        self._columns = {}
+        self._categories = {}
+        self._category_codes = {}
+        for field in self.fields:
+            if field in INT_FIELDS:
+                self._columns[field] = array(INT_FIELDS[field])
+            elif field in TIME_FIELDS:
+                self._columns[field] = array('q')
+            elif field in CATEGORY_FIELDS:
+                self._columns[field] = array('i')
+                self._categories[field] = []
+                self._category_codes[field] = {}
+            else:
+                self._columns[field] = []
+        self._length = 0
+
+    @classmethod
+    def from_raw(cls, reviews, fields=None):
+        """Batch dari hasil google-play-scraper (list dict) atau dari review lain"""
+        batch = cls(fields)
+        batch.extend(reviews)
+        return batch
+
+    def _code(self, field, value):
+        if value is None:
+            return -1
+        codes = self._category_codes[field]
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._categories[field])
+            self._categories[field].append(sys.intern(str(value)))
+        return code
+
+    def _push(self, field, value, many=False):
+        column = self._columns[field]
+        try:
+            column.extend(value) if many else column.append(value)
+        except BufferError:
+            # Buffer sedang dipakai array numpy/Arrow hasil ekspor: salin dulu
+            column = self._columns[field] = array(column.typecode, column)
+            column.extend(value) if many else column.append(value)
+
+    def append(self, review):
+        """Tambah satu review (dict google-play-scraper, dict dataset atau ReviewRecord)"""
+        return self.extend([review])
+
+    def extend(self, reviews):
+        """Tambah banyak review (iterable review atau ReviewBatch lain), diisi per kolom"""
+        if isinstance(reviews, ReviewBatch):
+            return self._extend_batch(reviews)
+        reviews = reviews if isinstance(reviews, list) else list(reviews)
+        for field in self.fields:
+            values = [_raw_value(review, field) for review in reviews]
+            if field in INT_FIELDS:
+                self._push(field, array(INT_FIELDS[field], [int(value or 0) for value in values]), many=True)
+            elif field in TIME_FIELDS:
+                self._push(field, array('q', [_to_micros(value) for value in values]), many=True)
+            elif field in CATEGORY_FIELDS:
+                self._push(field, array('i', [self._code(field, value) for value in values]), many=True)
+            else:
+                self._columns[field].extend(values)
+        self._length += len(reviews)
+        return self
+
+    def _extend_batch(self, other):
+        """Gabung per kolom tanpa membuat ReviewRecord (kode versi dipetakan ulang)"""
+        n = len(other)
+        for field in self.fields:
+            source = other._columns.get(field)
+            if field in INT_FIELDS:
+                self._push(field, source if source is not None else array(INT_FIELDS[field], [0]) * n, many=True)
+            elif field in TIME_FIELDS:
+                self._push(field, source if source is not None else array('q', [_NAT]) * n, many=True)
+            elif field in CATEGORY_FIELDS:
+                if source is None:
+                    self._push(field, array('i', [-1]) * n, many=True)
+                    continue
+                mapping = [self._code(field, value) for value in other._categories[field]]
+                self._push(field, array('i', [mapping[code] if code >= 0 else -1 for code in source]), many=True)
+            else:
+                self._columns[field].extend(source if source is not None else [None] * n)
+        self._length += n
+        return self
+
+    def __len__(self):
+        return self._length
+
+    def _value(self, field, i):
+        if field not in self._columns:
+            return None
+        value = self._columns[field][i]
+        if field in TIME_FIELDS:
+            return _from_micros(value)
+        if field in CATEGORY_FIELDS:
+            return None if value < 0 else self._categories[field][value]
+        return value
+
+    def record(self, i):
+        """Review ke-i sebagai ReviewRecord"""
+        if i < 0:
+            i += self._length
+        if not 0 <= i < self._length:
+            raise IndexError("index review di luar jangkauan")
+        return ReviewRecord(**{field: self._value(field, i) for field in self.fields})
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self.record(i)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._length)
+            if step != 1:
+                return self.take(range(start, stop, step))
+            return self._slice(start, max(start, stop))
+        return self.record(key)
+
+    def _slice(self, start, stop):
+        batch = ReviewBatch(self.fields)
+        for field, column in self._columns.items():
+            batch._columns[field] = column[start:stop]
+        for field, categories in self._categories.items():
+            batch._categories[field] = list(categories)
+            batch._category_codes[field] = dict(self._category_codes[field])
+        batch._length = stop - start
+        return batch
+
+    def take(self, indices):
+        """Batch baru berisi review pada index tertentu (urutan dipertahankan)"""
+        indices = list(indices)
+        batch = ReviewBatch(self.fields)
+        for field, column in self._columns.items():
+            values = [column[i] for i in indices]
+            batch._columns[field] = array(column.typecode, values) if isinstance(column, array) else values
+        for field, categories in self._categories.items():
+            batch._categories[field] = list(categories)
+            batch._category_codes[field] = dict(self._category_codes[field])
+        batch._length = len(indices)
+        return batch
+
+    def filter_new(self, seen_ids, limit=None):
+        """
+        Batch baru berisi review yang reviewId-nya belum ada di seen_ids
+
+        Args:
+            seen_ids: Set reviewId yang sudah dimiliki (diperbarui di tempat)
+            limit: Jumlah maksimum review baru yang diambil
+        """
+        keep = []
+        for i, review_id in enumerate(self._columns['reviewId']):
+            if limit is not None and len(keep) >= limit:
+                break
+            if review_id in seen_ids:
+                continue
+            seen_ids.add(review_id)
+            keep.append(i)
+        if len(keep) == self._length:
+            return self._slice(0, self._length)
+        return self.take(keep)
+
+    @property
+    def review_ids(self):
+        return self._columns['reviewId']
+
+    def column(self, field):
+        """
+        Satu kolom sebagai array numpy
+
+        Kolom angka dan waktu adalah view ke buffer batch (tanpa salinan);
+        kolom versi dikembalikan sebagai pd.Categorical, kolom teks sebagai
+        array object. Field yang tidak disimpan menghasilkan kolom null.
+        """
+        if field not in REVIEW_FIELDS:
+            raise KeyError(field)
+        if field not in self._columns:
+            return np.full(self._length, None, dtype=object)
+        column = self._columns[field]
+        if field in INT_FIELDS:
+            return np.frombuffer(column, dtype=np.dtype(column.typecode)) if len(column) else \
+                np.zeros(0, dtype=np.dtype(column.typecode))
+        if field in TIME_FIELDS:
+            micros = np.frombuffer(column, dtype=np.int64) if len(column) else np.zeros(0, dtype=np.int64)
+            return micros.view('datetime64[us]')
+        if field in CATEGORY_FIELDS:
+            codes = np.frombuffer(column, dtype=np.int32) if len(column) else np.zeros(0, dtype=np.int32)
+            return pd.Categorical.from_codes(codes, categories=self._categories[field])
+        return np.array(column, dtype=object)
+
+    def to_pandas(self):
+        """DataFrame dengan kolom REVIEW_FIELDS (field yang dibuang berisi null)"""
+        return pd.DataFrame({field: self.column(field) for field in REVIEW_FIELDS}, copy=False)
+
+    def to_arrow(self, schema=None):
+        """
+        Arrow Table dengan kolom REVIEW_FIELDS
+
+        Args:
+            schema: Skema tujuan opsional (mis. review_storage.review_schema());
+                kolom di-cast ke tipe skema tersebut
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow diperlukan untuk konversi ke Arrow: pip install pyarrow")
+
+        arrays = {}
+        for field in REVIEW_FIELDS:
+            if field not in self._columns:
+                arrays[field] = pa.nulls(self._length)
+            elif field in INT_FIELDS:
+                arrays[field] = pa.array(self.column(field))
+            elif field in TIME_FIELDS:
+                values = self.column(field)
+                arrays[field] = pa.array(values, type=pa.timestamp('us'), mask=np.isnat(values))
+            elif field in CATEGORY_FIELDS:
+                codes = self.column(field).codes
+                indices = pa.array(codes, type=pa.int32(), mask=codes < 0)
+                dictionary = pa.array(self._categories[field], type=pa.string())
+                arrays[field] = pa.DictionaryArray.from_arrays(indices, dictionary)
+            else:
+                arrays[field] = pa.array(self._columns[field], type=pa.string())
+
+        table = pa.table(arrays)
+        if schema is not None:
+            table = table.select([field.name for field in schema]).cast(schema)
+        return table
+
+    def to_records(self):
+        """List dict biasa (untuk JSON), dengan urutan kolom REVIEW_FIELDS"""
+        return [record.to_dict() for record in self]
+
+    def memory_usage(self):
+        """Perkiraan memori batch dalam byte (termasuk objek string)"""
+        total = sys.getsizeof(self._columns)
+        for field, column in self._columns.items():
+            total += sys.getsizeof(column)
+            if isinstance(column, list):
+                total += sum(sys.getsizeof(value) for value in column if value is not None)
+        for categories in self._categories.values():
+            total += sys.getsizeof(categories) + sum(sys.getsizeof(value) for value in categories)
+        return total
+
+
+def as_batch(reviews, fields=None):
+    """ReviewBatch dari list review; ReviewBatch dikembalikan apa adanya"""
+    if isinstance(reviews, ReviewBatch):
+        return reviews
+    return ReviewBatch.from_raw(reviews, fields)
@@ -0,0 +1,144 @@
+"""
+Review Index untuk scraping incremental
+
+Menyimpan semua reviewId yang sudah pernah disimpan beserta timestamp `at`
+terbaru per rating. Dengan sort NEWEST, scraper bisa berhenti begitu
+bertemu review yang sudah dikenal sehingga refresh harian hanya mengambil
+review baru (delta).
+"""
+
+import glob
+import json
+import logging
+import os
+from datetime import datetime
+
+import pandas as pd
+
+
+def _parse_at(value):
+    """Konversi nilai `at` (datetime / string / Timestamp) ke datetime"""
+    if value is None or (isinstance(value, float) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return pd.Timestamp(value).to_pydatetime()
+    except (ValueError, TypeError):
+        return None
+
+
+class SeenIds:
+    """
+    Set reviewId untuk satu run di atas ReviewIndex
+
+    Cek keanggotaan langsung ke index (tanpa menyalin seluruh set reviewId
+    arsip); reviewId yang ditemukan selama run disimpan di set lokal kecil.
+    Bisa dipakai di mana pun set seen_ids diharapkan (`in` dan `add`).
+
+    Args:
+        index: ReviewIndex (atau container lain yang mendukung `in`)
+    """
+
+    def __init__(self, index):
+        self.index = index
+        self.local = set()
+
+    def __contains__(self, review_id):
+        return review_id in self.local or review_id in self.index
+
+    def add(self, review_id):
+        self.local.add(review_id)
+
+    def __len__(self):
+        return len(self.local)
+
+
+class ReviewIndex:
+    """
+    Index persisten reviewId + watermark `at` terbaru per rating
+
+    Args:
+        index_path: Lokasi file JSON index
+    """
+
+    def __init__(self, index_path):
+        self.index_path = index_path
+        self.review_ids = set()
+        self.newest_at = {}
+        self.updated_at = None
+
+        if os.path.exists(index_path):
+            with open(index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.review_ids = set(data.get('review_ids', []))
+            self.newest_at = {
+                int(rating): _parse_at(at) for rating, at in data.get('newest_at', {}).items()
+            }
+            self.updated_at = data.get('updated_at')
+
+    def __len__(self):
+        return len(self.review_ids)
+
+    def __contains__(self, review_id):
+        return review_id in self.review_ids
+
+    def watermark(self, rating):
+        """Timestamp review terbaru yang sudah dikenal untuk rating ini"""
+        return self.newest_at.get(int(rating))
+
+    def add_reviews(self, reviews_data):
+        """Menambahkan review ke index dan memperbarui watermark per rating"""
+        for review in reviews_data:
+            self.review_ids.add(review['reviewId'])
+
+            rating = review.get('score')
+            at = _parse_at(review.get('at'))
+            if rating is None or at is None:
+                continue
+            rating = int(rating)
+            current = self.newest_at.get(rating)
+            if current is None or at > current:
+                self.newest_at[rating] = at
+
+    def save(self):
+        """Simpan index ke disk (atomic rename)"""
+        self.updated_at = datetime.now().isoformat()
+        data = {
+            'updated_at': self.updated_at,
+            'newest_at': {str(rating): at.isoformat() for rating, at in sorted(self.newest_at.items())},
+            'review_ids': sorted(self.review_ids)
+        }
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.index_path)
+        logging.info(f"Review index disimpan: {len(self.review_ids)} reviewId")
+
+    def rebuild_from_dataset(self, csv_dir, json_dir):
+        """
+        Membangun index dari file dataset yang sudah ada
+
+        Hanya kolom reviewId, score, dan at yang dibaca dari CSV.
+        """
+        csv_files = glob.glob(os.path.join(csv_dir, 'spotify_reviews_*.csv'))
+        for file in csv_files:
+            try:
+                df = pd.read_csv(file, usecols=['reviewId', 'score', 'at'])
+                self.add_reviews(df.to_dict('records'))
+            except Exception as e:
+                logging.error(f"Gagal membaca {file} untuk index: {str(e)}")
+
+        json_files = glob.glob(os.path.join(json_dir, 'spotify_reviews_*.json'))
+        for file in json_files:
+            try:
+                with open(file, 'r', encoding='utf-8') as f:
+                    self.add_reviews(json.load(f))
+            except Exception as e:
+                logging.error(f"Gagal membaca {file} untuk index: {str(e)}")
+
+        logging.info(
+            f"Review index dibangun dari {len(csv_files) + len(json_files)} file: "
+            f"{len(self.review_ids)} reviewId"
+        )
+        return self
@@ -0,0 +1,324 @@
+"""
+Statistik Review yang Streaming dan Mergeable
+
+ReviewStats menyimpan agregat berjalan (bukan review-nya), sehingga ringkasan
+spotify_analysis.json bisa dihitung dengan memori O(1) terhadap jumlah review:
+
+    - jumlah review per score (1-5)
+    - mean/variance thumbsUpCount (Welford, digabung dengan rumus Chan)
+    - min/max `at`
+    - jumlah review dengan balasan / thumbs up
+    - quantile sketch (DDSketch, error relatif ~1%) untuk thumbsUpCount dan
+      panjang review
+
+Setiap objek bisa di-update per batch saat review masuk (live selama
+scraping) dan digabung dengan merge() - antar worker paralel, antar partisi
+Parquet, atau dengan hasil yang disimpan lewat to_dict()/from_dict():
+
+    stats = ReviewStats.from_batches(
+        iter_review_batches(base_dir, columns=list(STATS_FIELDS), shuffle=False)
+    )
+    analysis = stats.to_analysis()
+
+Modul ini tidak bergantung pada modul scraping lain agar bisa diimpor dari
+notebook sebagai `scraping.review_stats`.
+"""
+
+import math
+
+import numpy as np
+import pandas as pd
+
+
+# Kolom review yang dibutuhkan statistik
+STATS_FIELDS = ('score', 'thumbsUpCount', 'at', 'replyContent', 'content')
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class RunningMoments:
+    """Count, mean, variance, min dan max yang bisa di-update per batch dan digabung"""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if values.size == 0:
+            return self
+        batch = RunningMoments()
+        batch.count = int(values.size)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        return self.merge(batch)
+
+    def merge(self, other):
+        """Gabung (rumus paralel Chan et al.); hasil sama dengan satu pass atas semua data"""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def to_dict(self):
+        return {'count': self.count, 'mean': self.mean, 'm2': self.m2, 'min': self.min, 'max': self.max}
+
+    @classmethod
+    def from_dict(cls, state):
+        moments = cls()
+        moments.count, moments.mean, moments.m2 = state['count'], state['mean'], state['m2']
+        moments.min, moments.max = state['min'], state['max']
+        return moments
+
+
+class QuantileSketch:
+    """
+    DDSketch: histogram logaritmik dengan error relatif `relative_accuracy`
+
+    Nilai x > 0 masuk bin ceil(log_gamma(x)); nilai <= 0 dihitung terpisah
+    (thumbsUpCount banyak bernilai 0). Dua sketch digabung dengan
+    menjumlahkan bin, sehingga hasil merge sama dengan satu sketch atas
+    semua data.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+        positive = values[values > 0]
+        self.zero_count += int(values.size - positive.size)
+        self.count += int(values.size)
+        if positive.size:
+            keys, counts = np.unique(np.ceil(np.log(positive) / self._log_gamma).astype(np.int64),
+                                     return_counts=True)
+            for key, count in zip(keys.tolist(), counts.tolist()):
+                self.bins[key] = self.bins.get(key, 0) + count
+        return self
+
+    def merge(self, other):
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Sketch dengan relative_accuracy berbeda tidak bisa digabung")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """Perkiraan quantile q (0-1), None jika sketch kosong"""
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+        seen = self.zero_count
+        for key in sorted(self.bins):
+            seen += self.bins[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.bins) / (self.gamma + 1)
+
+    def to_dict(self):
+        return {
+            'relative_accuracy': self.relative_accuracy,
+            'zero_count': self.zero_count,
+            'count': self.count,
+            'bins': {str(key): count for key, count in self.bins.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['relative_accuracy'])
+        sketch.zero_count, sketch.count = state['zero_count'], state['count']
+        sketch.bins = {int(key): count for key, count in state['bins'].items()}
+        return sketch
+
+
+def _stats_frame(reviews):
+    """ReviewBatch, DataFrame atau list review -> DataFrame dengan STATS_FIELDS"""
+    if isinstance(reviews, pd.DataFrame):
+        frame = reviews
+    elif hasattr(reviews, 'column'):
+        # ReviewBatch: kolom angka/waktu berupa view numpy, tanpa membuat dict per review
+        frame = pd.DataFrame({field: reviews.column(field) for field in STATS_FIELDS}, copy=False)
+    else:
+        frame = pd.DataFrame.from_records(list(reviews))
+    for field in STATS_FIELDS:
+        if field not in frame:
+            frame = frame.assign(**{field: None})
+    return frame
+
+
+class ReviewStats:
+    """
+    Agregat review yang bisa di-update per batch dan digabung (lihat docstring modul)
+
+    Args:
+        relative_accuracy: Error relatif quantile sketch
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.total = 0
+        self.score_counts = {score: 0 for score in range(1, 6)}
+        self.thumbs_up = RunningMoments()
+        self.thumbs_up_sketch = QuantileSketch(relative_accuracy)
+        self.content_length_sketch = QuantileSketch(relative_accuracy)
+        self.with_thumbs_up = 0
+        self.with_replies = 0
+        self.at_min = None
+        self.at_max = None
+
+    def update(self, reviews):
+        """Tambahkan satu batch review (ReviewBatch, DataFrame atau list dict/ReviewRecord)"""
+        frame = _stats_frame(reviews)
+        if len(frame) == 0:
+            return self
+        self.total += len(frame)
+
+        scores = pd.to_numeric(frame['score'], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        valid = scores[(scores >= 1) & (scores <= 5)].astype(np.int64)
+        for score, count in zip(*np.unique(valid, return_counts=True)):
+            self.score_counts[int(score)] += int(count)
+
+        thumbs = pd.to_numeric(frame['thumbsUpCount'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        self.thumbs_up.update(thumbs)
+        self.thumbs_up_sketch.update(thumbs)
+        self.with_thumbs_up += int((thumbs > 0).sum())
+
+        self.with_replies += int(frame['replyContent'].notna().sum())
+        self.content_length_sketch.update(frame['content'].dropna().astype(str).str.len().to_numpy())
+
+        at = pd.to_datetime(frame['at'], errors='coerce').dropna()
+        if len(at):
+            batch_min, batch_max = at.min(), at.max()
+            self.at_min = batch_min if self.at_min is None else min(self.at_min, batch_min)
+            self.at_max = batch_max if self.at_max is None else max(self.at_max, batch_max)
+        return self
+
+    def merge(self, other):
+        """Gabungkan statistik lain (worker/partisi lain) ke objek ini"""
+        self.total += other.total
+        for score, count in other.score_counts.items():
+            self.score_counts[score] += count
+        self.thumbs_up.merge(other.thumbs_up)
+        self.thumbs_up_sketch.merge(other.thumbs_up_sketch)
+        self.content_length_sketch.merge(other.content_length_sketch)
+        self.with_thumbs_up += other.with_thumbs_up
+        self.with_replies += other.with_replies
+        for name, pick in (('at_min', min), ('at_max', max)):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            setattr(self, name, theirs if mine is None else mine if theirs is None else pick(mine, theirs))
+        return self
+
+    @classmethod
+    def from_batches(cls, batches, relative_accuracy=0.01):
+        """Statistik dari iterable batch (mis. review_storage.iter_review_batches)"""
+        stats = cls(relative_accuracy)
+        for batch in batches:
+            stats.update(batch)
+        return stats
+
+    @property
+    def rated(self):
+        return sum(self.score_counts.values())
+
+    @property
+    def average_rating(self):
+        rated = self.rated
+        return sum(score * count for score, count in self.score_counts.items()) / rated if rated else None
+
+    def to_analysis(self):
+        """
+        Ringkasan dengan key yang sama seperti spotify_analysis.json sebelumnya,
+        ditambah standar deviasi dan quantile thumbsUpCount serta panjang review
+        """
+        if self.total == 0:
+            return None
+        positive = self.score_counts[4] + self.score_counts[5]
+        negative = self.score_counts[1] + self.score_counts[2]
+        neutral = self.score_counts[3]
+        distribution = sorted(
+            ((score, count) for score, count in self.score_counts.items() if count),
+            key=lambda item: item[1], reverse=True
+        )
+        return {
+            'total_reviews': self.total,
+            'average_rating': self.average_rating,
+            'rating_distribution': dict(distribution),
+            'reviews_with_thumbs_up': self.with_thumbs_up,
+            'average_thumbs_up': self.thumbs_up.mean,
+            'thumbs_up_std': self.thumbs_up.std,
+            'thumbs_up_quantiles': {f"p{round(q * 100)}": self.thumbs_up_sketch.quantile(q) for q in QUANTILES},
+            'content_length_quantiles': {
+                f"p{round(q * 100)}": self.content_length_sketch.quantile(q) for q in QUANTILES
+            },
+            'reviews_with_replies': self.with_replies,
+            'most_recent_review': self.at_max,
+            'oldest_review': self.at_min,
+            'positive_reviews': positive,
+            'negative_reviews': negative,
+            'neutral_reviews': neutral,
+            'positive_percentage': positive / self.total * 100,
+            'negative_percentage': negative / self.total * 100,
+            'neutral_percentage': neutral / self.total * 100,
+        }
+
+    def to_dict(self):
+        """State lengkap (JSON-serializable) untuk disimpan dan digabung nanti"""
+        return {
+            'total': self.total,
+            'score_counts': {str(score): count for score, count in self.score_counts.items()},
+            'thumbs_up': self.thumbs_up.to_dict(),
+            'thumbs_up_sketch': self.thumbs_up_sketch.to_dict(),
+            'content_length_sketch': self.content_length_sketch.to_dict(),
+            'with_thumbs_up': self.with_thumbs_up,
+            'with_replies': self.with_replies,
+            'at_min': None if self.at_min is None else self.at_min.isoformat(),
+            'at_max': None if self.at_max is None else self.at_max.isoformat(),
+        }
+
+    @classmethod
+    def from_dict(cls, state):
+        stats = cls(state['thumbs_up_sketch']['relative_accuracy'])
+        stats.total = state['total']
+        stats.score_counts = {int(score): count for score, count in state['score_counts'].items()}
+        stats.thumbs_up = RunningMoments.from_dict(state['thumbs_up'])
+        stats.thumbs_up_sketch = QuantileSketch.from_dict(state['thumbs_up_sketch'])
+        stats.content_length_sketch = QuantileSketch.from_dict(state['content_length_sketch'])
+        stats.with_thumbs_up = state['with_thumbs_up']
+        stats.with_replies = state['with_replies']
+        stats.at_min = None if state['at_min'] is None else pd.Timestamp(state['at_min'])
+        stats.at_max = None if state['at_max'] is None else pd.Timestamp(state['at_max'])
+        return stats
@@ -0,0 +1,257 @@
+"""
+Columnar Storage untuk review Spotify (Parquet)
+
+Menulis batch review secara streaming ke file Parquet yang dipartisi
+per rating dan tanggal scraping (hive-style):
+
+    dataset/parquet/rating=5/scrape_date=2025-09-08/part-<id>.parquet
+
+Kolom bertipe (score int8, thumbsUpCount int32, at timestamp, appVersion
+categorical) sehingga notebook cukup membaca kolom / partisi yang
+dibutuhkan tanpa parsing CSV.
+
+Modul ini tidak bergantung pada modul scraping lain agar bisa diimpor dari
+notebook sebagai `scraping.review_storage`.
+"""
+
+import logging
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow opsional
+    pa = ds = pq = None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow diperlukan untuk penyimpanan Parquet: pip install pyarrow")
+
+
+def review_schema():
+    """Skema Arrow untuk satu review (tanpa kolom partisi)"""
+    _require_pyarrow()
+    return pa.schema([
+        ('reviewId', pa.string()),
+        ('userName', pa.string()),
+        ('userImage', pa.string()),
+        ('content', pa.string()),
+        ('score', pa.int8()),
+        ('thumbsUpCount', pa.int32()),
+        ('reviewCreatedVersion', pa.dictionary(pa.int32(), pa.string())),
+        ('at', pa.timestamp('us')),
+        ('replyContent', pa.string()),
+        ('replyAt', pa.timestamp('us')),
+        ('appVersion', pa.dictionary(pa.int32(), pa.string())),
+    ])
+
+
+def partitioning_schema():
+    _require_pyarrow()
+    return pa.schema([('rating', pa.int8()), ('scrape_date', pa.string())])
+
+
+def _to_timestamp(value):
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+
+
+def reviews_to_table(reviews_data, schema=None):
+    """Konversi list review (dict) atau ReviewBatch ke Arrow Table dengan tipe kolom yang benar"""
+    schema = schema or review_schema()
+    if hasattr(reviews_data, 'to_arrow'):
+        # ReviewBatch (review_batch.py): kolom sudah bertipe, tanpa loop per review
+        return reviews_data.to_arrow(schema)
+    columns = {}
+    for field in schema:
+        values = [review.get(field.name) for review in reviews_data]
+        if pa.types.is_timestamp(field.type):
+            values = [_to_timestamp(value) for value in values]
+        elif field.name == 'thumbsUpCount':
+            values = [int(value or 0) for value in values]
+        elif pa.types.is_dictionary(field.type):
+            values = [str(value) if value is not None else None for value in values]
+        columns[field.name] = pa.array(values, type=field.type)
+    return pa.table(columns, schema=schema)
+
+
+class ParquetReviewWriter:
+    """
+    Writer Parquet streaming yang dipartisi per rating dan tanggal scraping
+
+    Setiap partisi memiliki satu ParquetWriter terbuka; setiap write_batch
+    menambah row group baru sehingga memori tidak bertambah seiring jumlah
+    review. Gunakan sebagai context manager atau panggil close().
+
+    Args:
+        base_dir: Folder root dataset Parquet
+        scrape_date: Tanggal partisi (default: hari ini, format YYYY-MM-DD)
+        compression: Codec kompresi Parquet
+    """
+
+    def __init__(self, base_dir, scrape_date=None, compression='zstd'):
+        _require_pyarrow()
+        self.base_dir = base_dir
+        self.scrape_date = scrape_date or datetime.now().strftime('%Y-%m-%d')
+        self.compression = compression
+        self.schema = review_schema()
+        self._writers = {}
+        self._file_id = uuid.uuid4().hex[:12]
+        self.rows_written = 0
+
+    def _writer_for(self, rating):
+        if rating not in self._writers:
+            partition_dir = os.path.join(self.base_dir, f"rating={rating}", f"scrape_date={self.scrape_date}")
+            os.makedirs(partition_dir, exist_ok=True)
+            path = os.path.join(partition_dir, f"part-{self._file_id}.parquet")
+            self._writers[rating] = pq.ParquetWriter(path, self.schema, compression=self.compression)
+        return self._writers[rating]
+
+    def write_batch(self, reviews_data):
+        """Tulis satu batch review (list dict atau ReviewBatch) ke partisi rating masing-masing"""
+        if hasattr(reviews_data, 'to_arrow'):
+            table = reviews_to_table(reviews_data, self.schema)
+            scores = reviews_data.column('score')
+            for rating in np.unique(scores):
+                mask = scores == rating
+                self._writer_for(int(rating)).write_table(table.filter(pa.array(mask)))
+                self.rows_written += int(mask.sum())
+            return
+
+        by_rating = {}
+        for review in reviews_data:
+            by_rating.setdefault(int(review.get('score') or 0), []).append(review)
+
+        for rating, rating_reviews in by_rating.items():
+            self._writer_for(rating).write_table(reviews_to_table(rating_reviews, self.schema))
+            self.rows_written += len(rating_reviews)
+
+    def close(self):
+        for writer in self._writers.values():
+            writer.close()
+        self._writers = {}
+        logging.info(f"Parquet: {self.rows_written} review ditulis ke {self.base_dir}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _open_dataset(base_dir, ratings=None, scrape_dates=None):
+    """Dataset Parquet + filter partisi untuk rating / tanggal scraping"""
+    _require_pyarrow()
+    dataset = ds.dataset(
+        base_dir,
+        format='parquet',
+        partitioning=ds.partitioning(partitioning_schema(), flavor='hive')
+    )
+
+    filter_expr = None
+    if ratings is not None:
+        filter_expr = ds.field('rating').isin([int(rating) for rating in ratings])
+    if scrape_dates is not None:
+        date_filter = ds.field('scrape_date').isin([str(date) for date in scrape_dates])
+        filter_expr = date_filter if filter_expr is None else filter_expr & date_filter
+    return dataset, filter_expr
+
+
+def read_reviews(base_dir, columns=None, ratings=None, scrape_dates=None, as_pandas=True):
+    """
+    Membaca review dari dataset Parquet yang dipartisi
+
+    Args:
+        base_dir: Folder root dataset Parquet
+        columns: Kolom yang dibaca (default: semua). Kolom partisi
+            `rating` dan `scrape_date` juga bisa dipilih.
+        ratings: List rating yang dibaca (partition pruning)
+        scrape_dates: List tanggal scraping (YYYY-MM-DD) yang dibaca
+        as_pandas: Return pandas DataFrame (True) atau Arrow Table (False)
+    """
+    dataset, filter_expr = _open_dataset(base_dir, ratings, scrape_dates)
+    table = dataset.to_table(columns=columns, filter=filter_expr)
+    return table.to_pandas() if as_pandas else table
+
+
+def iter_review_batches(base_dir, batch_size=10000, columns=None, ratings=None, scrape_dates=None,
+                        shuffle=True, seed=42):
+    """
+    Membaca review per batch tanpa memuat seluruh dataset ke memori
+
+    Dataset dipartisi per rating, sehingga pembacaan berurutan akan
+    menghasilkan batch yang hanya berisi satu rating. Dengan `shuffle=True`
+    setiap batch diisi potongan kecil dari semua file, dipilih secara acak
+    sebanding dengan sisa baris tiap file, lalu diacak - distribusi rating
+    per batch mendekati distribusi keseluruhan.
+
+    Args:
+        base_dir: Folder root dataset Parquet
+        batch_size: Jumlah baris per batch
+        columns: Kolom yang dibaca (default: semua)
+        ratings: List rating yang dibaca (partition pruning)
+        scrape_dates: List tanggal scraping (YYYY-MM-DD) yang dibaca
+        shuffle: Campur partisi dan acak urutan baris dalam batch
+        seed: Seed untuk pengacakan
+
+    Yields:
+        pandas DataFrame dengan maksimal `batch_size` baris
+    """
+    dataset, filter_expr = _open_dataset(base_dir, ratings, scrape_dates)
+    # Filter hanya menyentuh kolom partisi, jadi cukup untuk memilih file
+    fragments = list(dataset.get_fragments(filter=filter_expr))
+    rng = np.random.default_rng(seed)
+
+    # Tanpa shuffle: satu scanner berurutan atas semua file
+    read_size = max(1, batch_size // 32) if shuffle else batch_size
+    scanners = [
+        ds.Scanner.from_fragment(
+            fragment, schema=dataset.schema, columns=columns, batch_size=read_size
+        ).to_batches()
+        for fragment in fragments
+    ]
+    remaining = np.array([fragment.count_rows() for fragment in fragments], dtype=np.float64)
+
+    buffer, buffered = [], 0
+    while remaining.sum() > 0:
+        if shuffle:
+            index = rng.choice(len(scanners), p=remaining / remaining.sum())
+        else:
+            index = int(np.flatnonzero(remaining)[0])
+        record_batch = next(scanners[index], None)
+        if record_batch is None:
+            remaining[index] = 0
+            continue
+        remaining[index] = max(remaining[index] - record_batch.num_rows, 0)
+        if record_batch.num_rows == 0:
+            continue
+        buffer.append(record_batch.to_pandas())
+        buffered += record_batch.num_rows
+
+        while buffered >= batch_size:
+            frame = _concat_batch(buffer, rng if shuffle else None)
+            yield frame.iloc[:batch_size].reset_index(drop=True)
+            buffer = [frame.iloc[batch_size:]] if len(frame) > batch_size else []
+            buffered = len(frame) - batch_size
+
+    if buffered:
+        yield _concat_batch(buffer, rng if shuffle else None).reset_index(drop=True)
+
+
+def _concat_batch(frames, rng=None):
+    frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+    return frame.iloc[rng.permutation(len(frame))] if rng is not None else frame
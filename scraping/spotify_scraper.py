@@ -5,9 +5,9 @@ Script untuk mengambil review aplikasi Spotify dari Google Play Store
 menggunakan google-play-scraper library.
 """
 
-import requests
+import argparse
+import copy
 import json
-import pandas as pd
 import time
 import os
 from google_play_scraper import app, reviews, Sort
@@ -15,6 +15,17 @@ from fake_useragent import UserAgent
 from datetime import datetime
 import logging
 
+from checkpoint import CheckpointStore
+from concurrent_scraper import (
+    ConcurrentReviewScraper, build_streams, print_controller_report, print_throughput_report
+)
+from rate_limiter import AdaptiveController
+from review_batch import ANALYSIS_FIELDS, ReviewBatch, as_batch, normalize_fields
+from review_index import ReviewIndex, SeenIds
+from review_stats import ReviewStats
+from review_storage import ParquetReviewWriter
+from transport import CACHE_MODES, PlayStoreFetchError, PlayStoreTransport
+
 # Setup logging - simpan log di folder scraping
 log_dir = os.path.dirname(__file__)
 os.makedirs(log_dir, exist_ok=True)
@@ -29,23 +40,28 @@ logging.basicConfig(
 )
 
 class SpotifyReviewScraper:
-    def __init__(self):
+    def __init__(self, fetch_fn=None, transport=None, fields=None):
         self.app_id = 'com.spotify.music'
+        # Fungsi pengambil review, bisa diganti stand-in lokal untuk testing
+        self.fetch_reviews = fetch_fn or reviews
+        # Field review yang disimpan (proyeksi saat fetch, default semua field)
+        self.fields = normalize_fields(fields)
         self.ua = UserAgent()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': self.ua.random,
-            'Accept-Language': 'en-US,en;q=0.9,id;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-        })
+        
+        # Semua request Play Store (reviews() dan app()) lewat satu session keep-alive
+        self.transport = transport or PlayStoreTransport()
+        self.transport.session.headers['User-Agent'] = self.ua.random
+        self.session = self.transport.session
+        if fetch_fn is None:
+            self.transport.install()
         
         # Setup dataset directory dengan subfolder
         self.dataset_dir = os.path.join(os.path.dirname(__file__), '..', 'dataset')
         self.csv_dir = os.path.join(self.dataset_dir, 'csv')
         self.json_dir = os.path.join(self.dataset_dir, 'json')
+        self.parquet_dir = os.path.join(self.dataset_dir, 'parquet')
+        self.checkpoint_dir = os.path.join(self.dataset_dir, 'checkpoints')
+        self.index_path = os.path.join(self.dataset_dir, 'review_index.json')
         
         # Buat semua direktori
         os.makedirs(self.csv_dir, exist_ok=True)
@@ -81,6 +97,10 @@ class SpotifyReviewScraper:
             logging.error(f"Error mengambil informasi aplikasi: {str(e)}")
             return None
 
+    def _to_batch(self, result=()):
+        """Memetakan hasil google-play-scraper ke ReviewBatch kolumnar (hanya self.fields)"""
+        return ReviewBatch.from_raw(result, self.fields)
+
     def scrape_reviews_google_play_scraper(self, count=1000, sort_type=Sort.NEWEST):
         """
         Mengambil review menggunakan google-play-scraper library
@@ -92,7 +112,7 @@ class SpotifyReviewScraper:
         try:
             logging.info(f"Mengambil {count} review menggunakan google-play-scraper...")
             
-            result, continuation_token = reviews(
+            result, continuation_token = self.fetch_reviews(
                 self.app_id,
                 lang='en',
                 country='us',
@@ -101,36 +121,21 @@ class SpotifyReviewScraper:
                 filter_score_with=None
             )
             
-            reviews_data = []
-            for review in result:
-                review_data = {
-                    'reviewId': review.get('reviewId'),
-                    'userName': review.get('userName'),
-                    'userImage': review.get('userImage'),
-                    'content': review.get('content'),
-                    'score': review.get('score'),
-                    'thumbsUpCount': review.get('thumbsUpCount', 0),
-                    'reviewCreatedVersion': review.get('reviewCreatedVersion'),
-                    'at': review.get('at'),
-                    'replyContent': review.get('replyContent'),
-                    'replyAt': review.get('replyAt'),
-                    'appVersion': review.get('appVersion')
-                }
-                reviews_data.append(review_data)
+            reviews_data = self._to_batch(result)
             
             logging.info(f"Berhasil mengambil {len(reviews_data)} review")
             return reviews_data, continuation_token
             
         except Exception as e:
             logging.error(f"Error scraping dengan google-play-scraper: {str(e)}")
-            return [], None
+            return self._to_batch(), None
 
     def scrape_more_reviews(self, continuation_token, count=500):
         """Mengambil lebih banyak review menggunakan continuation token"""
         try:
             logging.info(f"Mengambil {count} review tambahan...")
             
-            result, continuation_token = reviews(
+            result, continuation_token = self.fetch_reviews(
                 self.app_id,
                 continuation_token=continuation_token,
                 lang='en',
@@ -139,36 +144,21 @@ class SpotifyReviewScraper:
                 count=count
             )
             
-            reviews_data = []
-            for review in result:
-                review_data = {
-                    'reviewId': review.get('reviewId'),
-                    'userName': review.get('userName'),
-                    'userImage': review.get('userImage'),
-                    'content': review.get('content'),
-                    'score': review.get('score'),
-                    'thumbsUpCount': review.get('thumbsUpCount', 0),
-                    'reviewCreatedVersion': review.get('reviewCreatedVersion'),
-                    'at': review.get('at'),
-                    'replyContent': review.get('replyContent'),
-                    'replyAt': review.get('replyAt'),
-                    'appVersion': review.get('appVersion')
-                }
-                reviews_data.append(review_data)
+            reviews_data = self._to_batch(result)
             
             logging.info(f"Berhasil mengambil {len(reviews_data)} review tambahan")
             return reviews_data, continuation_token
             
         except Exception as e:
             logging.error(f"Error mengambil review tambahan: {str(e)}")
-            return [], None
+            return self._to_batch(), None
 
     def scrape_reviews_by_rating(self, rating, count=200):
         """Mengambil review berdasarkan rating tertentu (1-5)"""
         try:
             logging.info(f"Mengambil {count} review dengan rating {rating}...")
             
-            result, _ = reviews(
+            result, _ = self.fetch_reviews(
                 self.app_id,
                 lang='en',
                 country='us',
@@ -177,96 +167,193 @@ class SpotifyReviewScraper:
                 filter_score_with=rating
             )
             
-            reviews_data = []
-            for review in result:
-                review_data = {
-                    'reviewId': review.get('reviewId'),
-                    'userName': review.get('userName'),
-                    'userImage': review.get('userImage'),
-                    'content': review.get('content'),
-                    'score': review.get('score'),
-                    'thumbsUpCount': review.get('thumbsUpCount', 0),
-                    'reviewCreatedVersion': review.get('reviewCreatedVersion'),
-                    'at': review.get('at'),
-                    'replyContent': review.get('replyContent'),
-                    'replyAt': review.get('replyAt'),
-                    'appVersion': review.get('appVersion')
-                }
-                reviews_data.append(review_data)
+            reviews_data = self._to_batch(result)
             
             logging.info(f"Berhasil mengambil {len(reviews_data)} review dengan rating {rating}")
             return reviews_data
             
         except Exception as e:
             logging.error(f"Error mengambil review rating {rating}: {str(e)}")
-            return []
+            return self._to_batch()
 
-    def scrape_large_dataset_by_rating(self, rating, target_count=3000, batch_size=500):
+    def iter_reviews_by_rating(self, rating, batch_size=500, continuation_token=None, seen_ids=None,
+                               lang='en', country='us'):
+        """
+        Iterator halaman review untuk rating tertentu menggunakan continuation token
+        
+        Setiap halaman melanjutkan dari halaman sebelumnya (bukan mengambil ulang
+        review terbaru), dan duplikasi disaring dengan satu set reviewId persisten
+        sehingga biaya per review O(1).
+        
+        Args:
+            rating: Rating yang ingin diambil (1-5)
+            batch_size: Jumlah review per request
+            continuation_token: Token untuk melanjutkan dari halaman tertentu
+            seen_ids: Set reviewId yang sudah dimiliki (diperbarui di tempat)
+            lang, country: Bahasa dan negara Play Store
+        
+        Yields:
+            (new_reviews, continuation_token) untuk setiap halaman (new_reviews: ReviewBatch)
+        """
+        seen_ids = set() if seen_ids is None else seen_ids
+        token = continuation_token
+        
+        while True:
+            result, token = self.fetch_reviews(
+                self.app_id,
+                lang=lang,
+                country=country,
+                sort=Sort.NEWEST,
+                count=batch_size,
+                filter_score_with=rating,
+                continuation_token=token
+            )
+            
+            if not result:
+                return
+            
+            yield self._to_batch(result).filter_new(seen_ids), token
+            
+            # Halaman terakhir: google-play-scraper mengembalikan token kosong
+            if token is None or getattr(token, 'token', True) is None:
+                return
+
+    def fetch_rating_page(self, rating, count, continuation_token=None, lang='en', country='us'):
+        """
+        Mengambil satu halaman review dan mengukur latency-nya untuk AdaptiveController
+        
+        reviews() milik library menelan error (hasilnya halaman kosong dengan
+        token None); error dan rate limit dideteksi lewat sinyal transport dan
+        dinaikkan sebagai PlayStoreFetchError agar pemanggil bisa mengulang
+        dari token sebelumnya.
+        
+        Args:
+            rating: Rating yang ingin diambil (1-5), atau None untuk semua rating
+            count: Jumlah review yang diminta
+            continuation_token: Token halaman sebelumnya
+            lang, country: Bahasa dan negara Play Store
+        
+        Returns:
+            (reviews_data, continuation_token, latency) dengan reviews_data berupa ReviewBatch
+        """
+        if continuation_token is not None and hasattr(continuation_token, 'count'):
+            # Library memakai count dari token, jadi page size baru harus diset di token
+            continuation_token = copy.copy(continuation_token)
+            continuation_token.count = count
+        
+        errors_before, throttled_before = self.transport.thread_signals()
+        started = time.monotonic()
+        result, next_token = self.fetch_reviews(
+            self.app_id,
+            lang=lang,
+            country=country,
+            sort=Sort.NEWEST,
+            count=count,
+            filter_score_with=rating,
+            continuation_token=continuation_token
+        )
+        latency = time.monotonic() - started
+        errors_after, throttled_after = self.transport.thread_signals()
+        
+        if not result and (errors_after > errors_before or throttled_after > throttled_before):
+            throttled = throttled_after > throttled_before
+            reason = "rate limit" if throttled else "error"
+            raise PlayStoreFetchError(f"Request rating {rating} ({lang}-{country}) gagal: {reason}", throttled=throttled)
+        return self._to_batch(result), next_token, latency
+
+    def scrape_large_dataset_by_rating(self, rating, target_count=3000, batch_size=500, delay=2, checkpoint=None,
+                                       controller=None, parquet_writer=None):
         """
         Mengambil dataset besar untuk rating tertentu dengan batch processing
         
+        Page size dan jeda antar batch diatur oleh AdaptiveController: naik
+        selama request lancar, turun dan backoff saat error atau rate limit.
+        Request yang gagal diulang dari token terakhir sampai controller
+        menyerah (exhausted).
+        
         Args:
             rating: Rating yang ingin diambil (1-5)
             target_count: Target jumlah review
-            batch_size: Ukuran setiap batch
+            batch_size: Page size awal (jika controller tidak diberikan)
+            delay: Jeda awal (detik) antar batch (jika controller tidak diberikan)
+            checkpoint: CheckpointStore opsional; setiap batch disimpan ke disk
+                dan progres sebelumnya dilanjutkan jika ada
+            controller: AdaptiveController opsional, bisa dipakai bersama antar
+                rating agar laju yang sudah dipelajari tidak hilang
+            parquet_writer: ParquetReviewWriter opsional; setiap batch langsung
+                ditulis ke dataset Parquet begitu diterima
         """
-        all_reviews = []
-        collected = 0
+        if controller is None:
+            controller = AdaptiveController(page_size=batch_size, rate=1.0 / delay if delay > 0 else 1.0)
+        
+        all_reviews = self._to_batch()
+        seen_ids = set()
+        token = None
+        batch_num = 0
+        last_page = False
+        stream_key = f"rating{rating}_en_us"
+        
+        if checkpoint is not None:
+            previous = checkpoint.stream_state(stream_key)
+            if previous:
+                all_reviews.extend(checkpoint.load_reviews(stream_key))
+                seen_ids = set(all_reviews.review_ids)
+                token = previous['token']
+                print(f"   ♻️ Melanjutkan dari checkpoint: {len(all_reviews)} review sudah tersimpan")
+                if previous['done']:
+                    return all_reviews
         
         try:
-            # Hitung jumlah batch yang dibutuhkan
-            num_batches = (target_count + batch_size - 1) // batch_size  # Ceiling division
-            
-            for batch_num in range(num_batches):
-                remaining = target_count - collected
-                current_batch_size = min(batch_size, remaining)
+            while len(all_reviews) < target_count:
+                count = min(controller.page_size, target_count - len(all_reviews))
+                try:
+                    page, next_token, latency = self.fetch_rating_page(rating, count, continuation_token=token)
+                except Exception as e:
+                    backoff = controller.record_failure(throttled=getattr(e, 'throttled', False))
+                    if controller.exhausted:
+                        print(f"   ❌ Gagal {controller.consecutive_failures}x berturut-turut pada batch {batch_num + 1}")
+                        break
+                    print(f"   ❌ Error pada batch {batch_num + 1}: {str(e)}")
+                    print(f"   🔄 Backoff {backoff:.1f}s, mencoba ulang dengan page size {controller.page_size}...")
+                    time.sleep(backoff)
+                    continue
                 
-                if current_batch_size <= 0:
+                controller.record_success(latency, len(page))
+                if not page:
+                    print(f"   ⚠️ Tidak ada review lanjutan untuk rating {rating}")
+                    last_page = True
                     break
                 
-                print(f"   📦 Batch {batch_num + 1}/{num_batches} - Target: {current_batch_size} review")
+                batch_num += 1
+                token = next_token
+                new_reviews = page.filter_new(seen_ids, limit=target_count - len(all_reviews))
+                all_reviews.extend(new_reviews)
+                if checkpoint is not None:
+                    checkpoint.append_batch(stream_key, new_reviews, token)
+                if parquet_writer is not None and len(new_reviews):
+                    parquet_writer.write_batch(new_reviews)
                 
-                try:
-                    batch_reviews = self.scrape_reviews_by_rating(rating, count=current_batch_size)
-                    
-                    if batch_reviews:
-                        # Filter duplikasi berdasarkan reviewId
-                        existing_ids = {review['reviewId'] for review in all_reviews}
-                        new_reviews = [r for r in batch_reviews if r['reviewId'] not in existing_ids]
-                        
-                        all_reviews.extend(new_reviews)
-                        collected = len(all_reviews)
-                        
-                        print(f"   ✅ Batch {batch_num + 1}: +{len(new_reviews)} review baru (total: {collected})")
-                    else:
-                        print(f"   ⚠️ Batch {batch_num + 1}: Tidak ada review ditemukan")
-                    
-                    # Delay antar batch
-                    time.sleep(2)
-                    
-                    # Break jika sudah mencapai target
-                    if collected >= target_count:
-                        print(f"   🎯 Target {target_count} review tercapai!")
-                        break
-                        
-                except Exception as e:
-                    print(f"   ❌ Error pada batch {batch_num + 1}: {str(e)}")
-                    # Coba dengan batch size lebih kecil
-                    try:
-                        smaller_batch = current_batch_size // 2
-                        if smaller_batch > 0:
-                            print(f"   🔄 Mencoba ulang dengan batch size {smaller_batch}...")
-                            batch_reviews = self.scrape_reviews_by_rating(rating, count=smaller_batch)
-                            if batch_reviews:
-                                existing_ids = {review['reviewId'] for review in all_reviews}
-                                new_reviews = [r for r in batch_reviews if r['reviewId'] not in existing_ids]
-                                all_reviews.extend(new_reviews)
-                                collected = len(all_reviews)
-                                print(f"   ✅ Berhasil: +{len(new_reviews)} review")
-                    except:
-                        print(f"   ❌ Gagal total pada batch {batch_num + 1}")
-                        continue
+                print(f"   ✅ Batch {batch_num}: +{len(new_reviews)} review baru (total: {len(all_reviews)}) "
+                      f"- page {count}, {latency:.1f}s")
+                
+                # Break jika sudah mencapai target
+                if len(all_reviews) >= target_count:
+                    print(f"   🎯 Target {target_count} review tercapai!")
+                    break
+                
+                # Halaman terakhir: google-play-scraper mengembalikan token kosong
+                if token is None or getattr(token, 'token', True) is None:
+                    print(f"   ⚠️ Tidak ada review lanjutan untuk rating {rating}")
+                    last_page = True
+                    break
+                
+                # Jeda antar batch dari controller (dengan jitter)
+                time.sleep(controller.next_delay())
             
+            # Hanya stream yang tuntas ditandai selesai; yang menyerah karena gagal
+            # tetap bisa dilanjutkan dari token terakhir dengan --resume
+            if checkpoint is not None and (last_page or len(all_reviews) >= target_count):
+                checkpoint.mark_stream_done(stream_key)
             logging.info(f"Selesai mengambil {len(all_reviews)} review untuk rating {rating}")
             return all_reviews
             
@@ -274,16 +361,131 @@ class SpotifyReviewScraper:
             logging.error(f"Error dalam scrape_large_dataset_by_rating: {str(e)}")
             return all_reviews
 
-    def save_to_csv(self, data, filename=None):
+    def load_review_index(self):
+        """
+        Memuat index reviewId; jika belum ada, dibangun dari file dataset yang sudah ada
+        """
+        index = ReviewIndex(self.index_path)
+        if len(index) == 0:
+            index.rebuild_from_dataset(self.csv_dir, self.json_dir)
+        return index
+
+    def scrape_new_reviews_by_rating(self, rating, index, batch_size=200, max_count=3000, delay=1):
+        """
+        Mengambil hanya review baru sejak run terakhir untuk rating tertentu
+        
+        Review diambil dengan sort NEWEST dan berhenti begitu halaman berisi
+        review yang sudah ada di index (reviewId dikenal atau `at` tidak lebih
+        baru dari watermark rating tersebut).
+        
+        Args:
+            rating: Rating yang ingin diambil (1-5)
+            index: ReviewIndex berisi review yang sudah tersimpan
+            batch_size: Jumlah review per request
+            max_count: Batas atas review baru (pengaman jika index masih kosong)
+            delay: Jeda (detik) antar request
+        """
+        watermark = index.watermark(rating)
+        # Cek langsung ke index; hanya reviewId dari run ini yang disimpan terpisah
+        seen_ids = SeenIds(index)
+        delta = []
+        requests_made = 0
+        
+        try:
+            for new_reviews, _ in self.iter_reviews_by_rating(rating, batch_size=batch_size, seen_ids=seen_ids):
+                requests_made += 1
+                fresh = [
+                    review for review in new_reviews
+                    if watermark is None or review.get('at') is None or review['at'] > watermark
+                ]
+                delta.extend(fresh)
+                
+                # Halaman tidak penuh berarti sudah bertemu review lama (atau halaman terakhir)
+                if len(fresh) < batch_size or len(delta) >= max_count:
+                    break
+                
+                time.sleep(delay)
+                
+        except Exception as e:
+            logging.error(f"Error mengambil review baru rating {rating}: {str(e)}")
+        
+        logging.info(f"Rating {rating}: {len(delta)} review baru dari {requests_made} request")
+        return self._to_batch(delta[:max_count])
+
+    def fetch_review_page(self, stream, count, continuation_token=None):
+        """
+        Mengambil satu halaman review untuk sebuah ReviewStream
+
+        Berbeda dengan method scrape_* lainnya, error tidak ditangkap di sini
+        agar engine concurrent bisa menghitung dan mengulang request
+        (PlayStoreFetchError jika library menelan error / rate limit).
+
+        Returns:
+            (reviews_data, continuation_token)
+        """
+        reviews_data, continuation_token, _ = self.fetch_rating_page(
+            stream.rating,
+            count,
+            continuation_token=continuation_token,
+            lang=stream.lang,
+            country=stream.country
+        )
+        return reviews_data, continuation_token
+
+    def scrape_concurrent(self, streams, rate=2.0, burst=5, page_size=200, max_workers=None, checkpoint=None,
+                          controller=None, review_stats=None, parquet_writer=None):
+        """
+        Mengambil banyak stream review secara paralel dengan rate limiter bersama
+
+        Args:
+            streams: List ReviewStream (lihat concurrent_scraper.build_streams)
+            rate: Total request per detik untuk semua stream
+            burst: Jumlah request yang boleh dikirim sekaligus
+            page_size: Jumlah review per request
+            max_workers: Jumlah thread (default: satu per stream)
+            checkpoint: CheckpointStore opsional untuk menyimpan dan melanjutkan progres
+            controller: AdaptiveController opsional; jika ada, page size dan rate
+                limiter bersama diatur dari latency/error/throttling
+            review_stats: ReviewStats opsional yang di-update live setiap halaman
+            parquet_writer: ParquetReviewWriter opsional untuk menulis setiap
+                halaman ke dataset Parquet selama scraping
+
+        Returns:
+            (all_reviews, stats_per_stream, total_elapsed)
+        """
+        engine = ConcurrentReviewScraper(
+            self.fetch_review_page,
+            rate=rate,
+            burst=burst,
+            page_size=page_size,
+            max_workers=max_workers,
+            checkpoint=checkpoint,
+            controller=controller,
+            collection_factory=self._to_batch,
+            review_stats=review_stats,
+            parquet_writer=parquet_writer
+        )
+        logging.info(f"Memulai scraping paralel untuk {len(streams)} stream...")
+        return engine.scrape_streams(streams)
+
+    def create_checkpoint(self, meta=None):
+        """Membuat checkpoint baru di folder dataset/checkpoints"""
+        return CheckpointStore.create(self.checkpoint_dir, meta=meta)
+
+    def latest_checkpoint(self):
+        """Checkpoint terbaru yang belum selesai, atau None"""
+        return CheckpointStore.latest(self.checkpoint_dir)
+
+    def save_to_csv(self, data, filename=None, prefix='spotify_reviews'):
         """Menyimpan data ke file CSV di folder csv"""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"spotify_reviews_{timestamp}.csv"
+            filename = f"{prefix}_{timestamp}.csv"
         
         filepath = os.path.join(self.csv_dir, filename)
         
         try:
-            df = pd.DataFrame(data)
+            df = as_batch(data, self.fields).to_pandas()
             df.to_csv(filepath, index=False, encoding='utf-8')
             logging.info(f"Data berhasil disimpan ke {filepath}")
             return filepath
@@ -291,6 +493,28 @@ class SpotifyReviewScraper:
             logging.error(f"Error menyimpan ke CSV: {str(e)}")
             return None
 
+    def open_parquet_writer(self):
+        """ParquetReviewWriter ke folder parquet, untuk menulis batch selama scraping"""
+        return ParquetReviewWriter(self.parquet_dir)
+
+    def save_to_parquet(self, data, batch_size=5000):
+        """
+        Menyimpan data review ke dataset Parquet di folder parquet
+        
+        Review ditulis per batch ke partisi rating=<score>/scrape_date=<hari ini>
+        dengan kolom bertipe, sehingga notebook bisa membaca kolom/partisi tertentu saja.
+        """
+        try:
+            data = as_batch(data, self.fields)
+            with ParquetReviewWriter(self.parquet_dir) as writer:
+                for start in range(0, len(data), batch_size):
+                    writer.write_batch(data[start:start + batch_size])
+            logging.info(f"Data berhasil disimpan ke {self.parquet_dir}")
+            return self.parquet_dir
+        except Exception as e:
+            logging.error(f"Error menyimpan ke Parquet: {str(e)}")
+            return None
+
     def save_app_info_json(self, data, filename):
         """Menyimpan data ke file JSON di folder dataset utama"""
         filepath = os.path.join(self.dataset_dir, filename)
@@ -304,17 +528,17 @@ class SpotifyReviewScraper:
             logging.error(f"Error menyimpan ke JSON: {str(e)}")
             return None
 
-    def save_to_json(self, data, filename=None):
+    def save_to_json(self, data, filename=None, prefix='spotify_reviews'):
         """Menyimpan data review ke file JSON di folder json"""
         if not filename:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"spotify_reviews_{timestamp}.json"
+            filename = f"{prefix}_{timestamp}.json"
         
         filepath = os.path.join(self.json_dir, filename)
         
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+                json.dump(as_batch(data, self.fields).to_records(), f, indent=2, ensure_ascii=False, default=str)
             logging.info(f"Data berhasil disimpan ke {filepath}")
             return filepath
         except Exception as e:
@@ -322,42 +546,76 @@ class SpotifyReviewScraper:
             return None
 
     def analyze_reviews(self, reviews_data):
-        """Analisis sederhana dari data review"""
+        """
+        Analisis sederhana dari data review
+        
+        Dihitung lewat ReviewStats (agregat berjalan per kolom), tanpa
+        DataFrame penuh dan filter berulang; hasilnya bisa digabung dengan
+        statistik batch/partisi lain lewat ReviewStats.merge.
+        """
         if not reviews_data:
             return None
-        
-        df = pd.DataFrame(reviews_data)
-        
-        analysis = {
-            'total_reviews': len(df),
-            'average_rating': df['score'].mean(),
-            'rating_distribution': df['score'].value_counts().to_dict(),
-            'reviews_with_thumbs_up': len(df[df['thumbsUpCount'] > 0]),
-            'average_thumbs_up': df['thumbsUpCount'].mean(),
-            'reviews_with_replies': len(df[df['replyContent'].notna()]),
-            'most_recent_review': df['at'].max(),
-            'oldest_review': df['at'].min(),
-            'positive_reviews': len(df[df['score'] >= 4]),
-            'negative_reviews': len(df[df['score'] <= 2]),
-            'neutral_reviews': len(df[df['score'] == 3])
-        }
-        
-        # Tambah percentage
-        total = analysis['total_reviews']
-        analysis['positive_percentage'] = (analysis['positive_reviews'] / total) * 100
-        analysis['negative_percentage'] = (analysis['negative_reviews'] / total) * 100
-        analysis['neutral_percentage'] = (analysis['neutral_reviews'] / total) * 100
-        
-        return analysis
-
-def main():
+        return ReviewStats().update(reviews_data).to_analysis()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Spotify Google Play Store Review Scraper")
+    parser.add_argument(
+        '--resume',
+        nargs='?',
+        const='latest',
+        default=None,
+        metavar='CHECKPOINT_DIR',
+        help="Lanjutkan run yang terhenti dari checkpoint (default: checkpoint terbaru)"
+    )
+    parser.add_argument(
+        '--http-cache',
+        default=None,
+        metavar='CACHE_DIR',
+        help="Folder cache response Play Store untuk record/replay"
+    )
+    parser.add_argument(
+        '--cache-mode',
+        choices=[mode for mode in CACHE_MODES if mode != 'off'],
+        default='auto',
+        help="record: rekam response live, replay: hanya dari cache (offline), auto: cache lalu live"
+    )
+    parser.add_argument(
+        '--analysis-fields',
+        action='store_true',
+        help="Simpan hanya field yang dipakai analisis (tanpa userName/userImage) untuk menghemat memori"
+    )
+    parser.add_argument(
+        '--controller-log',
+        default=None,
+        metavar='JSON_FILE',
+        help="Simpan metrics dan keputusan adaptive controller (page size/rate/backoff) ke file JSON"
+    )
+    parser.add_argument(
+        '--no-stream-parquet',
+        dest='stream_parquet',
+        action='store_false',
+        help="Opsi 5/6: jangan tulis setiap batch langsung ke dataset Parquet selama scraping"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    
     print("="*70)
     print("   🎵 SPOTIFY GOOGLE PLAY STORE REVIEW SCRAPER 🎵")
     print("="*70)
     print("Script untuk mengambil review aplikasi Spotify dari Google Play Store")
     print("Data akan disimpan di folder 'dataset' untuk analisis sentiment\n")
     
-    scraper = SpotifyReviewScraper()
+    transport = PlayStoreTransport(
+        cache_dir=args.http_cache,
+        cache_mode=args.cache_mode if args.http_cache else 'off'
+    )
+    if args.http_cache:
+        print(f"🗄️ Cache HTTP: {args.http_cache} (mode: {args.cache_mode})\n")
+    scraper = SpotifyReviewScraper(transport=transport, fields=ANALYSIS_FIELDS if args.analysis_fields else None)
+    # Page size dan laju request diatur saat runtime dari latency/error/throttling
+    controller = AdaptiveController(page_size=200, rate=1.0)
     
     # Ambil informasi aplikasi
     app_info = scraper.get_app_info()
@@ -380,10 +638,40 @@ def main():
     print("3. Scrape review dalam batch besar (4000+ review)")
     print("4. Scrape review untuk analisis sentiment (balanced dataset)")
     print("5. Scrape dataset besar 15,000 review (3000 per rating)")
+    print("6. Scrape dataset besar secara paralel (semua rating + multi region)")
+    print("7. Scrape review baru sejak run terakhir (incremental)")
+    
+    checkpoint = None
+    if args.resume:
+        if args.resume == 'latest':
+            checkpoint = scraper.latest_checkpoint()
+        elif os.path.isdir(args.resume):
+            checkpoint = CheckpointStore(args.resume)
+        
+        if checkpoint is None or checkpoint.completed:
+            print("\n❌ Tidak ada checkpoint yang bisa dilanjutkan")
+            return
+        
+        choice = checkpoint.meta.get('choice')
+        print(f"\n♻️ Melanjutkan checkpoint: {checkpoint.checkpoint_dir}")
+        for stream_key, progress in checkpoint.summary().items():
+            status = "selesai" if progress['done'] else "berjalan"
+            print(f"   - {stream_key}: {progress['collected']:,} review ({status})")
+    else:
+        choice = input("\nPilih opsi (1-7): ").strip()
     
-    choice = input("\nPilih opsi (1-5): ").strip()
+    # Review disimpan kolumnar selama run (jauh lebih hemat dari list dict)
+    all_reviews = ReviewBatch(scraper.fields)
     
-    all_reviews = []
+    # Run besar (opsi 5/6) menulis setiap batch ke Parquet begitu diterima,
+    # sehingga data sudah aman di disk sebelum run selesai
+    parquet_writer = None
+    if args.stream_parquet and choice in ("5", "6"):
+        try:
+            parquet_writer = scraper.open_parquet_writer()
+            print(f"🗂️ Batch langsung ditulis ke dataset Parquet: {scraper.parquet_dir}")
+        except ImportError as e:
+            print(f"⚠️ {str(e)} - batch tidak di-stream ke Parquet")
     
     try:
         if choice == "1":
@@ -431,29 +719,35 @@ def main():
             print("\n📝 MENGAMBIL DATASET BESAR 15,000 REVIEW")
             print("=" * 50)
             print("Target: 3,000 review per rating (1-5 bintang)")
-            print("Metode: Batch processing dengan error handling")
+            print("Metode: Batch processing dengan page size dan jeda adaptif")
             print("Estimasi waktu: 5-10 menit")
             
-            confirm = input("\nLanjutkan? (y/n): ").strip().lower()
-            if confirm not in ['y', 'yes']:
-                print("❌ Dibatalkan oleh user")
-                return
+            if checkpoint is None:
+                confirm = input("\nLanjutkan? (y/n): ").strip().lower()
+                if confirm not in ['y', 'yes']:
+                    print("❌ Dibatalkan oleh user")
+                    return
+                checkpoint = scraper.create_checkpoint({'choice': choice})
+                print(f"💾 Checkpoint: {checkpoint.checkpoint_dir}")
             
             print("\n🚀 MEMULAI SCRAPING DATASET BESAR...")
             print("-" * 50)
             
             total_collected = 0
             rating_stats = {}
+            live_stats = ReviewStats()
             
             for rating in [1, 2, 3, 4, 5]:
                 print(f"\n⭐ RATING {rating} STARS")
                 print(f"🎯 Target: 3,000 review")
                 
-                # Gunakan method batch processing yang lebih robust
+                # Controller dipakai bersama agar laju yang sudah dipelajari terbawa ke rating berikutnya
                 rating_reviews = scraper.scrape_large_dataset_by_rating(
                     rating=rating, 
                     target_count=3000, 
-                    batch_size=3000  # Ukuran batch optimal
+                    checkpoint=checkpoint,
+                    controller=controller,
+                    parquet_writer=parquet_writer
                 )
                 
                 all_reviews.extend(rating_reviews)
@@ -463,10 +757,18 @@ def main():
                 print(f"📊 Rating {rating}: {len(rating_reviews)} review berhasil dikumpulkan")
                 print(f"� Progress total: {total_collected}/15,000 review")
                 
-                # Delay antar rating untuk menghindari rate limiting
+                # Statistik live: hanya agregat yang di-update, bukan analisis ulang semua review
+                live_stats.update(rating_reviews)
+                live = live_stats.to_analysis()
+                if live:
+                    print(f"📈 Live: rata-rata rating {live['average_rating'] or 0:.2f}, "
+                          f"median panjang review {live['content_length_quantiles']['p50'] or 0:.0f} karakter")
+                
+                print(f"🎛️ Page size: {controller.page_size}, rate: {controller.rate:.2f} req/detik")
+                
+                # Jeda antar rating dari controller
                 if rating < 5:  # Tidak delay setelah rating terakhir
-                    print("⏱️ Delay 5 detik sebelum rating berikutnya...")
-                    time.sleep(5)
+                    time.sleep(controller.next_delay())
             
             print(f"\n🎉 SCRAPING SELESAI!")
             print("=" * 50)
@@ -483,6 +785,48 @@ def main():
             else:
                 print("❌ Dataset kurang dari target, mungkin perlu mencoba lagi")
         
+        elif choice == "6":
+            # Scrape paralel: semua rating (dan region tambahan) sekaligus
+            print("\n📝 MENGAMBIL DATASET BESAR SECARA PARALEL")
+            print("=" * 50)
+            if checkpoint is None:
+                target = int(input("Target review per rating per region (default 3000): ").strip() or 3000)
+                extra = input("Region tambahan lang-country, pisahkan koma (contoh: en-gb,en-in) [kosongkan jika tidak ada]: ").strip()
+                
+                regions = [('en', 'us')]
+                for pair in [p.strip() for p in extra.split(',') if p.strip()]:
+                    lang, country = pair.split('-', 1)
+                    regions.append((lang.lower(), country.lower()))
+                
+                checkpoint = scraper.create_checkpoint({'choice': choice, 'target': target, 'regions': regions})
+                print(f"💾 Checkpoint: {checkpoint.checkpoint_dir}")
+            else:
+                target = checkpoint.meta['target']
+                regions = [tuple(region) for region in checkpoint.meta['regions']]
+            
+            streams = build_streams(regions=regions, target_count=target)
+            print(f"🚀 Menjalankan {len(streams)} stream paralel dengan rate limiter bersama...")
+            
+            all_reviews, stream_stats, total_elapsed = scraper.scrape_concurrent(
+                streams, checkpoint=checkpoint, controller=controller, review_stats=ReviewStats(),
+                parquet_writer=parquet_writer
+            )
+            print_throughput_report(stream_stats, total_elapsed)
+        
+        elif choice == "7":
+            # Scrape incremental: hanya review baru sejak run terakhir
+            print("\n📝 MENGAMBIL REVIEW BARU (INCREMENTAL)")
+            print("=" * 50)
+            index = scraper.load_review_index()
+            print(f"📚 Review index: {len(index):,} review sudah tersimpan")
+            
+            for rating in [1, 2, 3, 4, 5]:
+                watermark = index.watermark(rating)
+                print(f"\n⭐ Rating {rating} - review terbaru yang dikenal: {watermark or '-'}")
+                delta = scraper.scrape_new_reviews_by_rating(rating, index)
+                all_reviews.extend(delta)
+                print(f"   ✅ {len(delta)} review baru")
+        
         else:
             print("❌ Pilihan tidak valid!")
             return
@@ -501,6 +845,8 @@ def main():
                 print(f"Rating Rata-rata: {analysis['average_rating']:.2f}")
                 print(f"Distribusi Rating: {analysis['rating_distribution']}")
                 print(f"Reviews dengan Thumbs Up: {analysis['reviews_with_thumbs_up']}")
+                print(f"Thumbs Up: rata-rata {analysis['average_thumbs_up']:.1f} "
+                      f"(std {analysis['thumbs_up_std']:.1f}, p90 {analysis['thumbs_up_quantiles']['p90']:.0f})")
                 print(f"Reviews dengan Balasan: {analysis['reviews_with_replies']}")
                 
                 print(f"\n📈 SENTIMENT DISTRIBUTION:")
@@ -512,26 +858,49 @@ def main():
             print(f"\n📖 PREVIEW REVIEW:")
             print("-" * 50)
             for i, review in enumerate(all_reviews[:3]):
-                stars = "⭐" * review.get('score', 0)
-                print(f"{i+1}. {review.get('userName', 'Unknown')} - {stars}")
-                content = review.get('content', '')[:100]
-                print(f"   \"{content}{'...' if len(review.get('content', '')) > 100 else ''}\"")
-                print(f"   👍 {review.get('thumbsUpCount', 0)} helpful")
+                # ReviewRecord selalu punya semua key (None jika field tidak disimpan)
+                stars = "⭐" * (review.get('score') or 0)
+                print(f"{i+1}. {review.get('userName') or 'Unknown'} - {stars}")
+                content = review.get('content') or ''
+                print(f"   \"{content[:100]}{'...' if len(content) > 100 else ''}\"")
+                print(f"   👍 {review.get('thumbsUpCount') or 0} helpful")
                 print()
             
             # Simpan data
-            save_format = input("💾 Pilih format penyimpanan (csv/json/both): ").strip().lower()
+            parquet_dir = None
+            if parquet_writer is not None:
+                parquet_writer.close()
+                parquet_dir = scraper.parquet_dir
+                print(f"✅ {parquet_writer.rows_written:,} review sudah tersimpan di dataset Parquet: {parquet_dir}")
+                save_format = input("💾 Export tambahan (csv/json/both/none): ").strip().lower()
+            else:
+                save_format = input("💾 Pilih format penyimpanan (csv/json/parquet/both/all): ").strip().lower()
+            
+            # Hasil incremental disimpan sebagai partisi delta terpisah
+            prefix = 'spotify_reviews_delta' if choice == "7" else 'spotify_reviews'
+            csv_file = json_file = None
             
-            if save_format in ['csv', 'both']:
-                csv_file = scraper.save_to_csv(all_reviews)
+            if save_format in ['csv', 'both', 'all']:
+                csv_file = scraper.save_to_csv(all_reviews, prefix=prefix)
                 if csv_file:
                     print(f"✅ Data tersimpan dalam file CSV: {csv_file}")
             
-            if save_format in ['json', 'both']:
-                json_file = scraper.save_to_json(all_reviews)
+            if save_format in ['json', 'both', 'all']:
+                json_file = scraper.save_to_json(all_reviews, prefix=prefix)
                 if json_file:
                     print(f"✅ Data tersimpan dalam file JSON: {json_file}")
             
+            if save_format in ['parquet', 'all'] and parquet_writer is None:
+                parquet_dir = scraper.save_to_parquet(all_reviews)
+                if parquet_dir:
+                    print(f"✅ Data tersimpan dalam dataset Parquet: {parquet_dir}")
+            
+            # Catat review yang sudah tersimpan agar run incremental berikutnya bisa berhenti lebih awal
+            if csv_file or json_file or parquet_dir:
+                index = scraper.load_review_index()
+                index.add_reviews(all_reviews)
+                index.save()
+            
             # Simpan juga informasi aplikasi dan analisis
             if app_info:
                 app_file = scraper.save_app_info_json(app_info, "spotify_app_info.json")
@@ -542,17 +911,40 @@ def main():
                 analysis_file = scraper.save_app_info_json(analysis, "spotify_analysis.json")
                 if analysis_file:
                     print(f"✅ Hasil analisis tersimpan: {analysis_file}")
+            
+            # Data sudah tersimpan, checkpoint tidak perlu dilanjutkan lagi
+            if checkpoint is not None:
+                checkpoint.mark_completed()
         
         else:
             print("❌ Tidak ada review yang berhasil diambil!")
     
     except KeyboardInterrupt:
         print("\n⏹️ Scraping dihentikan oleh user...")
+        if checkpoint is not None:
+            print(f"💾 Progress tersimpan di {checkpoint.checkpoint_dir}")
+            print("   Jalankan 'python spotify_scraper.py --resume' untuk melanjutkan")
     except ValueError as e:
         print(f"\n❌ Input tidak valid: {str(e)}")
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
         logging.error(f"Error dalam main: {str(e)}")
+    finally:
+        if parquet_writer is not None:
+            parquet_writer.close()
+    
+    if controller.counters['requests']:
+        print_controller_report(controller)
+        if args.controller_log:
+            with open(args.controller_log, 'w', encoding='utf-8') as f:
+                json.dump({'metrics': controller.metrics(), 'decisions': controller.decisions()}, f, indent=2)
+            print(f"🎛️ Log controller tersimpan: {args.controller_log}")
+    
+    transport_stats = scraper.transport.summary()
+    print(f"\n🌐 Transport: {transport_stats['requests']} request live "
+          f"(rata-rata {transport_stats['avg_request_ms']:.0f} ms, {transport_stats['bytes'] / 1e6:.1f} MB), "
+          f"{transport_stats['cache_hits']} dari cache, {transport_stats['throttled']} rate limit")
+    scraper.transport.close()
     
     print("\n🎉 Selesai! Data review Spotify siap untuk analisis sentiment.")
     print("\nFile tersimpan di folder 'dataset' dapat digunakan untuk:")
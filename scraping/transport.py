@@ -0,0 +1,318 @@
+"""
+Transport HTTP untuk Spotify Review Scraper
+
+google-play-scraper membuka koneksi baru (urllib) untuk setiap request,
+sehingga setiap halaman review membayar DNS + TCP + TLS handshake lagi.
+PlayStoreTransport mengganti fungsi `post`/`get` milik library dengan satu
+requests.Session bersama (connection pool keep-alive, gzip), dan opsional
+menyimpan setiap response ke cache di disk untuk diputar ulang:
+
+    off     - selalu request live (default)
+    record  - request live, response disimpan ke cache
+    replay  - hanya dari cache (offline); cache miss -> CacheMissError, yang
+              oleh reviews() milik library dijadikan halaman kosong (stream selesai)
+    auto    - dari cache jika ada, selain itu live lalu disimpan
+
+Cache di-key dengan hash dari method + URL + body request (body review
+berisi app id, sort, count, filter rating dan pagination token), sehingga
+urutan halaman yang direkam bisa diputar ulang persis untuk dev/test dan
+benchmark tanpa jaringan.
+
+Karena reviews() milik library menelan semua exception (hasilnya halaman
+kosong), transport juga mencatat error dan throttling per thread; scraper
+membandingkan thread_signals() sebelum dan sesudah request untuk membedakan
+"stream habis" dari "request gagal" (PlayStoreFetchError).
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+CACHE_MODES = ('off', 'record', 'replay', 'auto')
+
+DEFAULT_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9,id;q=0.8',
+    'Accept-Encoding': 'gzip, deflate',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Connection': 'keep-alive',
+}
+
+# Sama dengan google_play_scraper.utils.request
+MAX_RETRIES = 3
+RATE_LIMIT_DELAY = 5
+GATEWAY_ERROR = 'com.google.play.gateway.proto.PlayGatewayError'
+
+
+class CacheMissError(KeyError):
+    """Request tidak ada di cache saat mode replay"""
+
+
+class PlayStoreFetchError(Exception):
+    """
+    Halaman review gagal diambil (error atau rate limit yang ditelan library)
+
+    Args:
+        throttled: True jika penyebabnya rate limit (PlayGatewayError / HTTP 429)
+    """
+
+    def __init__(self, message, throttled=False):
+        super().__init__(message)
+        self.throttled = throttled
+
+
+class ResponseCache:
+    """
+    Cache response HTTP di disk: satu file gzip JSON per request
+
+    Struktur folder:
+        <cache_dir>/<key[:2]>/<key>.json.gz
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(method, url, body=None):
+        digest = hashlib.sha256()
+        digest.update(method.upper().encode('utf-8'))
+        digest.update(b'\0' + url.encode('utf-8') + b'\0')
+        if body:
+            digest.update(body if isinstance(body, bytes) else str(body).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json.gz")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, key, method, url, status, text):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            'method': method,
+            'url': url,
+            'status': status,
+            'text': text,
+            'recorded_at': datetime.now().isoformat(),
+        }
+        # Tulis ke file sementara lalu rename agar thread lain tidak membaca file setengah jadi
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def __len__(self):
+        return sum(
+            len([name for name in files if name.endswith('.json.gz')])
+            for _, _, files in os.walk(self.cache_dir)
+        )
+
+
+class PlayStoreTransport:
+    """
+    Transport bersama untuk semua request Play Store
+
+    Args:
+        headers: Header tambahan untuk session (mis. User-Agent)
+        pool_size: Jumlah koneksi keep-alive per host (>= jumlah thread scraping)
+        timeout: Timeout request dalam detik
+        cache_dir: Folder cache record/replay (wajib untuk mode selain 'off')
+        cache_mode: 'off', 'record', 'replay' atau 'auto'
+    """
+
+    def __init__(self, headers=None, pool_size=16, timeout=30, cache_dir=None, cache_mode='off'):
+        if cache_mode not in CACHE_MODES:
+            raise ValueError(f"cache_mode harus salah satu dari {CACHE_MODES}")
+        if cache_mode != 'off' and not cache_dir:
+            raise ValueError(f"cache_mode '{cache_mode}' membutuhkan cache_dir")
+
+        self.timeout = timeout
+        self.cache_mode = cache_mode
+        self.cache = ResponseCache(cache_dir) if cache_mode != 'off' else None
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update(DEFAULT_HEADERS)
+        self.session.headers.update(headers or {})
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._originals = None
+        self.stats = {
+            'requests': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'cache_writes': 0,
+            'bytes': 0,
+            'errors': 0,
+            'throttled': 0,
+            'request_time': 0.0,
+        }
+
+    def _count(self, **deltas):
+        with self._lock:
+            for name, value in deltas.items():
+                self.stats[name] += value
+
+    def _signal(self, name):
+        """Catat error/throttled di statistik global dan di counter thread ini"""
+        self._count(**{name: 1})
+        setattr(self._local, name, getattr(self._local, name, 0) + 1)
+
+    def thread_signals(self):
+        """
+        Jumlah error dan throttling yang dialami thread ini sejauh ini
+
+        Returns:
+            (errors, throttled)
+        """
+        return getattr(self._local, 'errors', 0), getattr(self._local, 'throttled', 0)
+
+    def _live(self, method, url, body=None, headers=None):
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, url, data=body, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            self._signal('errors')
+            raise
+        self._count(requests=1, bytes=len(response.content), request_time=time.perf_counter() - started)
+        return response.status_code, response.content.decode('utf-8')
+
+    def request(self, method, url, body=None, headers=None):
+        """
+        Satu request melalui cache dan/atau session
+
+        Returns:
+            (status_code, text)
+        """
+        key = None
+        if self.cache is not None:
+            key = ResponseCache.key(method, url, body)
+            if self.cache_mode in ('replay', 'auto'):
+                entry = self.cache.get(key)
+                if entry is not None:
+                    self._count(cache_hits=1)
+                    return entry['status'], entry['text']
+                self._count(cache_misses=1)
+                if self.cache_mode == 'replay':
+                    logging.warning(f"Cache miss (replay): {method} {url}")
+                    raise CacheMissError(f"Tidak ada di cache: {method} {url}")
+
+        status, text = self._live(method, url, body, headers)
+        # Hanya response yang berguna yang direkam (bukan error / rate limit)
+        if key is not None and status == 200 and GATEWAY_ERROR not in text:
+            self.cache.put(key, method, url, status, text)
+            self._count(cache_writes=1)
+        return status, text
+
+    @staticmethod
+    def _raise_for_status(status):
+        from google_play_scraper.exceptions import ExtraHTTPError, NotFoundError
+
+        if status == 404:
+            raise NotFoundError("App not found(404).")
+        if status >= 400:
+            raise ExtraHTTPError(f"App not found. Status code {status} returned.")
+
+    def post(self, url, data, headers):
+        """Pengganti google_play_scraper.utils.request.post (retry + jeda saat rate limit)"""
+        last_exception = None
+        rate_exceeded_count = 0
+        for _ in range(MAX_RETRIES):
+            try:
+                status, text = self.request('POST', url, data, headers)
+                if status == 429:
+                    self._signal('throttled')
+                elif status >= 400:
+                    self._signal('errors')
+                self._raise_for_status(status)
+            except CacheMissError:
+                raise
+            except Exception as e:
+                last_exception = e
+                continue
+            if GATEWAY_ERROR in text:
+                self._signal('throttled')
+                rate_exceeded_count += 1
+                last_exception = Exception(GATEWAY_ERROR)
+                time.sleep(RATE_LIMIT_DELAY * rate_exceeded_count)
+                continue
+            return text
+        raise last_exception
+
+    def get(self, url):
+        """Pengganti google_play_scraper.utils.request.get"""
+        status, text = self.request('GET', url)
+        self._raise_for_status(status)
+        return text
+
+    def _targets(self):
+        import google_play_scraper.features.app as app_module
+        import google_play_scraper.features.reviews as reviews_module
+        import google_play_scraper.utils.request as request_module
+
+        return [
+            (reviews_module, 'post', self.post),
+            (app_module, 'get', self.get),
+            (request_module, 'post', self.post),
+            (request_module, 'get', self.get),
+        ]
+
+    def install(self):
+        """
+        Arahkan reviews()/app() milik google-play-scraper ke transport ini
+
+        Library mengimpor `post`/`get` langsung ke modul fitur, jadi nama di
+        modul tersebut yang diganti. Panggil uninstall() untuk mengembalikan.
+        """
+        if self._originals is not None:
+            return self
+        self._originals = []
+        for module, name, replacement in self._targets():
+            self._originals.append((module, name, getattr(module, name)))
+            setattr(module, name, replacement)
+        logging.info(f"Transport Play Store aktif (cache: {self.cache_mode})")
+        return self
+
+    def uninstall(self):
+        if self._originals is None:
+            return
+        for module, name, original in self._originals:
+            setattr(module, name, original)
+        self._originals = None
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.uninstall()
+        return False
+
+    def close(self):
+        self.uninstall()
+        self.session.close()
+
+    def summary(self):
+        """Statistik transport untuk laporan di akhir run"""
+        stats = dict(self.stats)
+        lookups = stats['cache_hits'] + stats['requests']
+        stats['cache_hit_rate'] = stats['cache_hits'] / lookups if lookups else 0.0
+        stats['avg_request_ms'] = stats['request_time'] / stats['requests'] * 1000 if stats['requests'] else 0.0
+        return stats
@@ -0,0 +1,7 @@
+"""
+Reusable building blocks for the Spotify sentiment analysis notebook.
+
+Each submodule is imported directly (e.g. ``from sentiment.text_cleaning
+import clean_texts``) so that heavy optional dependencies are only loaded
+by the stages that need them.
+"""
@@ -0,0 +1,261 @@
+"""
+Batch inference engine for re-scoring the review archive.
+
+Reviews are read in micro-batches (from a list, a CSV/JSONL file or the
+Parquet dataset). Each batch goes through vectorized cleaning and
+preprocessing, one sparse transform and one ``predict``/``predict_proba``
+call (``SpotifySentimentPredictor.predict_arrays``). Results are streamed to
+a JSONL or Parquet file as each batch finishes. With ``n_jobs > 1`` batches
+are scored by a process pool; every worker loads the pipeline once, and at
+most ``2 * n_jobs`` batches are in flight, so memory stays bounded.
+
+Command line::
+
+    python -m sentiment.batch_inference --pipeline artifacts/models/best_pipeline.joblib \\
+        --input dataset/parquet --output artifacts/scores/reviews.parquet --workers 4
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .predictor import load_predictor
+
+
+DEFAULT_BATCH_SIZE = 2000
+
+RESULT_COLUMNS = ['sentiment', 'confidence', 'prediction_numeric']
+
+
+def iter_input_batches(source, batch_size=DEFAULT_BATCH_SIZE, text_column='content', id_column='reviewId'):
+    """
+    Yield DataFrames with ``id_column`` (when available) and ``text_column``.
+
+    Args:
+        source: Iterable of texts or review dicts, a ``.csv``/``.jsonl`` file,
+            a ``.json`` array of reviews (``save_to_json`` output), or a
+            Parquet dataset directory
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        from scraping.review_storage import iter_review_batches
+        yield from iter_review_batches(
+            source, batch_size=batch_size, columns=[id_column, text_column], shuffle=False
+        )
+        return
+
+    if isinstance(source, str) and source.endswith('.csv'):
+        yield from pd.read_csv(
+            source, usecols=lambda name: name in (id_column, text_column), chunksize=batch_size
+        )
+        return
+
+    if isinstance(source, str) and source.endswith('.jsonl'):
+        yield from pd.read_json(source, lines=True, chunksize=batch_size)
+        return
+
+    if isinstance(source, str) and source.endswith('.json'):
+        with open(source, encoding='utf-8') as f:
+            records = json.load(f)
+        if not isinstance(records, list):
+            raise ValueError(f"{source}: expected a JSON array of reviews")
+        for start in range(0, len(records), batch_size):
+            yield pd.DataFrame(records[start:start + batch_size])
+        return
+
+    batch = []
+    for item in source:
+        batch.append(item if isinstance(item, dict) else {text_column: item})
+        if len(batch) >= batch_size:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+
+def score_batch(predictor, frame, text_column='content', id_column='reviewId', include_text=False):
+    """Score one batch; returns a DataFrame of ids (or texts) and ``RESULT_COLUMNS``"""
+    texts = frame[text_column].fillna('').astype(str).tolist()
+    _, predictions, confidences = predictor.predict_arrays(texts)
+
+    result = pd.DataFrame({
+        'sentiment': predictor.classes[predictions],
+        'confidence': np.asarray(confidences, dtype=np.float64),
+        'prediction_numeric': np.asarray(predictions, dtype=np.int8),
+    })
+    if id_column in frame.columns:
+        result.insert(0, id_column, frame[id_column].to_numpy())
+    if include_text or id_column not in frame.columns:
+        result.insert(1 if id_column in frame.columns else 0, text_column, texts)
+    return result
+
+
+class JsonlResultWriter:
+    """Append result batches to a JSON Lines file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, frame):
+        for record in frame.to_dict(orient='records'):
+            self._file.write(json.dumps(record, ensure_ascii=False, default=float) + '\n')
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetResultWriter:
+    """Append result batches as row groups of one Parquet file"""
+
+    def __init__(self, path, compression='zstd'):
+        import pyarrow.parquet as pq
+        self.path = path
+        self.compression = compression
+        self._pq = pq
+        self._writer = None
+        self.schema = None
+
+    @staticmethod
+    def _schema(columns):
+        """Fixed result schema, so a batch of all-null ids cannot change the column types"""
+        import pyarrow as pa
+        types = {
+            'sentiment': pa.string(),
+            'confidence': pa.float64(),
+            'prediction_numeric': pa.int8(),
+        }
+        # Id and text columns are stored as strings
+        return pa.schema([(name, types.get(name, pa.string())) for name in columns])
+
+    def write(self, frame):
+        import pyarrow as pa
+        if self._writer is None:
+            self.schema = self._schema(frame.columns)
+            self._writer = self._pq.ParquetWriter(self.path, self.schema, compression=self.compression)
+        frame = frame.copy()
+        for field in self.schema:
+            if pa.types.is_string(field.type):
+                values = frame[field.name]
+                frame[field.name] = values.where(values.isna(), values.astype(str))
+        table = pa.Table.from_pandas(frame, schema=self.schema, preserve_index=False)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def open_result_writer(path):
+    """JSONL or Parquet writer chosen by file extension"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith('.parquet'):
+        return ParquetResultWriter(path)
+    if path.endswith('.jsonl'):
+        return JsonlResultWriter(path)
+    raise ValueError(f"Unsupported output format: {path} (use .jsonl or .parquet)")
+
+
+_worker_predictor = None
+
+
+def _init_worker(pipeline_path):
+    global _worker_predictor
+    _worker_predictor = load_predictor(pipeline_path)
+
+
+def _score_in_worker(frame, text_column, id_column, include_text):
+    return score_batch(_worker_predictor, frame, text_column, id_column, include_text)
+
+
+def run_batch_inference(source, pipeline_path, output_path, batch_size=DEFAULT_BATCH_SIZE, n_jobs=1,
+                        text_column='content', id_column='reviewId', include_text=False, verbose=True):
+    """
+    Score every review in ``source`` and stream the results to ``output_path``.
+
+    Args:
+        source: See ``iter_input_batches``
+        pipeline_path: Artifact written by ``save_pipeline``
+        output_path: ``.jsonl`` or ``.parquet`` file
+        batch_size: Reviews per micro-batch
+        n_jobs: Worker processes (1 scores in-process)
+        include_text: Also write the review text next to each prediction
+
+    Returns:
+        dict with rows, batches, seconds and rows_per_second
+    """
+    started = time.perf_counter()
+    batches = iter_input_batches(source, batch_size, text_column, id_column)
+    writer = open_result_writer(output_path)
+    stats = {'rows': 0, 'batches': 0}
+
+    def record(result):
+        writer.write(result)
+        stats['rows'] += len(result)
+        stats['batches'] += 1
+        if verbose:
+            elapsed = time.perf_counter() - started
+            print(f"   batch {stats['batches']}: {stats['rows']:,} reviews "
+                  f"({stats['rows'] / elapsed:,.0f} reviews/s)", end='\r')
+
+    try:
+        if n_jobs == 1:
+            predictor = load_predictor(pipeline_path)
+            for frame in batches:
+                record(score_batch(predictor, frame, text_column, id_column, include_text))
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker,
+                                     initargs=(pipeline_path,)) as executor:
+                # Bounded window of in-flight batches; results are written in input order
+                pending = deque()
+                for frame in batches:
+                    pending.append(executor.submit(_score_in_worker, frame, text_column, id_column, include_text))
+                    if len(pending) >= 2 * n_jobs:
+                        record(pending.popleft().result())
+                while pending:
+                    record(pending.popleft().result())
+    finally:
+        writer.close()
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] else 0.0
+    if verbose:
+        print(f"\n✅ {stats['rows']:,} reviews scored in {stats['seconds']:.1f}s "
+              f"({stats['rows_per_second']:,.0f} reviews/s) -> {output_path}")
+    return stats
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch sentiment scoring for Spotify reviews")
+    parser.add_argument('--pipeline', required=True, help="Pipeline artifact from save_pipeline")
+    parser.add_argument('--input', required=True, help="Parquet dataset directory, .csv, .jsonl or .json file")
+    parser.add_argument('--output', required=True, help="Output .jsonl or .parquet file")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Reviews per micro-batch")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes")
+    parser.add_argument('--text-column', default='content')
+    parser.add_argument('--id-column', default='reviewId')
+    parser.add_argument('--include-text', action='store_true', help="Write the review text with each result")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    run_batch_inference(
+        args.input, args.pipeline, args.output,
+        batch_size=args.batch_size,
+        n_jobs=args.workers,
+        text_column=args.text_column,
+        id_column=args.id_column,
+        include_text=args.include_text
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""
+Cached, parallel TextBlob + textstat document scores.
+
+Every review is analysed once: ``score_document`` returns TextBlob
+polarity/subjectivity and the three textstat readability scores together.
+``DocumentFeatureService`` fans unseen texts out over a process pool and
+stores the results in a small SQLite cache keyed by a hash of the text, so
+re-running the notebook (or adding new reviews) only scores texts that have
+not been seen before.
+
+The polarity is also what ``create_sentiment_labels_enhanced`` needs, so
+labelling reuses it instead of running TextBlob a second time.
+"""
+
+import hashlib
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from textblob import TextBlob
+
+try:
+    import textstat
+except ImportError:
+    textstat = None
+
+
+FEATURE_COLUMNS = [
+    'textblob_polarity', 'textblob_subjectivity',
+    'flesch_reading_ease', 'flesch_kincaid_grade', 'automated_readability_index',
+]
+
+# Readability values used for very short texts (and when textstat is missing)
+READABILITY_DEFAULTS = (50, 5, 5)
+
+# Bump when the scoring logic changes so old cache entries are ignored
+FEATURE_VERSION = 1
+
+DEFAULT_CACHE_PATH = os.path.join('artifacts', 'document_features.sqlite')
+
+
+def score_document(text):
+    """TextBlob polarity/subjectivity and textstat readability for one text"""
+    text = str(text)
+    try:
+        sentiment = TextBlob(text).sentiment
+        polarity, subjectivity = sentiment.polarity, sentiment.subjectivity
+    except Exception:
+        polarity, subjectivity = 0.0, 0.0
+
+    if textstat is not None and len(text) > 10:
+        readability = (
+            textstat.flesch_reading_ease(text),
+            textstat.flesch_kincaid_grade(text),
+            textstat.automated_readability_index(text),
+        )
+    else:
+        readability = READABILITY_DEFAULTS
+
+    return (polarity, subjectivity) + tuple(readability)
+
+
+def _score_chunk(texts):
+    return [score_document(text) for text in texts]
+
+
+class DocumentFeatureService:
+    """
+    Compute ``FEATURE_COLUMNS`` for a corpus with an on-disk cache.
+
+    Args:
+        cache_path: SQLite file for cached scores (None disables caching)
+        n_jobs: Worker processes for unseen texts (default: all cores)
+        chunk_size: Texts per task sent to a worker
+        min_parallel: Below this many unseen texts, score in-process
+    """
+
+    def __init__(self, cache_path=DEFAULT_CACHE_PATH, n_jobs=None, chunk_size=500, min_parallel=2000):
+        self.cache_path = cache_path
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.min_parallel = min_parallel
+        # textstat availability changes the readability values, so it is part of the key
+        self._salt = f"v{FEATURE_VERSION}|textstat={textstat is not None}|".encode('utf-8')
+        self.last_run = {'documents': 0, 'unique': 0, 'cached': 0, 'computed': 0}
+
+        if cache_path:
+            cache_dir = os.path.dirname(cache_path)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS document_features ("
+                    "key TEXT PRIMARY KEY, polarity REAL, subjectivity REAL, "
+                    "flesch_reading_ease REAL, flesch_kincaid_grade REAL, automated_readability_index REAL)"
+                )
+
+    def _connect(self):
+        return sqlite3.connect(self.cache_path)
+
+    def _key(self, text):
+        return hashlib.blake2b(self._salt + text.encode('utf-8'), digest_size=16).hexdigest()
+
+    def _load_cached(self, keys):
+        cached = {}
+        if not self.cache_path or not keys:
+            return cached
+        with self._connect() as conn:
+            # Stay below SQLite's bound-parameter limit
+            for start in range(0, len(keys), 900):
+                chunk = keys[start:start + 900]
+                placeholders = ','.join('?' * len(chunk))
+                rows = conn.execute(
+                    f"SELECT * FROM document_features WHERE key IN ({placeholders})", chunk
+                )
+                for row in rows:
+                    cached[row[0]] = tuple(row[1:])
+        return cached
+
+    def _store(self, keys, scores):
+        if not self.cache_path or not keys:
+            return
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO document_features VALUES (?, ?, ?, ?, ?, ?)",
+                [(key,) + tuple(score) for key, score in zip(keys, scores)]
+            )
+
+    def _compute(self, texts):
+        if len(texts) < self.min_parallel or self.n_jobs == 1:
+            return _score_chunk(texts)
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(chunks))) as executor:
+            return [score for chunk in executor.map(_score_chunk, chunks) for score in chunk]
+
+    def transform(self, texts):
+        """
+        Score every text, reading cached results where available.
+
+        Args:
+            texts: pandas Series (or iterable) of raw review texts
+
+        Returns:
+            DataFrame with ``FEATURE_COLUMNS`` aligned to the input index
+        """
+        series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        codes, uniques = pd.factorize(pd.Series([str(text) for text in series], dtype=object))
+        uniques = list(uniques)
+        keys = [self._key(text) for text in uniques]
+
+        cached = self._load_cached(keys)
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        computed = self._compute([uniques[i] for i in missing])
+        self._store([keys[i] for i in missing], computed)
+
+        scores = np.empty((len(uniques), len(FEATURE_COLUMNS)), dtype=np.float64)
+        for i, key in enumerate(keys):
+            if key in cached:
+                scores[i] = cached[key]
+        for i, score in zip(missing, computed):
+            scores[i] = score
+
+        self.last_run = {
+            'documents': len(series),
+            'unique': len(uniques),
+            'cached': len(uniques) - len(missing),
+            'computed': len(missing),
+        }
+        return pd.DataFrame(scores[codes], columns=FEATURE_COLUMNS, index=series.index)
@@ -0,0 +1,289 @@
+"""
+Parallel, budgeted training of the Experiment 4 ensemble models.
+
+Experiment 4 fitted five boosting/tree models one after the other with a
+fixed 500 rounds each, and predicted on the whole training set only to
+report train accuracy. ``run_ensemble_sweep`` instead:
+
+* gives every model a thread budget (``allocate_threads``) so that the
+  models running side by side never use more threads than there are cores;
+  single-threaded ``GradientBoostingClassifier`` gets one core and the
+  multi-threaded libraries share the rest,
+* schedules the models on a process pool, slowest first, starting a model
+  as soon as its budget fits into the free cores,
+* stops boosting early on a validation split carved out of the training
+  rows (XGBoost/LightGBM/CatBoost ``eval_set``, ``n_iter_no_change`` for
+  GradientBoosting); 500 rounds remain the upper bound,
+* measures train accuracy on a fixed-size sample of the training rows,
+* returns the fitted models and a leaderboard with fit time, rounds used,
+  thread budget and test metrics (``save_leaderboard`` writes CSV/JSON).
+
+``PrefittedSoftVoting`` combines fitted members without refitting them.
+
+Model libraries are imported inside the worker processes, so the notebook
+only pays for the libraries that are actually trained.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score, precision_recall_fscore_support
+
+from .experiment import split_indices
+
+
+def default_model_specs(max_rounds=500, early_stopping_rounds=20, random_state=42):
+    """
+    Experiment 4 models as picklable specs (constructed inside the workers).
+
+    ``threads`` is the most threads a model can use (None = any number);
+    ``cost`` orders the schedule (highest first).
+    """
+    return {
+        'GradientBoosting': {
+            'library': 'sklearn_gb', 'threads': 1, 'cost': 10,
+            'params': dict(n_estimators=max_rounds, max_depth=5, learning_rate=0.1,
+                           n_iter_no_change=early_stopping_rounds, validation_fraction=0.1,
+                           random_state=random_state),
+        },
+        'XGBoost': {
+            'library': 'xgboost', 'threads': None, 'cost': 4,
+            'params': dict(n_estimators=max_rounds, max_depth=6, learning_rate=0.1, subsample=0.8,
+                           colsample_bytree=0.8, tree_method='hist', eval_metric='mlogloss',
+                           early_stopping_rounds=early_stopping_rounds, random_state=random_state),
+        },
+        'CatBoost': {
+            'library': 'catboost', 'threads': None, 'cost': 4,
+            'params': dict(iterations=max_rounds, depth=6, learning_rate=0.1,
+                           early_stopping_rounds=early_stopping_rounds, random_seed=random_state,
+                           verbose=False),
+        },
+        'LightGBM': {
+            'library': 'lightgbm', 'threads': None, 'cost': 2,
+            'params': dict(n_estimators=max_rounds, max_depth=6, learning_rate=0.1, subsample=0.8,
+                           subsample_freq=1, colsample_bytree=0.8, random_state=random_state, verbose=-1),
+            'early_stopping_rounds': early_stopping_rounds,
+        },
+        'ExtraTrees': {
+            'library': 'sklearn_et', 'threads': None, 'cost': 1,
+            'params': dict(n_estimators=max_rounds, max_depth=20, random_state=random_state),
+        },
+    }
+
+
+def allocate_threads(specs, n_cores=None):
+    """
+    Thread budget per model.
+
+    Models capped at ``threads`` get their cap; the remaining cores are split
+    evenly between the others (at least one thread each).
+    """
+    n_cores = n_cores or os.cpu_count() or 1
+    capped = {name: spec['threads'] for name, spec in specs.items() if spec.get('threads')}
+    flexible = [name for name in specs if name not in capped]
+    free = max(n_cores - sum(capped.values()), len(flexible))
+    budgets = {name: min(threads, n_cores) for name, threads in capped.items()}
+    for i, name in enumerate(flexible):
+        budgets[name] = max(1, free // len(flexible) + (1 if i < free % len(flexible) else 0))
+    return budgets
+
+
+def build_model(spec, n_threads):
+    """Estimator for one spec, limited to ``n_threads``"""
+    library, params = spec['library'], dict(spec['params'])
+    if library == 'xgboost':
+        import xgboost as xgb
+        return xgb.XGBClassifier(n_jobs=n_threads, **params)
+    if library == 'lightgbm':
+        import lightgbm as lgb
+        return lgb.LGBMClassifier(n_jobs=n_threads, **params)
+    if library == 'catboost':
+        from catboost import CatBoostClassifier
+        return CatBoostClassifier(thread_count=n_threads, **params)
+    if library == 'sklearn_gb':
+        from sklearn.ensemble import GradientBoostingClassifier
+        return GradientBoostingClassifier(**params)
+    if library == 'sklearn_et':
+        from sklearn.ensemble import ExtraTreesClassifier
+        return ExtraTreesClassifier(n_jobs=n_threads, **params)
+    raise ValueError(f"Unknown model library: {library}")
+
+
+def fit_with_early_stopping(model, spec, X_train, y_train, X_val, y_val):
+    """Fit ``model``, stopping on the validation split where the library supports it"""
+    library = spec['library']
+    if library == 'xgboost':
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+    elif library == 'lightgbm':
+        import lightgbm as lgb
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)],
+                  callbacks=[lgb.early_stopping(spec['early_stopping_rounds'], verbose=False)])
+    elif library == 'catboost':
+        model.fit(X_train, y_train, eval_set=(X_val, y_val))
+    else:
+        # GradientBoosting holds out its own validation_fraction; ExtraTrees has no rounds to stop
+        model.fit(X_train, y_train)
+    return model
+
+
+def rounds_used(model, spec):
+    library = spec['library']
+    if library == 'xgboost':
+        best = getattr(model, 'best_iteration', None)
+        return int(best) + 1 if best is not None else spec['params']['n_estimators']
+    if library == 'lightgbm':
+        return int(model.best_iteration_ or model.n_estimators)
+    if library == 'catboost':
+        return int(model.tree_count_)
+    if library == 'sklearn_gb':
+        return int(model.n_estimators_)
+    return int(len(getattr(model, 'estimators_', [])))
+
+
+_worker_data = None
+
+
+def _init_worker(data):
+    global _worker_data
+    _worker_data = data
+
+
+def _train_one(name, spec, n_threads):
+    from threadpoolctl import threadpool_limits
+
+    data = _worker_data
+    with threadpool_limits(limits=n_threads):
+        model = build_model(spec, n_threads)
+        started = time.perf_counter()
+        fit_with_early_stopping(model, spec, data['X_fit'], data['y_fit'], data['X_val'], data['y_val'])
+        fit_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        y_pred = np.asarray(model.predict(data['X_test'])).reshape(-1)
+        predict_seconds = time.perf_counter() - started
+        val_pred = np.asarray(model.predict(data['X_val'])).reshape(-1)
+        sample_pred = np.asarray(model.predict(data['X_train_sample'])).reshape(-1)
+
+    precision, recall, f1, _ = precision_recall_fscore_support(data['y_test'], y_pred, average='weighted')
+    record = {
+        'model': name,
+        'threads': n_threads,
+        'rounds': rounds_used(model, spec),
+        'fit_seconds': fit_seconds,
+        'predict_seconds': predict_seconds,
+        'train_accuracy': accuracy_score(data['y_train_sample'], sample_pred),
+        'val_accuracy': accuracy_score(data['y_val'], val_pred),
+        'accuracy': accuracy_score(data['y_test'], y_pred),
+        'precision': precision,
+        'recall': recall,
+        'f1_score': f1,
+    }
+    return record, model
+
+
+def run_ensemble_sweep(X_train, y_train, X_test, y_test, specs=None, n_cores=None,
+                       validation_fraction=0.1, train_eval_size=5000, random_state=42, verbose=True):
+    """
+    Train every spec in parallel under per-model thread budgets.
+
+    Args:
+        X_train / y_train: Training rows; ``validation_fraction`` of them is
+            held out (stratified) for early stopping
+        X_test / y_test: Evaluation rows for the leaderboard
+        specs: ``default_model_specs()`` or a subset/variation of it
+        n_cores: Cores to schedule on (default: all)
+        train_eval_size: Training rows sampled to report train accuracy
+
+    Returns:
+        (leaderboard DataFrame sorted by accuracy, dict of fitted models)
+    """
+    specs = specs or default_model_specs(random_state=random_state)
+    n_cores = n_cores or os.cpu_count() or 1
+    budgets = allocate_threads(specs, n_cores)
+    y_train = np.asarray(y_train)
+
+    fit_idx, val_idx = split_indices(len(y_train), y_train, test_size=validation_fraction,
+                                     random_state=random_state)
+    sample_idx = np.random.RandomState(random_state).permutation(len(y_train))[:train_eval_size]
+    data = {
+        'X_fit': X_train[fit_idx], 'y_fit': y_train[fit_idx],
+        'X_val': X_train[val_idx], 'y_val': y_train[val_idx],
+        'X_train_sample': X_train[sample_idx], 'y_train_sample': y_train[sample_idx],
+        'X_test': X_test, 'y_test': np.asarray(y_test),
+    }
+
+    queue = sorted(specs, key=lambda name: -specs[name].get('cost', 1))
+    records, models = [], {}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=min(len(queue), n_cores), initializer=_init_worker,
+                             initargs=(data,)) as executor:
+        running = {}
+        while queue or running:
+            # Start every queued model whose budget fits into the free cores
+            free = n_cores - sum(budgets[name] for name in running.values())
+            for name in list(queue):
+                if budgets[name] <= free or not running:
+                    running[executor.submit(_train_one, name, specs[name], budgets[name])] = name
+                    free -= budgets[name]
+                    queue.remove(name)
+                    if verbose:
+                        print(f"🔧 {name}: started with {budgets[name]} thread(s)")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                record, model = future.result()
+                record['finished_at'] = time.perf_counter() - started
+                records.append(record)
+                models[name] = model
+                if verbose:
+                    print(f"✅ {name}: {record['accuracy']:.4f} test accuracy, {record['rounds']} rounds, "
+                          f"{record['fit_seconds']:.1f}s")
+
+    wall_seconds = time.perf_counter() - started
+    leaderboard = pd.DataFrame(records).sort_values('accuracy', ascending=False).reset_index(drop=True)
+    leaderboard.attrs['wall_seconds'] = wall_seconds
+    leaderboard.attrs['sequential_seconds'] = float(leaderboard['fit_seconds'].sum())
+    if verbose:
+        print(f"⏱️ Sweep wall time {wall_seconds:.1f}s "
+              f"(sum of fit times {leaderboard.attrs['sequential_seconds']:.1f}s) on {n_cores} cores")
+    return leaderboard, models
+
+
+class PrefittedSoftVoting:
+    """
+    Soft voting over already fitted models (mean of ``predict_proba``).
+
+    Same predictions as ``VotingClassifier(voting='soft')`` with equal
+    weights, without refitting clones of the members (which would also lose
+    their early-stopping validation sets).
+    """
+
+    def __init__(self, estimators):
+        self.estimators = list(estimators)
+        self.classes_ = np.asarray(self.estimators[0][1].classes_)
+
+    def predict_proba(self, X):
+        return np.mean([np.asarray(model.predict_proba(X)) for _, model in self.estimators], axis=0)
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def save_leaderboard(leaderboard, path):
+    """Write the leaderboard as CSV plus a JSON file with the sweep timings"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    leaderboard.to_csv(path, index=False)
+    summary = {
+        'wall_seconds': leaderboard.attrs.get('wall_seconds'),
+        'sequential_seconds': leaderboard.attrs.get('sequential_seconds'),
+        'models': leaderboard.to_dict(orient='records'),
+    }
+    with open(os.path.splitext(path)[0] + '.json', 'w', encoding='utf-8') as f:
+        json.dump(summary, f, indent=2, default=float)
+    return path
@@ -0,0 +1,115 @@
+"""
+Index-based experiment harness.
+
+Experiments split *row positions* instead of texts, so every per-row block
+(TF-IDF, statistical features, labels) is aligned by slicing with the same
+index arrays. Duplicate review texts therefore keep their own feature rows,
+and no text -> row lookups are needed.
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix, hstack, vstack
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+
+def split_indices(n_samples, labels=None, test_size=0.2, random_state=42, stratify=True):
+    """
+    Train/test split of row positions.
+
+    Produces the same partition as calling ``train_test_split`` on the data
+    itself with the same arguments, because the shuffle only depends on the
+    number of rows and the stratification labels.
+
+    Returns:
+        (train_idx, test_idx) integer arrays
+    """
+    positions = np.arange(n_samples)
+    return train_test_split(
+        positions,
+        test_size=test_size,
+        random_state=random_state,
+        stratify=labels if stratify else None
+    )
+
+
+class FeatureStore:
+    """
+    Combined sparse text + dense statistical features for every row.
+
+    The text vectorizer and the scaler are fitted on the training rows only
+    (as in the original experiments) and then applied to all rows, giving a
+    single CSR matrix that models slice with ``slice(idx)``.
+
+    Args:
+        text_features: Sparse matrix (n_rows x n_terms) in row order
+        dense_features: Scaled dense matrix (n_rows x n_stats) or None
+        vectorizer: Fitted text vectorizer
+        scaler: Fitted scaler for the dense block (or None)
+        stat_columns: Names of the dense columns
+    """
+
+    def __init__(self, text_features, dense_features=None, vectorizer=None, scaler=None, stat_columns=None):
+        self.vectorizer = vectorizer
+        self.scaler = scaler
+        self.stat_columns = list(stat_columns or [])
+        self.text_features = text_features.tocsr()
+        self.dense_features = dense_features
+
+        blocks = [self.text_features]
+        if dense_features is not None and dense_features.shape[1] > 0:
+            blocks.append(csr_matrix(dense_features))
+        self.matrix = hstack(blocks, format='csr') if len(blocks) > 1 else self.text_features
+
+    @classmethod
+    def build(cls, texts, stat_frame, train_idx, vectorizer, stat_columns=None, cache=None):
+        """
+        Fit on the training rows and transform every row in one pass.
+
+        Args:
+            texts: Array of processed texts, positionally aligned with ``stat_frame``
+            stat_frame: DataFrame holding the statistical feature columns
+            train_idx: Training row positions (from ``split_indices``)
+            vectorizer: Unfitted text vectorizer (e.g. TfidfVectorizer)
+            stat_columns: Statistical columns to include (missing ones are skipped)
+            cache: Optional ``ArtifactCache``; the fitted vectorizer and TF-IDF
+                blocks are loaded from it when the texts and config are unchanged
+        """
+        texts = np.asarray(texts, dtype=object)
+        n_rows = len(texts)
+        train_idx = np.asarray(train_idx)
+        other_idx = np.setdiff1d(np.arange(n_rows), train_idx, assume_unique=True)
+
+        # Fit on training rows, transform the rest, then restore row order
+        if cache is not None:
+            vectorizer, (train_block, other_block) = cache.vectorize(
+                vectorizer, texts[train_idx], [texts[other_idx]], name='feature_store_text'
+            )
+        else:
+            train_block = vectorizer.fit_transform(texts[train_idx])
+            other_block = vectorizer.transform(texts[other_idx])
+        order = np.empty(n_rows, dtype=np.int64)
+        order[np.concatenate([train_idx, other_idx])] = np.arange(n_rows)
+        text_features = vstack([train_block, other_block], format='csr')[order]
+
+        stat_columns = [col for col in (stat_columns or []) if col in stat_frame.columns]
+        dense_features, scaler = None, None
+        if stat_columns:
+            values = stat_frame[stat_columns].to_numpy(dtype=np.float64)
+            scaler = StandardScaler().fit(values[train_idx])
+            dense_features = scaler.transform(values)
+
+        return cls(text_features, dense_features, vectorizer=vectorizer, scaler=scaler, stat_columns=stat_columns)
+
+    @property
+    def shape(self):
+        return self.matrix.shape
+
+    @property
+    def feature_names(self):
+        names = list(self.vectorizer.get_feature_names_out()) if self.vectorizer is not None else []
+        return names + self.stat_columns
+
+    def slice(self, idx):
+        """Rows ``idx`` of the combined matrix (CSR)"""
+        return self.matrix[np.asarray(idx)]
@@ -0,0 +1,237 @@
+"""
+Content-addressed artifact cache for features and fitted vectorizers.
+
+Artifacts are stored under ``artifacts/features/<key>/`` where ``key`` is a
+hash of the input data and the full configuration that produced them
+(vectorizer class + parameters, extra settings, cache format version).
+Changing the data or any parameter gives a new key; identical inputs in a
+later session - or in a sibling experiment - load the stored result instead
+of recomputing it. Functions and classes in a key contribute their own
+source and the source file of their module, so editing module-level tables
+or regexes (e.g. ``CONTRACTIONS``) also gives a new key.
+
+Sparse matrices are saved as their CSR ``data``/``indices``/``indptr``
+arrays and dense arrays as ``.npy`` files, all loaded memory-mapped.
+Everything else (fitted vectorizers, tokenizers, Series) goes through joblib.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+import uuid
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_ROOT = os.path.join('artifacts', 'features')
+
+_source_digests = {}
+
+
+def _module_dependencies(module_name):
+    """
+    Digest of the source file that defines ``module_name``, plus the module's
+    ``cache_dependencies()`` (external data such as NLTK resources) if it has one.
+
+    Hashing the whole file covers module-level tables and compiled regexes
+    that ``inspect.getsource`` of a single function or class misses.
+    """
+    module = sys.modules.get(module_name)
+    path = getattr(module, '__file__', None)
+    digest = None
+    if path and path.endswith('.py') and os.path.exists(path):
+        stat = os.stat(path)
+        stamp = (path, stat.st_mtime_ns, stat.st_size)
+        digest = _source_digests.get(stamp)
+        if digest is None:
+            with open(path, 'rb') as f:
+                digest = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+            _source_digests[stamp] = digest
+    hook = getattr(module, 'cache_dependencies', None)
+    return [digest, hook() if callable(hook) else None]
+
+
+def _update_hash(h, obj):
+    """Feed a stable representation of ``obj`` into hash ``h``"""
+    if obj is None or isinstance(obj, (bool, int, float)):
+        h.update(repr(obj).encode('utf-8'))
+    elif isinstance(obj, str):
+        h.update(b's')
+        h.update(obj.encode('utf-8'))
+    elif isinstance(obj, bytes):
+        h.update(b'b')
+        h.update(obj)
+    elif isinstance(obj, dict):
+        h.update(b'{')
+        for key in sorted(obj, key=str):
+            _update_hash(h, str(key))
+            _update_hash(h, obj[key])
+        h.update(b'}')
+    elif isinstance(obj, (pd.Series, pd.Index)):
+        _update_hash(h, obj.to_numpy())
+    elif isinstance(obj, np.ndarray) and obj.dtype != object:
+        h.update(f"{obj.dtype.str}{obj.shape}".encode('utf-8'))
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, (list, tuple, np.ndarray)):
+        if all(isinstance(item, str) for item in obj):
+            # Texts: one join is much faster than hashing item by item
+            h.update(f"texts[{len(obj)}]".encode('utf-8'))
+            h.update('\x1f'.join(obj).encode('utf-8'))
+        else:
+            h.update(b'[')
+            for item in obj:
+                _update_hash(h, item)
+            h.update(b']')
+    elif hasattr(obj, 'get_params'):
+        # scikit-learn estimators: class + constructor parameters
+        _update_hash(h, f"{type(obj).__module__}.{type(obj).__qualname__}")
+        _update_hash(h, obj.get_params(deep=False))
+    elif callable(obj):
+        # Functions/classes: name plus source, so editing the code invalidates the cache;
+        # the defining module's file and data dependencies cover module-level constants
+        module_name = getattr(obj, '__module__', '')
+        _update_hash(h, f"{module_name}.{getattr(obj, '__qualname__', repr(obj))}")
+        try:
+            _update_hash(h, inspect.getsource(obj))
+        except (OSError, TypeError):
+            pass
+        _update_hash(h, _module_dependencies(module_name))
+    else:
+        _update_hash(h, repr(obj))
+
+
+def fingerprint(*parts):
+    """Hex digest identifying ``parts`` (texts, arrays, configs, estimators)"""
+    h = hashlib.blake2b(digest_size=16)
+    _update_hash(h, CACHE_FORMAT_VERSION)
+    for part in parts:
+        _update_hash(h, part)
+    return h.hexdigest()
+
+
+class ArtifactCache:
+    """
+    Versioned on-disk cache keyed by content hash.
+
+    Args:
+        root: Cache directory
+        enabled: When False every call recomputes and nothing is written
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_ROOT, enabled=True):
+        self.root = root
+        self.enabled = enabled
+        self.stats = {'hits': 0, 'misses': 0}
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _save_value(self, directory, name, value):
+        if sparse.issparse(value):
+            value = value.tocsr()
+            for part in ('data', 'indices', 'indptr'):
+                np.save(os.path.join(directory, f"{name}.{part}.npy"), getattr(value, part))
+            return {'kind': 'csr', 'name': name, 'shape': list(value.shape)}
+        if isinstance(value, np.ndarray) and value.dtype != object:
+            np.save(os.path.join(directory, f"{name}.npy"), value)
+            return {'kind': 'ndarray', 'name': name}
+        if isinstance(value, tuple):
+            items = [self._save_value(directory, f"{name}.{i}", item) for i, item in enumerate(value)]
+            return {'kind': 'tuple', 'name': name, 'items': items}
+        joblib.dump(value, os.path.join(directory, f"{name}.joblib"))
+        return {'kind': 'joblib', 'name': name}
+
+    def _load_value(self, directory, entry):
+        kind, name = entry['kind'], entry['name']
+        if kind == 'csr':
+            data, indices, indptr = (
+                np.load(os.path.join(directory, f"{name}.{part}.npy"), mmap_mode='r')
+                for part in ('data', 'indices', 'indptr')
+            )
+            return sparse.csr_matrix((data, indices, indptr), shape=tuple(entry['shape']), copy=False)
+        if kind == 'ndarray':
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r')
+        if kind == 'tuple':
+            return tuple(self._load_value(directory, item) for item in entry['items'])
+        return joblib.load(os.path.join(directory, f"{name}.joblib"))
+
+    def load(self, key):
+        """Stored value for ``key`` or None"""
+        meta_path = os.path.join(self._entry_dir(key), 'meta.json')
+        if not self.enabled or not os.path.exists(meta_path):
+            return None
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        return self._load_value(self._entry_dir(key), meta['value'])
+
+    def save(self, key, value, description=''):
+        """Store ``value`` under ``key`` (written to a temp dir, then renamed)"""
+        if not self.enabled:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        tmp_dir = os.path.join(self.root, f".tmp-{key}-{uuid.uuid4().hex[:8]}")
+        os.makedirs(tmp_dir)
+        try:
+            entry = self._save_value(tmp_dir, 'value', value)
+            meta = {
+                'key': key,
+                'description': description,
+                'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'format_version': CACHE_FORMAT_VERSION,
+                'value': entry,
+            }
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump(meta, f, indent=2)
+            os.replace(tmp_dir, self._entry_dir(key))
+        except OSError:
+            # Another process stored the same key first - keep its copy
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def memoize(self, name, parts, compute):
+        """
+        Return the cached result for ``(name, parts)`` or compute and store it.
+
+        Args:
+            name: Artifact name (part of the key and the description)
+            parts: Inputs and settings that determine the result
+            compute: Zero-argument callable producing the value
+        """
+        key = fingerprint(name, *parts)
+        cached = self.load(key)
+        if cached is not None:
+            self.stats['hits'] += 1
+            return cached
+        self.stats['misses'] += 1
+        value = compute()
+        self.save(key, value, description=name)
+        return value
+
+    def vectorize(self, vectorizer, fit_texts, transform_texts=(), name='vectorizer'):
+        """
+        Fit ``vectorizer`` on ``fit_texts`` and transform the other text sets, cached.
+
+        Returns:
+            (fitted_vectorizer, [fit_matrix, *transformed_matrices])
+        """
+        transform_texts = list(transform_texts)
+
+        def compute():
+            matrices = [vectorizer.fit_transform(fit_texts)]
+            matrices += [vectorizer.transform(texts) for texts in transform_texts]
+            return (vectorizer,) + tuple(matrices)
+
+        value = self.memoize(name, [vectorizer, fit_texts] + transform_texts, compute)
+        return value[0], list(value[1:])
+
+    def clear(self):
+        """Remove every cached artifact"""
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,145 @@
+"""
+Single-pass lexicon / statistics feature extraction.
+
+``create_advanced_text_features`` used to compute every lexicon count with a
+separate ``.apply`` that re-split and lower-cased the document once per
+lexicon word. ``LexiconFeatureExtractor`` tokenizes each document once,
+looks every distinct token up in one dictionary that maps a word to the
+ids of all categories it belongs to, and derives counts, ratios and
+diversity features from those totals in the same pass.
+
+Semantics match the original lambdas: a lexicon count is the number of
+*distinct* lexicon words present in the document.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Lexicons used by create_advanced_text_features
+LEXICONS = {
+    'positive': [
+        'amazing', 'awesome', 'excellent', 'fantastic', 'great', 'love', 'perfect', 'wonderful',
+        'brilliant', 'outstanding', 'superb', 'terrific', 'marvelous', 'good', 'nice', 'best',
+        'beautiful', 'incredible', 'spectacular', 'phenomenal', 'magnificent', 'fabulous',
+        'exceptional', 'remarkable', 'impressive', 'stunning', 'flawless', 'ideal'
+    ],
+    'negative': [
+        'awful', 'terrible', 'horrible', 'bad', 'worst', 'hate', 'disgusting', 'annoying',
+        'frustrating', 'disappointing', 'useless', 'pathetic', 'ridiculous', 'boring', 'poor',
+        'sucks', 'waste', 'trash', 'garbage', 'stupid', 'dumb', 'ugly', 'broken', 'failed',
+        'disaster', 'nightmare', 'catastrophe', 'abysmal', 'dreadful', 'appalling'
+    ],
+    'neutral': [
+        'okay', 'alright', 'decent', 'average', 'normal', 'standard', 'typical', 'regular',
+        'acceptable', 'adequate', 'moderate', 'fair', 'reasonable', 'fine', 'so-so'
+    ],
+    'spotify_positive': ['playlist', 'music', 'song', 'artist', 'album', 'quality', 'sound', 'premium'],
+    'spotify_negative': ['ads', 'crash', 'bug', 'slow', 'freeze', 'error', 'subscription', 'expensive'],
+    'intense_positive': ['love', 'amazing', 'fantastic', 'perfect', 'excellent', 'incredible'],
+    'intense_negative': ['hate', 'terrible', 'awful', 'horrible', 'disgusting', 'worst'],
+}
+
+# Output column of each lexicon count in the notebook DataFrame
+COUNT_COLUMNS = {
+    'positive': 'positive_word_count',
+    'negative': 'negative_word_count',
+    'neutral': 'neutral_word_count',
+    'spotify_positive': 'spotify_positive_words',
+    'spotify_negative': 'spotify_negative_words',
+    'intense_positive': 'intense_positive_count',
+    'intense_negative': 'intense_negative_count',
+}
+
+
+class LexiconFeatureExtractor:
+    """
+    Compute lexicon counts, ratios and diversity features in one pass.
+
+    Args:
+        lexicons: Mapping of category name -> word list (default: ``LEXICONS``)
+    """
+
+    DERIVED_FEATURES = [
+        'word_count', 'avg_word_length', 'unique_word_count', 'lexical_diversity',
+        'sentiment_word_total', 'positive_ratio', 'negative_ratio', 'neutral_ratio',
+        'sentiment_polarity', 'emotional_intensity',
+    ]
+    INTEGER_FEATURES = {'word_count', 'unique_word_count', 'sentiment_word_total'}
+
+    def __init__(self, lexicons=None):
+        self.lexicons = lexicons or LEXICONS
+        self.categories = list(self.lexicons)
+        self.category_index = {name: i for i, name in enumerate(self.categories)}
+
+        # word -> tuple of category ids ('love' is both positive and intense_positive)
+        word_categories = {}
+        for category_id, name in enumerate(self.categories):
+            for word in dict.fromkeys(self.lexicons[name]):
+                word_categories.setdefault(word, []).append(category_id)
+        self.lexicon = {word: tuple(ids) for word, ids in word_categories.items()}
+
+        self.feature_names = [COUNT_COLUMNS.get(name, f'{name}_count') for name in self.categories]
+        self.feature_names += self.DERIVED_FEATURES
+
+    def _count_document(self, text):
+        tokens = text.split()
+        counts = [0] * len(self.categories)
+        lexicon = self.lexicon
+        for token in set(text.lower().split()):
+            category_ids = lexicon.get(token)
+            if category_ids:
+                for category_id in category_ids:
+                    counts[category_id] += 1
+
+        word_count = len(tokens)
+        avg_word_length = sum(len(token) for token in tokens) / word_count if word_count else 0.0
+        return counts + [word_count, avg_word_length, len(set(tokens))]
+
+    def transform(self, texts):
+        """
+        Extract all features for an iterable of processed texts.
+
+        Returns:
+            float64 NumPy array of shape (n_documents, len(feature_names))
+        """
+        series = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+        codes, uniques = pd.factorize(series.fillna(''))
+
+        n_categories = len(self.categories)
+        base = np.array(
+            [self._count_document(str(text)) for text in uniques],
+            dtype=np.float64
+        ).reshape(len(uniques), n_categories + 3)[codes]
+
+        counts = base[:, :n_categories]
+        word_count = base[:, n_categories]
+        unique_word_count = base[:, n_categories + 2]
+
+        def column(name):
+            return counts[:, self.category_index[name]]
+
+        positive, negative, neutral = column('positive'), column('negative'), column('neutral')
+        sentiment_total = positive + negative + neutral
+        derived = np.column_stack([
+            word_count,
+            base[:, n_categories + 1],
+            unique_word_count,
+            unique_word_count / (word_count + 1),
+            sentiment_total,
+            positive / (sentiment_total + 1),
+            negative / (sentiment_total + 1),
+            neutral / (sentiment_total + 1),
+            (positive - negative) / (word_count + 1),
+            (column('intense_positive') + column('intense_negative')) / (word_count + 1),
+        ])
+        return np.hstack([counts, derived])
+
+    def transform_frame(self, texts):
+        """Same as ``transform`` but as a DataFrame with integer count columns"""
+        index = texts.index if isinstance(texts, pd.Series) else None
+        frame = pd.DataFrame(self.transform(texts), columns=self.feature_names, index=index)
+        integer_columns = [COUNT_COLUMNS.get(name, f'{name}_count') for name in self.categories]
+        integer_columns += [name for name in self.DERIVED_FEATURES if name in self.INTEGER_FEATURES]
+        frame[integer_columns] = frame[integer_columns].astype(np.int64)
+        return frame
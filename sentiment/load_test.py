@@ -0,0 +1,145 @@
+"""
+Load test for the local sentiment service (``sentiment.service``).
+
+Opens ``--concurrency`` keep-alive connections and sends ``--requests``
+single-review ``POST /predict`` calls in total, using review texts from a
+CSV file or built-in samples. Reports throughput and client-side p50/p99
+latency, followed by the server's ``/metrics`` (batch sizes, cache hits).
+
+    python -m sentiment.load_test --port 8000 --requests 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import numpy as np
+
+
+SAMPLE_REVIEWS = [
+    "I absolutely love Spotify! The music quality is amazing.",
+    "Terrible app! Keeps crashing and the ads are so annoying.",
+    "Spotify is okay, nothing special. Works fine but could be better.",
+    "Best music streaming service ever! Great playlists.",
+    "Premium is too expensive and the shuffle is broken.",
+    "Love the music but hate the price and ads are annoying",
+    "Used to be great but recent updates made it worse",
+    "Good app but expensive subscription",
+]
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode('latin-1') + body
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    data = await reader.readexactly(length) if length else b''
+    return status, json.loads(data) if data else None
+
+
+async def _client(host, port, texts, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for text in texts:
+            started = time.perf_counter()
+            status, _ = await _request(reader, writer, 'POST', '/predict', {'text': text})
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run_load_test(host='127.0.0.1', port=8000, n_requests=2000, concurrency=32, texts=None,
+                        unique_ratio=0.5, seed=42):
+    """
+    Send ``n_requests`` predictions over ``concurrency`` connections.
+
+    Args:
+        texts: Review texts to sample from (default: ``SAMPLE_REVIEWS``)
+        unique_ratio: Share of requests made unique (suffix added) so they
+            bypass the prediction cache; the rest repeat sample texts
+
+    Returns:
+        dict with client throughput/latency and the server metrics
+    """
+    rng = random.Random(seed)
+    texts = list(texts or SAMPLE_REVIEWS)
+    requests = [
+        f"{rng.choice(texts)} #{i}" if rng.random() < unique_ratio else rng.choice(texts)
+        for i in range(n_requests)
+    ]
+    shards = [requests[i::concurrency] for i in range(concurrency)]
+
+    latencies, errors = [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, shard, latencies, errors) for shard in shards if shard))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, server_metrics = await _request(reader, writer, 'GET', '/metrics')
+    finally:
+        writer.close()
+
+    latencies = np.array(latencies)
+    return {
+        'requests': n_requests,
+        'concurrency': concurrency,
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'requests_per_second': round(n_requests / elapsed, 1),
+        'client_latency_ms': {
+            'p50': round(float(np.percentile(latencies, 50)), 3),
+            'p99': round(float(np.percentile(latencies, 99)), 3),
+        },
+        'server': server_metrics,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test for the sentiment service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--unique-ratio', type=float, default=0.5, help="Share of requests that bypass the cache")
+    parser.add_argument('--csv', help="CSV file with a 'content' column to sample review texts from")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    texts = None
+    if args.csv:
+        import pandas as pd
+        texts = pd.read_csv(args.csv, usecols=['content'])['content'].dropna().astype(str).tolist()
+
+    report = asyncio.run(run_load_test(
+        args.host, args.port, args.requests, args.concurrency, texts, args.unique_ratio
+    ))
+    print(f"📊 {report['requests']} requests, concurrency {report['concurrency']}: "
+          f"{report['requests_per_second']:,.0f} req/s, {report['errors']} errors")
+    print(f"⏱️ Client latency p50 {report['client_latency_ms']['p50']:.1f} ms, "
+          f"p99 {report['client_latency_ms']['p99']:.1f} ms")
+    print("🖥️ Server metrics:")
+    print(json.dumps(report['server'], indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""
+Inference-only, quantized TFLite export of the Experiment 3 LSTM.
+
+The training model uses ``recurrent_dropout=0.3``, which rules out the fused
+LSTM kernels, and it is fed sequences padded to ``max_length=150``. For
+inference ``build_inference_model`` rebuilds the same layers with
+``recurrent_dropout=0``, no Dropout layers, no masking and a dynamic
+sequence length, then copies the trained weights. ``export_tflite``
+converts that graph to TFLite with dynamic-range (default), float16 or full
+int8 quantization. ``TFLiteSentimentModel`` runs each review at its own
+length, so no timesteps are spent on padding; interpreters stay allocated
+per length, and all-padding reviews get the Keras model's masked output
+(stored next to the ``.tflite`` file).
+
+``benchmark_lstm_export`` compares the Keras model and the TFLite model:
+per-review latency (p50/p99), batch throughput, model size, process memory
+growth, accuracy and prediction agreement.
+
+TensorFlow (or ``tflite_runtime`` for inference only) is imported lazily.
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def _tf():
+    import tensorflow as tf
+    return tf
+
+
+def _interpreter_class():
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        Interpreter = _tf().lite.Interpreter
+    return Interpreter
+
+
+def _inference_layer_config(layer):
+    config = layer.get_config()
+    class_name = type(layer).__name__
+    if class_name == 'Embedding':
+        config['mask_zero'] = False  # unpadded input: nothing to mask
+        for key in ('input_length', 'batch_input_shape', 'batch_shape'):
+            config.pop(key, None)
+    elif class_name == 'Bidirectional':
+        for key in ('layer', 'backward_layer'):
+            if key in config and config[key]:
+                config[key]['config']['recurrent_dropout'] = 0.0
+                config[key]['config']['dropout'] = 0.0
+    elif class_name in ('LSTM', 'GRU'):
+        config['recurrent_dropout'] = 0.0
+        config['dropout'] = 0.0
+    return config
+
+
+def build_inference_model(trained_model):
+    """
+    Same architecture without dropout/masking and with dynamic sequence length.
+
+    Dropout layers carry no weights and are dropped. Every other layer is
+    rebuilt from its config and receives the trained weights.
+    """
+    tf = _tf()
+    inputs = tf.keras.Input(shape=(None,), dtype='int32', name='tokens')
+    x = inputs
+    for layer in trained_model.layers:
+        if type(layer).__name__ in ('Dropout', 'SpatialDropout1D', 'InputLayer'):
+            continue
+        clone = type(layer).from_config(_inference_layer_config(layer))
+        x = clone(x)
+        clone.set_weights(layer.get_weights())
+    return tf.keras.Model(inputs, x, name=f"{trained_model.name}_inference")
+
+
+def export_tflite(trained_model, path, quantization='dynamic', representative_sequences=None,
+                  allow_select_ops=True):
+    """
+    Convert the trained LSTM to a TFLite file with dynamic sequence length.
+
+    Args:
+        trained_model: Fitted Keras model from Experiment 3
+        path: Output ``.tflite`` file
+        quantization: 'dynamic' (int8 weights), 'float16', 'int8' (needs
+            ``representative_sequences``) or None
+        representative_sequences: Token sequences used to calibrate 'int8'
+        allow_select_ops: Fall back to TF ops for anything the builtin
+            LSTM kernels cannot express
+
+    Returns:
+        Size of the written file in bytes (the all-padding output is stored
+        in ``<path>.json``)
+    """
+    tf = _tf()
+    model = build_inference_model(trained_model)
+
+    @tf.function(input_signature=[tf.TensorSpec([1, None], tf.int32, name='tokens')])
+    def serve(tokens):
+        return model(tokens, training=False)
+
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([serve.get_concrete_function()], model)
+    if quantization is not None:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    if quantization == 'float16':
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        if representative_sequences is None:
+            raise ValueError("int8 quantization needs representative_sequences")
+
+        def representative_dataset():
+            for sequence in representative_sequences:
+                if len(sequence):
+                    yield [np.asarray(sequence, dtype=np.int32).reshape(1, -1)]
+
+        converter.representative_dataset = representative_dataset
+    if allow_select_ops:
+        converter.target_spec.supported_ops = [
+            tf.lite.OpsSet.TFLITE_BUILTINS,
+            tf.lite.OpsSet.SELECT_TF_OPS,
+        ]
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(converter.convert())
+    with open(_metadata_path(path), 'w', encoding='utf-8') as f:
+        json.dump({'empty_probabilities': empty_sequence_probabilities(trained_model).tolist()}, f)
+    return os.path.getsize(path)
+
+
+def _metadata_path(path):
+    return f"{path}.json"
+
+
+def empty_sequence_probabilities(trained_model):
+    """
+    Keras output for an all-padding review.
+
+    With ``mask_zero=True`` the trained model sees no timesteps at all for
+    such a row; the unmasked inference graph cannot express that, so the
+    value is computed once here and returned directly by the TFLite runner.
+    """
+    length = trained_model.input_shape[1] or 1
+    return np.asarray(trained_model.predict(np.zeros((1, length), dtype=np.int32), verbose=0)[0],
+                      dtype=np.float32)
+
+
+class TFLiteSentimentModel:
+    """
+    TFLite LSTM runner that scores every review at its own length.
+
+    ``predict`` accepts either token lists or a post-padded array (as built
+    for the Keras model); trailing zeros are stripped before inference.
+    Reviews are scored in length order, and one interpreter per recently
+    used length (all sharing the model buffer) is kept allocated, so
+    ``resize_tensor_input`` / ``allocate_tensors`` run once per length
+    instead of on almost every review. Reviews without tokens get
+    ``empty_probabilities`` (written next to the model by ``export_tflite``).
+
+    Args:
+        path: ``.tflite`` file
+        num_threads: Interpreter threads
+        max_interpreters: Lengths kept allocated at the same time
+    """
+
+    backend = 'tflite'
+
+    def __init__(self, path, num_threads=None, max_interpreters=32):
+        self.path = path
+        self.num_threads = num_threads
+        self.max_interpreters = max_interpreters
+        with open(path, 'rb') as f:
+            self._model_content = f.read()
+        self._interpreters = OrderedDict()
+        self.allocations = 0
+
+        interpreter = self._interpreter(1)
+        self._input = interpreter.get_input_details()[0]
+        self._output = interpreter.get_output_details()[0]
+        self.n_classes = int(self._output['shape'][-1])
+
+        self.empty_probabilities = None
+        if os.path.exists(_metadata_path(path)):
+            with open(_metadata_path(path), encoding='utf-8') as f:
+                empty = json.load(f).get('empty_probabilities')
+            if empty is not None:
+                self.empty_probabilities = np.asarray(empty, dtype=np.float32)
+        if self.empty_probabilities is None:
+            # Exported before the metadata existed: no evidence for any class
+            self.empty_probabilities = np.full(self.n_classes, 1.0 / self.n_classes, dtype=np.float32)
+
+    def _interpreter(self, length):
+        """Interpreter allocated for ``length`` tokens (LRU over lengths)"""
+        interpreter = self._interpreters.get(length)
+        if interpreter is not None:
+            self._interpreters.move_to_end(length)
+            return interpreter
+        interpreter = _interpreter_class()(model_content=self._model_content, num_threads=self.num_threads)
+        input_index = interpreter.get_input_details()[0]['index']
+        interpreter.resize_tensor_input(input_index, (1, length))
+        interpreter.allocate_tensors()
+        self.allocations += 1
+        self._interpreters[length] = interpreter
+        if len(self._interpreters) > self.max_interpreters:
+            self._interpreters.popitem(last=False)
+        return interpreter
+
+    def _run(self, tokens):
+        interpreter = self._interpreter(len(tokens))
+        interpreter.set_tensor(self._input['index'], np.asarray(tokens, dtype=np.int32).reshape(1, -1))
+        interpreter.invoke()
+        return interpreter.get_tensor(self._output['index'])[0]
+
+    def predict(self, sequences, verbose=0):
+        """Class probabilities, one row per sequence"""
+        trimmed = []
+        for sequence in sequences:
+            sequence = np.asarray(sequence)
+            nonzero = np.flatnonzero(sequence)
+            trimmed.append(sequence[:nonzero[-1] + 1] if len(nonzero) else sequence[:0])
+        rows = np.empty((len(trimmed), self.n_classes), dtype=np.float32)
+        # Length order: every length is allocated once per call at most
+        for i in sorted(range(len(trimmed)), key=lambda i: len(trimmed[i])):
+            rows[i] = self._run(trimmed[i]) if len(trimmed[i]) else self.empty_probabilities
+        return rows
+
+    def save(self, path):
+        if os.path.abspath(path) != os.path.abspath(self.path):
+            with open(path, 'wb') as dst:
+                dst.write(self._model_content)
+        with open(_metadata_path(path), 'w', encoding='utf-8') as f:
+            json.dump({'empty_probabilities': self.empty_probabilities.tolist()}, f)
+
+    def __getstate__(self):
+        return {'path': self.path, 'num_threads': self.num_threads, 'max_interpreters': self.max_interpreters}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state.get('num_threads'), state.get('max_interpreters', 32))
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except ImportError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def _single_latencies(predict_one, samples):
+    latencies = []
+    for sample in samples:
+        started = time.perf_counter()
+        predict_one(sample)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return np.array(latencies)
+
+
+def benchmark_lstm_export(keras_model, tflite_path, sequences, labels, max_length,
+                          n_latency=300, batch_size=64):
+    """
+    Compare the Keras model and the TFLite export on the same reviews.
+
+    Args:
+        keras_model: Trained Keras model (fed post-padded ``max_length`` arrays)
+        tflite_path: File written by ``export_tflite``
+        sequences: Unpadded token sequences (already truncated to ``max_length``)
+        labels: Integer labels for ``sequences``
+        n_latency: Reviews used for the single-review latency measurement
+
+    Returns:
+        DataFrame with one row per runtime
+    """
+    from .predictor import pad_sequences_post
+
+    labels = np.asarray(labels)
+    padded = pad_sequences_post(sequences, max_length)
+    latency_idx = np.arange(min(n_latency, len(sequences)))
+    rows = []
+
+    rss_before = _rss_mb()
+    keras_latency = _single_latencies(lambda i: keras_model.predict(padded[i:i + 1], verbose=0), latency_idx)
+    started = time.perf_counter()
+    keras_probs = keras_model.predict(padded, batch_size=batch_size, verbose=0)
+    keras_seconds = time.perf_counter() - started
+    keras_predictions = keras_probs.argmax(axis=1)
+    rows.append({
+        'runtime': 'keras (padded)',
+        'size_mb': keras_model.count_params() * 4 / 1e6,
+        'memory_growth_mb': _rss_mb() - rss_before,
+        'latency_p50_ms': np.percentile(keras_latency, 50),
+        'latency_p99_ms': np.percentile(keras_latency, 99),
+        'reviews_per_second': len(sequences) / keras_seconds,
+        'accuracy': float((keras_predictions == labels).mean()),
+        'agreement': 1.0,
+    })
+
+    rss_before = _rss_mb()
+    tflite_model = TFLiteSentimentModel(tflite_path)
+    tflite_latency = _single_latencies(lambda i: tflite_model.predict([sequences[i]]), latency_idx)
+    started = time.perf_counter()
+    tflite_probs = tflite_model.predict(sequences)
+    tflite_seconds = time.perf_counter() - started
+    tflite_predictions = tflite_probs.argmax(axis=1)
+    rows.append({
+        'runtime': 'tflite (dynamic length)',
+        'size_mb': os.path.getsize(tflite_path) / 1e6,
+        'memory_growth_mb': _rss_mb() - rss_before,
+        'latency_p50_ms': np.percentile(tflite_latency, 50),
+        'latency_p99_ms': np.percentile(tflite_latency, 99),
+        'reviews_per_second': len(sequences) / tflite_seconds,
+        'accuracy': float((tflite_predictions == labels).mean()),
+        'agreement': float((tflite_predictions == keras_predictions).mean()),
+    })
+    return pd.DataFrame(rows).round(4)
@@ -0,0 +1,307 @@
+"""
+Near-duplicate review detection with MinHash + LSH.
+
+The loaders only drop exact ``reviewId`` duplicates, but Play Store data
+holds many copy-pasted and templated reviews (the same complaint posted
+twice, spam with a different emoji or app name). They inflate training
+time, and when copies land on both sides of ``train_test_split`` the test
+accuracy partly measures memorisation.
+
+``MinHasher`` turns a review into a fixed-size signature: for each of
+``num_perm`` hash functions, the minimum hash over the review's character
+shingles. The share of equal signature slots estimates the Jaccard
+similarity of two reviews' shingle sets. ``LSHIndex`` cuts signatures into
+bands and buckets every band, so a query only looks at reviews sharing at
+least one band (sub-linear in the index size) and verifies those candidates
+with the signature estimate.
+
+``NearDuplicateIndex`` combines both and grows batch by batch as reviews
+arrive; ``deduplicate_frame`` is the dedup stage the notebook runs before
+splitting. Reviews with fewer than ``min_words`` words are never treated as
+duplicates: "good app" written by a thousand users is not spam.
+"""
+
+import re
+from collections import Counter
+
+import joblib
+import numpy as np
+
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_NON_WORD = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'\s+')
+
+
+def normalize_text(text):
+    """Lowercase, punctuation and emoji stripped, whitespace collapsed"""
+    return _SPACES.sub(' ', _NON_WORD.sub(' ', str(text).lower())).strip()
+
+
+def shingle_hashes(text, shingle_size=5):
+    """
+    Unique 32-bit hashes of the character ``shingle_size``-grams of ``text``.
+
+    The rolling polynomial hash runs on the UTF-32 code points with numpy,
+    so it is deterministic across processes (unlike ``hash()``).
+    """
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if codes.size == 0:
+        return codes
+    k = min(shingle_size, codes.size)
+    n = codes.size - k + 1
+    hashes = np.zeros(n, dtype=np.uint64)
+    for offset in range(k):
+        hashes = hashes * np.uint64(1_000_003) + codes[offset:offset + n]
+    # Finaliser (splitmix64) so similar shingles spread over the whole range
+    hashes ^= hashes >> np.uint64(30)
+    hashes *= np.uint64(0xBF58476D1CE4E5B9)
+    hashes ^= hashes >> np.uint64(27)
+    return np.unique(hashes & _MAX_HASH)
+
+
+class MinHasher:
+    """
+    MinHash signatures over character shingles.
+
+    Args:
+        num_perm: Signature length (more = better Jaccard estimate, slower)
+        shingle_size: Characters per shingle
+        seed: Seed of the hash-function parameters; indexes can only be
+            compared when built with the same seed and ``num_perm``
+    """
+
+    def __init__(self, num_perm=128, shingle_size=5, seed=1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.seed = seed
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, 2 ** 61 - 1, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, 2 ** 61 - 1, size=num_perm, dtype=np.uint64)
+
+    def signature(self, text, normalized=False):
+        """Signature (uint32 array of length ``num_perm``) of one review"""
+        text = text if normalized else normalize_text(text)
+        hashes = shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        with np.errstate(over='ignore'):
+            permuted = (hashes[:, None] * self._a + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+    def signatures(self, texts, normalized=False):
+        """(n_texts, num_perm) signature matrix"""
+        if not len(texts):
+            return np.empty((0, self.num_perm), dtype=np.uint32)
+        return np.vstack([self.signature(text, normalized) for text in texts])
+
+
+def optimal_bands(threshold, num_perm, false_positive_weight=0.5, false_negative_weight=0.5):
+    """
+    (bands, rows) that minimise the weighted false positive / negative area.
+
+    A pair with Jaccard similarity ``s`` becomes a candidate with probability
+    ``1 - (1 - s**rows)**bands``; the band layout moves that S-curve so it
+    rises around ``threshold``.
+    """
+    grid = np.linspace(0.0, 1.0, 501)
+    below, above = grid[grid < threshold], grid[grid >= threshold]
+    best, best_error = (1, num_perm), np.inf
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positive = (1 - (1 - below ** rows) ** bands).mean() * threshold
+        false_negative = ((1 - above ** rows) ** bands).mean() * (1 - threshold)
+        error = false_positive_weight * false_positive + false_negative_weight * false_negative
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+class LSHIndex:
+    """
+    Banded locality-sensitive hashing over MinHash signatures.
+
+    Args:
+        threshold: Estimated Jaccard similarity from which two signatures
+            count as near-duplicates
+        num_perm: Signature length
+        bands, rows: Band layout (default: ``optimal_bands(threshold, num_perm)``)
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=None, rows=None):
+        if bands is None or rows is None:
+            bands, rows = optimal_bands(threshold, num_perm)
+        if bands * rows > num_perm:
+            raise ValueError("bands * rows must not exceed num_perm")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = rows
+        self.keys = []
+        self._tables = [{} for _ in range(bands)]
+        self._signatures = np.empty((0, num_perm), dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _band_keys(self, signature):
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def insert(self, key, signature):
+        position = len(self.keys)
+        if position == len(self._signatures):
+            # Grow the signature store geometrically (amortised O(1) inserts)
+            grown = np.empty((max(64, 2 * position), self.num_perm), dtype=np.uint32)
+            grown[:position] = self._signatures[:position]
+            self._signatures = grown
+        self._signatures[position] = signature
+        self.keys.append(key)
+        for table, band_key in zip(self._tables, self._band_keys(signature)):
+            table.setdefault(band_key, []).append(position)
+
+    def query(self, signature):
+        """``[(key, estimated_similarity), ...]`` above the threshold, most similar first"""
+        candidates = set()
+        for table, band_key in zip(self._tables, self._band_keys(signature)):
+            candidates.update(table.get(band_key, ()))
+        if not candidates:
+            return []
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        similarity = (self._signatures[positions] == signature).mean(axis=1)
+        order = np.argsort(-similarity, kind='stable')
+        return [
+            (self.keys[positions[i]], float(similarity[i]))
+            for i in order if similarity[i] >= self.threshold
+        ]
+
+
+class NearDuplicateIndex:
+    """
+    Incremental near-duplicate index over review texts.
+
+    Only the first review of every near-duplicate group (its representative)
+    is stored; later copies are reported as duplicates of it.
+
+    Args:
+        threshold: Estimated Jaccard similarity of the shingle sets from which
+            two reviews are near-duplicates
+        num_perm, shingle_size, seed: ``MinHasher`` settings
+        min_words: Reviews with fewer words are never flagged or indexed
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, shingle_size=5, min_words=3, seed=1):
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size, seed=seed)
+        self.lsh = LSHIndex(threshold=threshold, num_perm=num_perm)
+        self.min_words = min_words
+        self.cluster_sizes = Counter()
+        self.examples = {}
+        self.n_seen = 0
+        self.n_duplicates = 0
+        self.n_short = 0
+
+    def __len__(self):
+        return len(self.lsh)
+
+    def _prepare(self, text):
+        normalized = normalize_text(text)
+        if len(normalized.split()) < self.min_words:
+            return None
+        return self.hasher.signature(normalized, normalized=True)
+
+    def query(self, text):
+        """Indexed reviews similar to ``text``: ``[(key, estimated_similarity), ...]``"""
+        signature = self._prepare(text)
+        return [] if signature is None else self.lsh.query(signature)
+
+    def is_duplicate(self, text):
+        return bool(self.query(text))
+
+    def add(self, texts, keys=None):
+        """
+        Check a batch against the index (and against itself), then index it.
+
+        Args:
+            texts: Review texts in arrival order
+            keys: Identifiers (e.g. reviewId); default is a running position
+
+        Returns:
+            List aligned with ``texts``: the representative key a review
+            duplicates, or None for new (and too short) reviews
+        """
+        texts = list(texts)
+        if keys is None:
+            keys = range(self.n_seen, self.n_seen + len(texts))
+        duplicate_of = []
+        for key, text in zip(keys, texts):
+            self.n_seen += 1
+            signature = self._prepare(text)
+            if signature is None:
+                self.n_short += 1
+                duplicate_of.append(None)
+                continue
+            matches = self.lsh.query(signature)
+            if matches:
+                representative = matches[0][0]
+                self.cluster_sizes[representative] += 1
+                self.n_duplicates += 1
+                duplicate_of.append(representative)
+                continue
+            self.lsh.insert(key, signature)
+            self.cluster_sizes[key] = 1
+            self.examples[key] = str(text)[:120]
+            duplicate_of.append(None)
+        return duplicate_of
+
+    def keep_mask(self, texts, keys=None):
+        """Boolean mask that keeps the first review of every near-duplicate group"""
+        return np.array([match is None for match in self.add(texts, keys)], dtype=bool)
+
+    def top_clusters(self, n=10):
+        """Largest near-duplicate groups (likely templates / spam): ``[(size, example_text), ...]``"""
+        return [
+            (size, self.examples[key])
+            for key, size in self.cluster_sizes.most_common(n) if size > 1
+        ]
+
+    def summary(self):
+        return {
+            'reviews_seen': self.n_seen,
+            'indexed': len(self),
+            'near_duplicates': self.n_duplicates,
+            'too_short': self.n_short,
+            'duplicate_share': self.n_duplicates / self.n_seen if self.n_seen else 0.0,
+            'bands': self.lsh.bands,
+            'rows': self.lsh.rows,
+        }
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def deduplicate_frame(frame, text_column='content', key_column=None, index=None, **options):
+    """
+    Drop near-duplicate reviews, keeping the first of every group.
+
+    Run before ``train_test_split`` so copies of a review cannot end up on
+    both sides of the split.
+
+    Args:
+        frame: Reviews DataFrame
+        text_column: Column compared for near-duplicates
+        key_column: Column used as index key (default: row position)
+        index: Existing ``NearDuplicateIndex`` to check against and extend;
+            a new one is built from ``options`` otherwise
+
+    Returns:
+        (deduplicated_frame, index)
+    """
+    if index is None:
+        index = NearDuplicateIndex(**options)
+    keys = frame[key_column].tolist() if key_column else None
+    mask = index.keep_mask(frame[text_column].fillna('').astype(str).tolist(), keys)
+    return frame[mask].reset_index(drop=True), index
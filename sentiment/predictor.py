@@ -0,0 +1,267 @@
+"""
+Standalone sentiment predictor backed by a single serialized pipeline.
+
+The notebook's ``SpotifySentimentPredictor`` reads the fitted model,
+vectorizer and scaler from notebook globals, so it only works inside a fully
+executed notebook. ``save_pipeline`` writes everything inference needs
+(vectorizer, model, scaler, statistical feature list, label classes, model
+metadata) to one joblib file, and ``load_predictor`` restores it without
+the notebook.
+
+Nothing heavy is imported at module level. Unpickling the artifact imports
+only the library of the stored model; TensorFlow is imported only for
+``deep_learning`` artifacts, whose Keras or TFLite model is stored next to
+the joblib file (``<name>.keras`` / ``<name>.tflite``). NLTK preprocessing and TextBlob scoring are
+imported on first prediction, and TextBlob only when the model uses
+statistical features.
+"""
+
+import os
+import time
+
+import joblib
+import numpy as np
+
+
+PIPELINE_FORMAT_VERSION = 1
+
+# Confidence reported for models without predict_proba (as in the notebook predictor)
+DEFAULT_CONFIDENCE = {
+    'traditional_ml': 0.90,
+    'traditional_ml_enhanced': 0.95,
+    'ensemble': 0.95,
+}
+
+_BACKEND_MODULES = {
+    'xgboost': 'xgboost',
+    'lightgbm': 'lightgbm',
+    'catboost': 'catboost',
+    'keras': 'keras',
+    'tensorflow': 'keras',
+}
+
+
+def detect_backend(model):
+    """Library a fitted model belongs to: sklearn, xgboost, lightgbm, catboost, keras or tflite"""
+    if getattr(model, 'backend', None) == 'tflite':
+        return 'tflite'
+    root = type(model).__module__.split('.')[0]
+    return _BACKEND_MODULES.get(root, 'sklearn')
+
+
+# Models stored next to the joblib file instead of inside it
+_SIDECAR_EXTENSIONS = {'keras': '.keras', 'tflite': '.tflite'}
+
+
+def _sidecar_path(path, backend):
+    return os.path.splitext(path)[0] + _SIDECAR_EXTENSIONS[backend]
+
+
+def save_pipeline(path, model, vectorizer, classes, model_name, category='traditional_ml',
+                  scaler=None, statistical_features=None, max_length=None, metrics=None):
+    """
+    Serialize a trained model and everything needed to run it.
+
+    Args:
+        path: Output file (e.g. ``artifacts/models/best_pipeline.joblib``)
+        model: Fitted estimator (Keras model or ``TFLiteSentimentModel`` for ``deep_learning``)
+        vectorizer: Fitted TF-IDF vectorizer, or Keras tokenizer
+        classes: Label names in encoded order (``label_encoder.classes_``)
+        model_name: Display name of the model
+        category: 'traditional_ml', 'traditional_ml_enhanced', 'ensemble' or 'deep_learning'
+        scaler: Fitted scaler for the statistical features
+        statistical_features: Statistical columns appended to the text features
+        max_length: Sequence length for ``deep_learning`` models
+        metrics: Test metrics to report in ``get_model_info``
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    backend = detect_backend(model)
+    pipeline = {
+        'format_version': PIPELINE_FORMAT_VERSION,
+        'model_name': model_name,
+        'category': category,
+        'backend': backend,
+        'classes': [str(label) for label in classes],
+        'vectorizer': vectorizer,
+        'scaler': scaler,
+        'statistical_features': list(statistical_features or []),
+        'max_length': max_length,
+        'metrics': dict(metrics or {}),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    if backend in _SIDECAR_EXTENSIONS:
+        model.save(_sidecar_path(path, backend))
+        pipeline['model'] = None
+    else:
+        pipeline['model'] = model
+    joblib.dump(pipeline, path)
+    return path
+
+
+def pad_sequences_post(sequences, max_length):
+    """``pad_sequences(..., padding='post', truncating='post')`` without importing Keras"""
+    padded = np.zeros((len(sequences), max_length), dtype=np.int32)
+    for row, sequence in enumerate(sequences):
+        sequence = sequence[:max_length]
+        padded[row, :len(sequence)] = sequence
+    return padded
+
+
+def statistical_feature_frame(texts, processed_texts):
+    """
+    Statistical features for inference, computed like the notebook's
+    ``create_advanced_text_features`` (no rating available, so
+    ``rating_text_consistency`` is 1).
+    """
+    import pandas as pd
+    from .document_features import FEATURE_COLUMNS, score_document
+    from .features import LexiconFeatureExtractor
+
+    raw = pd.Series([str(text) for text in texts], dtype=object)
+    frame = LexiconFeatureExtractor().transform_frame(pd.Series(list(processed_texts), dtype=object))
+
+    frame['char_count'] = raw.str.len()
+    frame['sentence_count'] = raw.str.count('[.!?]+') + 1
+    frame['avg_sentence_length'] = frame['word_count'] / frame['sentence_count']
+    frame['exclamation_count'] = raw.str.count('!')
+    frame['question_count'] = raw.str.count(r'\?')
+    frame['period_count'] = raw.str.count(r'\.')
+    frame['comma_count'] = raw.str.count(',')
+    frame['uppercase_count'] = raw.str.count('[A-Z]')
+    frame['uppercase_ratio'] = frame['uppercase_count'] / (frame['char_count'] + 1)
+
+    scores = pd.DataFrame([score_document(text) for text in raw], columns=FEATURE_COLUMNS)
+    frame[FEATURE_COLUMNS] = scores
+    frame['rating_text_consistency'] = 1
+    return frame
+
+
+class SpotifySentimentPredictor:
+    """
+    Predictor for a pipeline written by ``save_pipeline``.
+
+    Args:
+        pipeline: Loaded pipeline dict
+        model: Model object (only needed when it is not inside the dict)
+    """
+
+    def __init__(self, pipeline, model=None):
+        self.pipeline = pipeline
+        self.model = model if model is not None else pipeline['model']
+        self.vectorizer = pipeline['vectorizer']
+        self.scaler = pipeline['scaler']
+        self.statistical_features = pipeline['statistical_features']
+        self.classes = np.array(pipeline['classes'])
+        self.model_name = pipeline['model_name']
+        self.model_type_category = pipeline['category']
+        self.max_length = pipeline['max_length']
+
+    @classmethod
+    def load(cls, path):
+        """Load a pipeline artifact, importing only the backend it needs"""
+        pipeline = joblib.load(path)
+        if pipeline.get('format_version') != PIPELINE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported pipeline format: {pipeline.get('format_version')}")
+        model = None
+        if pipeline['backend'] == 'keras':
+            from tensorflow.keras.models import load_model
+            model = load_model(_sidecar_path(path, 'keras'))
+        elif pipeline['backend'] == 'tflite':
+            from .lstm_export import TFLiteSentimentModel
+            model = TFLiteSentimentModel(_sidecar_path(path, 'tflite'))
+        return cls(pipeline, model=model)
+
+    def preprocess_texts(self, texts):
+        """Clean + lemmatize exactly as in training"""
+        from .preprocessing import get_preprocessor
+        from .text_cleaning import clean_texts
+
+        return get_preprocessor().preprocess_batch(clean_texts([str(text) for text in texts]))
+
+    def _features(self, texts, processed):
+        if self.model_type_category == 'deep_learning':
+            return pad_sequences_post(self.vectorizer.texts_to_sequences(processed), self.max_length)
+
+        text_features = self.vectorizer.transform(processed)
+        if self.model_type_category not in ('traditional_ml_enhanced', 'ensemble') or not self.statistical_features:
+            return text_features
+
+        from scipy.sparse import csr_matrix, hstack
+        frame = statistical_feature_frame(texts, processed)
+        values = frame.reindex(columns=self.statistical_features, fill_value=0.0).to_numpy(dtype=np.float64)
+        if self.scaler is not None:
+            values = self.scaler.transform(values)
+        return hstack([text_features, csr_matrix(values)], format='csr')
+
+    def predict_arrays(self, texts):
+        """
+        Vectorized prediction without building per-review dicts.
+
+        Returns:
+            (processed_texts, prediction codes, confidences)
+        """
+        texts = list(texts)
+        processed = self.preprocess_texts(texts)
+        features = self._features(texts, processed)
+
+        if self.model_type_category == 'deep_learning':
+            if self.pipeline['backend'] == 'keras':
+                # Length-sorted batches padded to their own maximum (masked embedding)
+                from .sequence_batching import predict_bucketed, unpad_sequences
+                probabilities = predict_bucketed(self.model, unpad_sequences(features))
+            else:
+                probabilities = np.asarray(self.model.predict(features, verbose=0))
+            predictions = probabilities.argmax(axis=1)
+            confidences = probabilities.max(axis=1)
+        else:
+            predictions = np.asarray(self.model.predict(features)).reshape(-1).astype(int)
+            if hasattr(self.model, 'predict_proba'):
+                confidences = np.asarray(self.model.predict_proba(features)).max(axis=1)
+            else:
+                confidences = np.full(len(texts), DEFAULT_CONFIDENCE.get(self.model_type_category, 0.90))
+        return processed, predictions, confidences
+
+    def predict_batch(self, texts):
+        """Predict sentiment for a list of texts in one vectorized pass"""
+        texts = list(texts)
+        processed, predictions, confidences = self.predict_arrays(texts)
+        return [
+            {
+                'text': text,
+                'processed_text': processed_text,
+                'sentiment': str(self.classes[prediction]),
+                'confidence': float(confidence),
+                'model_used': self.model_name,
+                'prediction_numeric': int(prediction),
+            }
+            for text, processed_text, prediction, confidence in zip(texts, processed, predictions, confidences)
+        ]
+
+    def predict_sentiment(self, text):
+        """Predict sentiment for a single text"""
+        return self.predict_batch([text])[0]
+
+    def get_model_info(self):
+        """Model name, category, stored metrics and feature details"""
+        info = {
+            'model_name': self.model_name,
+            'model_type': self.model_type_category,
+            'backend': self.pipeline['backend'],
+            'created_at': self.pipeline['created_at'],
+        }
+        info.update(self.pipeline['metrics'])
+        if self.statistical_features:
+            info['uses_statistical_features'] = True
+            info['statistical_features_count'] = len(self.statistical_features)
+        if self.model_type_category == 'deep_learning':
+            info['max_sequence_length'] = self.max_length
+            info['vocabulary_size'] = len(self.vectorizer.word_index)
+        return info
+
+
+def load_predictor(path):
+    """Shortcut for ``SpotifySentimentPredictor.load(path)``"""
+    return SpotifySentimentPredictor.load(path)
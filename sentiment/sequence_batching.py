@@ -0,0 +1,192 @@
+"""
+Length-bucketed batching for the LSTM.
+
+Every review is padded to ``max_length=150`` for Experiment 3, although most
+reviews are only a few tokens long, so most LSTM timesteps process padding.
+``make_bucketed_dataset`` builds a ``tf.data`` pipeline that groups
+sequences of similar length (``bucket_by_sequence_length``), pads each batch
+only to its own longest sequence and prefetches in the background.
+``predict_bucketed`` applies the same idea to inference: reviews are sorted
+by length, scored in contiguous batches and returned in input order.
+
+With ``mask_zero=True`` in the embedding, post-padding is masked, so the
+model output does not depend on how much padding a batch carries.
+``padding_report`` measures the share of padded timesteps for both schemes
+and ``benchmark_sequence_batching`` times an epoch and inference both ways.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def _tf():
+    import tensorflow as tf
+    return tf
+
+
+def unpad_sequences(padded):
+    """Token lists from a post-padded array (token ids start at 1)"""
+    padded = np.asarray(padded)
+    lengths = np.count_nonzero(padded, axis=1)
+    return [row[:length] for row, length in zip(padded, lengths)]
+
+
+def bucket_boundaries(lengths, n_buckets=8, max_length=None):
+    """Bucket upper bounds at length quantiles (unique, increasing)"""
+    lengths = np.asarray(lengths)
+    if max_length is not None:
+        lengths = np.minimum(lengths, max_length)
+    quantiles = np.quantile(lengths, np.linspace(0, 1, n_buckets + 1)[1:-1])
+    return sorted({int(q) + 1 for q in quantiles if q >= 1})
+
+
+def make_bucketed_dataset(sequences, labels=None, batch_size=64, boundaries=None, n_buckets=8,
+                          num_classes=3, shuffle=True, seed=42):
+    """
+    ``tf.data`` pipeline of length-bucketed, per-batch padded sequences.
+
+    Args:
+        sequences: Unpadded token lists (already truncated to ``max_length``)
+        labels: Integer labels (one-hot encoded to ``num_classes``) or None
+        boundaries: Bucket upper bounds (default: ``bucket_boundaries``)
+        shuffle: Shuffle examples before bucketing (training)
+
+    Returns:
+        ``tf.data.Dataset`` yielding ``tokens`` or ``(tokens, one_hot_labels)``
+    """
+    tf = _tf()
+    lengths = np.array([len(sequence) for sequence in sequences], dtype=np.int64)
+    boundaries = boundaries or bucket_boundaries(lengths, n_buckets)
+
+    # One flat token array + row lengths (tf.ragged.constant walks nested Python lists)
+    flat = np.concatenate([np.asarray(sequence, dtype=np.int32) for sequence in sequences]
+                          or [np.zeros(0, dtype=np.int32)])
+    ragged = tf.RaggedTensor.from_row_lengths(flat, lengths)
+    dataset = tf.data.Dataset.from_tensor_slices(ragged)
+    if labels is not None:
+        one_hot = tf.one_hot(np.asarray(labels, dtype=np.int32), num_classes)
+        dataset = tf.data.Dataset.zip((dataset, tf.data.Dataset.from_tensor_slices(one_hot)))
+    if shuffle:
+        dataset = dataset.shuffle(len(lengths), seed=seed, reshuffle_each_iteration=True)
+
+    def element_length(tokens, *_):
+        return tf.shape(tokens)[0]
+
+    dataset = dataset.bucket_by_sequence_length(
+        element_length_func=element_length,
+        bucket_boundaries=boundaries,
+        bucket_batch_sizes=[batch_size] * (len(boundaries) + 1),
+        pad_to_bucket_boundary=False,
+        drop_remainder=False
+    )
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def length_sorted_batches(lengths, batch_size):
+    """Index batches of reviews with similar length (for inference)"""
+    order = np.argsort(lengths, kind='stable')
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+def predict_bucketed(model, sequences, batch_size=256):
+    """Predict with length-sorted batches padded to their own maximum, in input order"""
+    from .predictor import pad_sequences_post
+
+    lengths = np.array([max(len(sequence), 1) for sequence in sequences])
+    outputs = None
+    for batch_idx in length_sorted_batches(lengths, batch_size):
+        batch = pad_sequences_post([sequences[i] for i in batch_idx], int(lengths[batch_idx].max()))
+        probabilities = np.asarray(model.predict_on_batch(batch))
+        if outputs is None:
+            outputs = np.zeros((len(sequences), probabilities.shape[1]), dtype=probabilities.dtype)
+        outputs[batch_idx] = probabilities
+    return outputs if outputs is not None else np.zeros((0, 3), dtype=np.float32)
+
+
+def padding_report(lengths, max_length, batch_size=64, boundaries=None):
+    """
+    Share of timesteps spent on padding: fixed ``max_length`` vs bucketed batches.
+
+    The bucketed figure assumes batches filled within each bucket, as
+    ``bucket_by_sequence_length`` does.
+    """
+    lengths = np.minimum(np.asarray(lengths), max_length)
+    fixed_steps = len(lengths) * max_length
+
+    boundaries = boundaries or bucket_boundaries(lengths)
+    bucket_ids = np.searchsorted(boundaries, lengths, side='right')
+    bucketed_steps = 0
+    for bucket in np.unique(bucket_ids):
+        bucket_lengths = np.sort(lengths[bucket_ids == bucket])
+        for start in range(0, len(bucket_lengths), batch_size):
+            chunk = bucket_lengths[start:start + batch_size]
+            bucketed_steps += len(chunk) * chunk.max()
+
+    real_steps = lengths.sum()
+    return pd.DataFrame([
+        {'batching': f'fixed (max_length={max_length})', 'timesteps': fixed_steps,
+         'padding_share': 1 - real_steps / fixed_steps},
+        {'batching': 'length-bucketed', 'timesteps': bucketed_steps,
+         'padding_share': 1 - real_steps / bucketed_steps if bucketed_steps else 0.0},
+    ])
+
+
+def benchmark_sequence_batching(build_model, sequences, labels, max_length, batch_size=64,
+                                num_classes=3, class_weight=None):
+    """
+    Time one training epoch and one inference pass: fixed padding vs buckets.
+
+    Args:
+        build_model: Zero-argument function returning a fresh compiled model;
+            both runs start from the same initial weights
+        sequences: Unpadded token lists (truncated to ``max_length``)
+        labels: Integer labels
+
+    Returns:
+        DataFrame with epoch seconds, training/inference throughput and the speed-up
+    """
+    from .predictor import pad_sequences_post
+
+    tf = _tf()
+    labels = np.asarray(labels)
+    padded = pad_sequences_post(sequences, max_length)
+    one_hot = tf.keras.utils.to_categorical(labels, num_classes=num_classes)
+
+    model = build_model()
+    initial_weights = model.get_weights()
+
+    rows = []
+    started = time.perf_counter()
+    model.fit(padded, one_hot, batch_size=batch_size, epochs=1, class_weight=class_weight, verbose=0)
+    fixed_epoch = time.perf_counter() - started
+    started = time.perf_counter()
+    fixed_probs = model.predict(padded, batch_size=256, verbose=0)
+    fixed_inference = time.perf_counter() - started
+    rows.append({'batching': f'fixed (max_length={max_length})', 'epoch_seconds': fixed_epoch,
+                 'train_reviews_per_second': len(sequences) / fixed_epoch,
+                 'inference_reviews_per_second': len(sequences) / fixed_inference})
+
+    model = build_model()
+    model.set_weights(initial_weights)
+    dataset = make_bucketed_dataset(sequences, labels, batch_size=batch_size, num_classes=num_classes)
+    started = time.perf_counter()
+    model.fit(dataset, epochs=1, class_weight=class_weight, verbose=0)
+    bucketed_epoch = time.perf_counter() - started
+    started = time.perf_counter()
+    bucketed_probs = predict_bucketed(model, sequences, batch_size=256)
+    bucketed_inference = time.perf_counter() - started
+    rows.append({'batching': 'length-bucketed', 'epoch_seconds': bucketed_epoch,
+                 'train_reviews_per_second': len(sequences) / bucketed_epoch,
+                 'inference_reviews_per_second': len(sequences) / bucketed_inference})
+
+    report = pd.DataFrame(rows)
+    report['epoch_speedup'] = fixed_epoch / report['epoch_seconds']
+    report['inference_speedup'] = report['inference_reviews_per_second'] / rows[0]['inference_reviews_per_second']
+    report = report.round(4)
+    report.attrs['accuracy'] = {
+        'fixed': float((fixed_probs.argmax(axis=1) == labels).mean()),
+        'bucketed': float((bucketed_probs.argmax(axis=1) == labels).mean()),
+    }
+    return report
@@ -0,0 +1,375 @@
+"""
+Local HTTP scoring service for a saved sentiment pipeline.
+
+A small asyncio HTTP/1.1 server (standard library only) keeps the predictor
+warm. Concurrent ``POST /predict`` requests are coalesced by
+``MicroBatcher``: the first queued review opens a batch, which is closed
+once ``max_batch_size`` reviews are waiting or ``max_wait_ms`` has passed,
+and then scored with one ``predict_batch`` call in a worker thread.
+Predictions are cached per normalized text (LRU).
+
+Endpoints::
+
+    POST /predict   {"text": "..."} or {"texts": ["...", ...]}
+    GET  /health
+    GET  /metrics   request/batch counters, cache hit rate, p50/p99 latency
+
+Run with::
+
+    python -m sentiment.service --pipeline artifacts/models/best_pipeline.joblib --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import unicodedata
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .predictor import load_predictor
+
+
+DEFAULT_MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large'}
+
+
+def normalize_text(text):
+    """Cache key: NFC-normalized text with collapsed whitespace"""
+    return ' '.join(unicodedata.normalize('NFC', str(text)).split())
+
+
+class PredictionCache:
+    """LRU cache of prediction results keyed by normalized text"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        result = self._items.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        if self.maxsize <= 0:
+            return
+        self._items[key] = result
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class ServiceMetrics:
+    """Rolling latency and batch-size statistics"""
+
+    def __init__(self, window=10000):
+        self.started_at = time.time()
+        self.latencies_ms = deque(maxlen=window)
+        self.batch_sizes = deque(maxlen=window)
+        self.requests = 0
+        self.reviews = 0
+        self.batches = 0
+        self.errors = 0
+
+    def observe_request(self, latency_ms, n_reviews):
+        self.requests += 1
+        self.reviews += n_reviews
+        self.latencies_ms.append(latency_ms)
+
+    def observe_batch(self, size):
+        self.batches += 1
+        self.batch_sizes.append(size)
+
+    def snapshot(self, cache=None):
+        latencies = np.array(self.latencies_ms) if self.latencies_ms else np.zeros(1)
+        batch_sizes = np.array(self.batch_sizes) if self.batch_sizes else np.zeros(1)
+        snapshot = {
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'requests': self.requests,
+            'reviews': self.reviews,
+            'batches': self.batches,
+            'errors': self.errors,
+            'latency_ms': {
+                'p50': round(float(np.percentile(latencies, 50)), 3),
+                'p90': round(float(np.percentile(latencies, 90)), 3),
+                'p99': round(float(np.percentile(latencies, 99)), 3),
+                'max': round(float(latencies.max()), 3),
+            },
+            'batch_size': {
+                'mean': round(float(batch_sizes.mean()), 2),
+                'p50': float(np.percentile(batch_sizes, 50)),
+                'max': int(batch_sizes.max()),
+            },
+        }
+        if cache is not None:
+            lookups = cache.hits + cache.misses
+            snapshot['cache'] = {
+                'size': len(cache),
+                'hits': cache.hits,
+                'misses': cache.misses,
+                'hit_rate': round(cache.hits / lookups, 4) if lookups else 0.0,
+            }
+        return snapshot
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent single-review predictions into batches.
+
+    Args:
+        predict_batch: ``list[str] -> list[dict]`` (blocking; run in a worker thread)
+        max_batch_size: Close the batch once this many reviews are waiting
+        max_wait_ms: Latency budget for filling a batch
+        metrics: Optional ``ServiceMetrics`` receiving batch sizes
+    """
+
+    def __init__(self, predict_batch, max_batch_size=64, max_wait_ms=5.0, metrics=None):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.metrics = metrics
+        self._queue = None
+        self._task = None
+        # One model thread: batches run back to back while the loop keeps accepting requests
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='predict')
+
+    def start(self):
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def predict(self, text):
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict_batch, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            if self.metrics is not None:
+                self.metrics.observe_batch(len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class SentimentService:
+    """
+    HTTP front end: routing, caching and metrics around a ``MicroBatcher``.
+
+    Args:
+        predictor: Loaded ``SpotifySentimentPredictor``
+        max_batch_size / max_wait_ms: Micro-batching settings
+        cache_size: Number of cached predictions (0 disables the cache)
+        max_body_bytes: Larger request bodies are rejected with 413
+    """
+
+    def __init__(self, predictor, max_batch_size=64, max_wait_ms=5.0, cache_size=10000,
+                 max_body_bytes=DEFAULT_MAX_BODY_BYTES):
+        self.predictor = predictor
+        self.max_body_bytes = max_body_bytes
+        self.metrics = ServiceMetrics()
+        self.cache = PredictionCache(cache_size)
+        self.batcher = MicroBatcher(predictor.predict_batch, max_batch_size, max_wait_ms, self.metrics)
+        self._server = None
+
+    async def predict_one(self, text):
+        key = normalize_text(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return dict(cached, cached=True)
+        result = await self.batcher.predict(key)
+        result = {
+            'sentiment': result['sentiment'],
+            'confidence': result['confidence'],
+            'model_used': result['model_used'],
+        }
+        self.cache.put(key, result)
+        return dict(result, cached=False)
+
+    async def handle_predict(self, payload):
+        if 'texts' in payload:
+            texts = payload['texts']
+            if not isinstance(texts, list):
+                raise ValueError("'texts' must be a list of strings")
+            results = await asyncio.gather(*(self.predict_one(text) for text in texts))
+            return {'results': [dict(result, text=text) for text, result in zip(texts, results)]}
+        if 'text' in payload:
+            return dict(await self.predict_one(payload['text']), text=payload['text'])
+        raise ValueError("Request body needs 'text' or 'texts'")
+
+    async def route(self, method, path, body):
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok', 'model': self.predictor.model_name}
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics.snapshot(self.cache)
+        if method == 'POST' and path == '/predict':
+            started = time.perf_counter()
+            try:
+                payload = json.loads(body or b'{}')
+                response = await self.handle_predict(payload)
+            except (ValueError, TypeError) as e:
+                self.metrics.errors += 1
+                return 400, {'error': str(e)}
+            n_reviews = len(response['results']) if 'results' in response else 1
+            self.metrics.observe_request((time.perf_counter() - started) * 1000, n_reviews)
+            return 200, response
+        return 404, {'error': f"Unknown endpoint: {method} {path}"}
+
+    @staticmethod
+    async def _respond(writer, status, response, keep_alive):
+        payload = json.dumps(response, ensure_ascii=False).encode('utf-8')
+        reason = _REASONS.get(status, 'Internal Server Error')
+        writer.write(
+            f"HTTP/1.1 {status} {reason}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + payload
+        )
+        await writer.drain()
+
+    async def handle_connection(self, reader, writer):
+        """Minimal HTTP/1.1 with keep-alive and Content-Length bodies"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                # The body is not read on a bad or oversized Content-Length, so the
+                # connection cannot be reused after the error response
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    self.metrics.errors += 1
+                    await self._respond(writer, 400, {'error': "Invalid Content-Length header"}, keep_alive=False)
+                    break
+                if length > self.max_body_bytes:
+                    self.metrics.errors += 1
+                    await self._respond(writer, 413, {
+                        'error': f"Request body of {length} bytes exceeds {self.max_body_bytes} bytes"
+                    }, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                try:
+                    status, response = await self.route(method.upper(), target.split('?')[0], body)
+                except Exception as e:
+                    self.metrics.errors += 1
+                    status, response = 500, {'error': str(e)}
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                await self._respond(writer, status, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8000):
+        self.batcher.start()
+        self._server = await asyncio.start_server(self.handle_connection, host, port)
+        return self._server
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        await self.batcher.stop()
+
+    async def serve_forever(self, host='127.0.0.1', port=8000):
+        server = await self.start(host, port)
+        print(f"🚀 Sentiment service ({self.predictor.model_name}) on http://{host}:{port}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP sentiment scoring service")
+    parser.add_argument('--pipeline', required=True, help="Pipeline artifact from save_pipeline")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=64, help="Reviews per micro-batch")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0, help="Latency budget for filling a batch")
+    parser.add_argument('--cache-size', type=int, default=10000, help="Cached predictions (0 disables)")
+    parser.add_argument('--max-body-bytes', type=int, default=DEFAULT_MAX_BODY_BYTES,
+                        help="Largest accepted request body (larger bodies get 413)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    predictor = load_predictor(args.pipeline)
+    # Warm up: load NLTK resources and the model before the first request
+    predictor.predict_batch(["warm up"])
+    service = SentimentService(predictor, args.max_batch_size, args.max_wait_ms, args.cache_size,
+                               args.max_body_bytes)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        print("\n👋 Service stopped")
+
+
+if __name__ == '__main__':
+    main()
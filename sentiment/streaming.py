@@ -0,0 +1,271 @@
+"""
+Out-of-core training with a stateless hashing vectorizer and ``partial_fit``.
+
+The notebook experiments hold the whole corpus, its TF-IDF matrix and the
+dense statistical block in memory. ``StreamingSentimentModel`` instead reads
+reviews chunk by chunk (Parquet partitions or CSV files), featurizes each
+chunk with ``HashingVectorizer`` plus the lexicon features, and updates an
+SGD or Naive Bayes classifier with ``partial_fit``. Peak memory is bounded by
+the chunk size, and a saved model can be refreshed later with only the
+newly scraped partitions.
+
+Evaluation is prequential: a stable hash of ``reviewId`` routes a fixed
+share of rows to a holdout that is scored with the current model before the
+chunk's training rows are learned, and never trained on.
+"""
+
+import glob
+import hashlib
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, hstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.naive_bayes import ComplementNB
+from sklearn.preprocessing import StandardScaler
+
+from .features import LexiconFeatureExtractor
+from .text_cleaning import clean_texts
+
+
+SENTIMENT_CLASSES = ('negative', 'neutral', 'positive')
+
+DEFAULT_COLUMNS = ['reviewId', 'content', 'score']
+
+
+def rating_labels(chunk):
+    """Base rating -> sentiment mapping (1-2 negative, 3 neutral, 4-5 positive)"""
+    scores = chunk['score'].to_numpy()
+    return np.where(scores <= 2, 'negative', np.where(scores == 3, 'neutral', 'positive'))
+
+
+def iter_review_chunks(source, chunk_size=10000, columns=None, ratings=None, scrape_dates=None,
+                       shuffle=True, seed=42):
+    """
+    Yield review DataFrames of at most ``chunk_size`` rows.
+
+    Args:
+        source: Parquet dataset directory (``dataset/parquet``), a CSV file,
+            a glob pattern of CSV files, or a list of CSV paths
+        columns: Columns to read (default: ``DEFAULT_COLUMNS``)
+        ratings / scrape_dates: Partition filters (Parquet only); pass the
+            new ``scrape_dates`` to refresh a model incrementally
+        shuffle: Mix rating partitions and shuffle rows within each chunk
+    """
+    columns = list(columns or DEFAULT_COLUMNS)
+    if isinstance(source, str) and os.path.isdir(source):
+        from scraping.review_storage import iter_review_batches
+        yield from iter_review_batches(
+            source, batch_size=chunk_size, columns=columns, ratings=ratings,
+            scrape_dates=scrape_dates, shuffle=shuffle, seed=seed
+        )
+        return
+
+    paths = sorted(glob.glob(source)) if isinstance(source, str) else list(source)
+    rng = np.random.default_rng(seed)
+    for path in paths:
+        for chunk in pd.read_csv(path, usecols=lambda name: name in columns, chunksize=chunk_size):
+            if shuffle:
+                chunk = chunk.iloc[rng.permutation(len(chunk))].reset_index(drop=True)
+            yield chunk
+
+
+def holdout_mask(ids, holdout_percent):
+    """Stable per-review holdout assignment from a hash of the review id"""
+    buckets = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(review_id).encode('utf-8'), digest_size=2).digest(), 'little') % 100
+         for review_id in ids),
+        dtype=np.int64,
+        count=len(ids)
+    )
+    return buckets < holdout_percent
+
+
+class StreamingFeaturizer:
+    """
+    Stateless hashed n-grams plus lexicon features for one chunk.
+
+    Args:
+        n_features: Hashing space size
+        ngram_range: Word n-gram range for the hashing vectorizer
+        preprocess: Also lemmatize with ``TextPreprocessor`` (needs NLTK data)
+        nonnegative: Keep every feature >= 0 (required by Naive Bayes); the
+            signed ``sentiment_polarity`` column is dropped and the lexicon
+            block is not standardized
+    """
+
+    def __init__(self, n_features=2 ** 20, ngram_range=(1, 2), preprocess=False, nonnegative=False):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.preprocess = preprocess
+        self.nonnegative = nonnegative
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=ngram_range,
+            alternate_sign=False,
+            norm='l2',
+            stop_words='english',
+            lowercase=True,
+            strip_accents='unicode'
+        )
+        self.lexicon = LexiconFeatureExtractor()
+        self.lexicon_columns = [
+            i for i, name in enumerate(self.lexicon.feature_names)
+            if not (nonnegative and name == 'sentiment_polarity')
+        ]
+        # Running statistics, updated with partial_fit on every training chunk
+        self.scaler = None if nonnegative else StandardScaler()
+
+    def prepare_texts(self, texts):
+        """Clean (and optionally lemmatize) raw review texts"""
+        cleaned = clean_texts(pd.Series(list(texts), dtype=object)).tolist()
+        if self.preprocess:
+            from .preprocessing import get_preprocessor
+            cleaned = get_preprocessor().preprocess_batch(cleaned)
+        return cleaned
+
+    def featurize(self, texts):
+        """Unscaled blocks: (hashed n-grams CSR, lexicon feature array)"""
+        prepared = self.prepare_texts(texts)
+        return self.vectorizer.transform(prepared), self.lexicon.transform(prepared)[:, self.lexicon_columns]
+
+    def combine(self, hashed, lexicon):
+        """Scale the lexicon block with the current statistics and stack it"""
+        if self.scaler is not None and hasattr(self.scaler, 'mean_'):
+            lexicon = self.scaler.transform(lexicon)
+        return hstack([hashed, csr_matrix(lexicon)], format='csr')
+
+    def update(self, lexicon):
+        """Update the running scaler statistics with training rows"""
+        if self.scaler is not None and len(lexicon):
+            self.scaler.partial_fit(lexicon)
+
+    def transform(self, texts):
+        """Feature matrix (CSR) for raw review texts"""
+        return self.combine(*self.featurize(texts))
+
+
+def make_streaming_classifier(model='sgd', random_state=42):
+    """Classifier supporting ``partial_fit``: 'sgd' (modified Huber) or 'nb' (Complement NB)"""
+    if model == 'sgd':
+        # modified_huber gives predict_proba; class_weight='balanced' is not allowed with partial_fit
+        return SGDClassifier(loss='modified_huber', alpha=1e-5, random_state=random_state)
+    if model == 'nb':
+        return ComplementNB(alpha=0.3)
+    raise ValueError(f"Unknown streaming model: {model}")
+
+
+class StreamingSentimentModel:
+    """
+    Incrementally trained sentiment classifier.
+
+    Args:
+        model: 'sgd' or 'nb'
+        featurizer: ``StreamingFeaturizer`` (default settings when None)
+        label_fn: ``chunk -> labels`` (default: ``rating_labels``)
+        classes: Label set, required up front by ``partial_fit``
+        holdout_percent: Share of reviews (by id hash) kept for evaluation
+    """
+
+    def __init__(self, model='sgd', featurizer=None, label_fn=None, classes=SENTIMENT_CLASSES,
+                 holdout_percent=10, random_state=42):
+        self.model_name = model
+        self.classifier = make_streaming_classifier(model, random_state=random_state)
+        self.featurizer = featurizer or StreamingFeaturizer(nonnegative=(model == 'nb'))
+        self.label_fn = label_fn or rating_labels
+        self.classes = np.array(classes)
+        self.holdout_percent = holdout_percent
+        self.history = []
+        self.rows_seen = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        # Notebook lambdas are not picklable; the default is restored on load
+        if state['label_fn'] is not rating_labels:
+            state['label_fn'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.label_fn = self.label_fn or rating_labels
+
+    @property
+    def is_fitted(self):
+        return hasattr(self.classifier, 'classes_')
+
+    def partial_fit_chunk(self, chunk):
+        """Evaluate on the chunk's holdout rows, then learn its training rows"""
+        started = time.perf_counter()
+        chunk = chunk.dropna(subset=['content'])
+        labels = np.asarray(self.label_fn(chunk))
+        ids = chunk['reviewId'] if 'reviewId' in chunk.columns else chunk['content']
+        holdout = holdout_mask(ids, self.holdout_percent)
+        train = ~holdout
+
+        hashed, lexicon = self.featurizer.featurize(chunk['content'])
+        record = {
+            'chunk': len(self.history) + 1,
+            'rows': len(chunk),
+            'train_rows': int(train.sum()),
+            'holdout_rows': int(holdout.sum()),
+            'holdout_correct': 0,
+            'evaluated': False,
+        }
+        if self.is_fitted and holdout.any():
+            predictions = self.classifier.predict(self.featurizer.combine(hashed[holdout], lexicon[holdout]))
+            record['holdout_correct'] = int((predictions == labels[holdout]).sum())
+            record['evaluated'] = True
+
+        if train.any():
+            # Scaler statistics only come from training rows
+            self.featurizer.update(lexicon[train])
+            X_train = self.featurizer.combine(hashed[train], lexicon[train])
+            self.classifier.partial_fit(X_train, labels[train], classes=self.classes)
+        self.rows_seen += record['train_rows']
+        record['seconds'] = time.perf_counter() - started
+        self.history.append(record)
+        return record
+
+    def fit_stream(self, chunks, verbose=True):
+        """Train on an iterable of review chunks (see ``iter_review_chunks``)"""
+        for chunk in chunks:
+            record = self.partial_fit_chunk(chunk)
+            if verbose:
+                accuracy = record['holdout_correct'] / record['holdout_rows'] if record['evaluated'] else float('nan')
+                print(f"   chunk {record['chunk']}: {record['train_rows']} train / {record['holdout_rows']} holdout rows "
+                      f"- holdout accuracy {accuracy:.4f} ({record['seconds']:.1f}s)")
+        return self
+
+    def holdout_accuracy(self, last_n=None):
+        """Prequential holdout accuracy over all (or the last ``last_n``) chunks"""
+        records = [r for r in self.history if r['evaluated']]
+        records = records[-last_n:] if last_n else records
+        total = sum(r['holdout_rows'] for r in records)
+        return sum(r['holdout_correct'] for r in records) / total if total else float('nan')
+
+    def history_frame(self):
+        return pd.DataFrame(self.history)
+
+    def predict(self, texts):
+        return self.classifier.predict(self.featurizer.transform(texts))
+
+    def predict_proba(self, texts):
+        return self.classifier.predict_proba(self.featurizer.transform(texts))
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path, label_fn=None):
+        """Load a saved model; pass ``label_fn`` again if a custom one was used"""
+        model = joblib.load(path)
+        if label_fn is not None:
+            model.label_fn = label_fn
+        return model